@@ -2,6 +2,8 @@ from node import Node, ThermoState
 
 
 class Afterburner(Node):
+    outputs = ("f_ab", "f_tot")
+
     def __init__(
         self,
         inlet: Node,
@@ -17,7 +19,7 @@ class Afterburner(Node):
         self.f_tot = None
         self.included = afterburner
 
-    def get_outlet_conditions(self):
+    def compute_outlet_conditions(self):
         inlet = self.get_inlet_conditions()
         P05 = inlet.P0  # P05 = P06 b/c isobaric combustion
         T05 = inlet.T0
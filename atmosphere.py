@@ -0,0 +1,136 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from diffuser import InletConditions
+from engine import Engine
+from node import Fluid
+
+# International Standard Atmosphere (ISO 2533) layers up to 86 km:
+# base geopotential altitude [m] and temperature lapse rate [K/m]
+LAYERS = (
+    (0.0, -0.0065),
+    (11000.0, 0.0),
+    (20000.0, 0.0010),
+    (32000.0, 0.0028),
+    (47000.0, 0.0),
+    (51000.0, -0.0028),
+    (71000.0, -0.0020),
+    (84852.0, 0.0),
+)
+P_SL = 101325.0  # [Pa]
+T_SL = 288.15  # [K]
+G0 = 9.80665  # [m/s^2]
+R_AIR = 287.05287  # [J/(kg*K)]
+
+# Table spacing and range; lookups are linear interpolation on this grid
+DH = 10.0  # [m]
+H_MIN = -1000.0  # [m]
+H_MAX = 86000.0  # [m]
+
+
+def _isa_exact(h):
+    """Evaluate the layer equations directly at geopotential altitudes h."""
+    h = np.asarray(h, dtype=float)
+    T = np.empty_like(h)
+    p = np.empty_like(h)
+    Tb, pb = T_SL, P_SL
+    for i, (hb, lapse) in enumerate(LAYERS):
+        # The first layer extends below sea level, the last one above its top
+        bottom = hb if i > 0 else -np.inf
+        top = LAYERS[i + 1][0] if i + 1 < len(LAYERS) else np.inf
+        mask = (h >= bottom) & (h < top)
+        dh = h[mask] - hb
+        if lapse == 0.0:
+            T[mask] = Tb
+            p[mask] = pb * np.exp(-G0 * dh / (R_AIR * Tb))
+        else:
+            T[mask] = Tb + lapse * dh
+            p[mask] = pb * (T[mask] / Tb) ** (-G0 / (lapse * R_AIR))
+        # Conditions at the base of the next layer
+        if np.isfinite(top):
+            if lapse == 0.0:
+                pb = pb * np.exp(-G0 * (top - hb) / (R_AIR * Tb))
+            else:
+                Tt = Tb + lapse * (top - hb)
+                pb = pb * (Tt / Tb) ** (-G0 / (lapse * R_AIR))
+                Tb = Tt
+    return p, T
+
+
+_ALTITUDE = np.arange(H_MIN, H_MAX + DH, DH)
+_PRESSURE, _TEMPERATURE = _isa_exact(_ALTITUDE)
+
+
+def isa(altitude):
+    """
+    Ambient pressure [Pa] and temperature [K] at geopotential altitude [m].
+    Accepts scalars or arrays; each lookup is an O(1) index into a table.
+    Altitudes outside [H_MIN, H_MAX] are clamped to the table range.
+    """
+    x = (np.clip(altitude, H_MIN, H_MAX) - H_MIN) / DH
+    i = np.minimum(x.astype(int), len(_ALTITUDE) - 2)
+    w = x - i
+    p = _PRESSURE[i] + w * (_PRESSURE[i + 1] - _PRESSURE[i])
+    T = _TEMPERATURE[i] + w * (_TEMPERATURE[i + 1] - _TEMPERATURE[i])
+    return p, T
+
+
+def inlet_conditions(
+    altitude, mach, fluid=Fluid(gamma=1.4, R=287)
+) -> InletConditions:
+    """InletConditions for flight at the given altitude [m] and Mach number."""
+    p, T = isa(np.asarray(altitude, dtype=float))
+    u = mach * np.sqrt(fluid.gamma * fluid.R * T)
+    if np.ndim(p) == 0 and np.ndim(u) == 0:
+        return InletConditions(p=float(p), T=float(T), u=float(u))
+    p, T, u = np.broadcast_arrays(p, T, u)
+    return InletConditions(p=p, T=T, u=u)
+
+
+@dataclass
+class Envelope:
+    altitude: np.ndarray  # [m], shape (n_altitude, n_mach)
+    mach: np.ndarray  # [1], shape (n_altitude, n_mach)
+    Thrust: np.ndarray  # [N]
+    TSFC: np.ndarray  # [kg/(N*s)]
+    result: dict  # full solve_batch result on the grid
+
+
+def envelope(altitudes, machs, **engine_params) -> Envelope:
+    """
+    Evaluate the engine over the altitude x Mach grid in one vectorized pass.
+    engine_params are the Engine constructor arguments other than inlet_cond;
+    any of them may themselves be arrays broadcastable to the grid.
+    """
+    altitude, mach = np.meshgrid(
+        np.asarray(altitudes, dtype=float),
+        np.asarray(machs, dtype=float),
+        indexing="ij",
+    )
+    result = Engine.solve_batch(inlet_conditions(altitude, mach), **engine_params)
+    return Envelope(
+        altitude=altitude,
+        mach=mach,
+        Thrust=result["Thrust"],
+        TSFC=result["TSFC"],
+        result=result,
+    )
+
+
+if __name__ == "__main__":
+    env = envelope(
+        np.linspace(0, 15000, 7),
+        np.linspace(0, 2, 5),
+        pr=8.3,
+        T04=1250,
+        Qr=43e6,
+        eta_d=0.95,
+        eta_c=0.82,
+        eta_b=0.98,
+        eta_t=0.88,
+        eta_n=0.97,
+        mdot_air=20,
+    )
+    np.set_printoptions(precision=1, suppress=True)
+    print(env.Thrust / 1000)
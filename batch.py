@@ -0,0 +1,296 @@
+import numpy as np
+
+from combustor import PRODUCTS_ITERATIONS
+from gas_tables import ProductsFluid
+from node import Fluid, ThermoState
+
+# Flat column names for a solve_batch result, see to_columns
+RESULT_COLUMNS = (
+    "P02", "T02", "P03", "T03", "P04", "T04", "P05", "T05", "P06", "T06",
+    "ue", "Te", "f", "f_ab", "f_total", "Thrust", "TSFC", "Isp",
+)  # fmt: skip
+
+
+# Vectorized versions of the component equations. Every argument may be a
+# NumPy array or a scalar; the usual broadcasting rules apply. Points where the
+# scalar path would raise (e.g. sqrt of a negative number) come back as NaN.
+
+
+def diffuser(Pa, Ta, u, eta_d, fluid: Fluid):
+    # Real and isentropic outlet total temperature from the stagnation enthalpy
+    ha = fluid.h(Ta)
+    h02 = ha + 0.5 * u**2
+    T02 = fluid.T_from_h(h02)
+    T02s = fluid.T_from_h(eta_d * (h02 - ha) + ha)
+
+    # Real outlet total pressure
+    P02 = Pa * fluid.pressure_ratio(Ta, T02s)
+
+    return P02, T02
+
+
+def compressor(P02, T02, pr, eta_c, fluid: Fluid):
+    P03 = pr * P02
+    T03s = fluid.isentropic_T(T02, pr)
+    h02 = fluid.h(T02)
+    T03 = fluid.T_from_h(h02 + (fluid.h(T03s) - h02) / eta_c)
+
+    return P03, T03
+
+
+def combustor(T03, T04, Qr, eta_b, fluid: Fluid, products=False):
+    """Fuel-air ratio (P04 = P03) and the outlet fluid."""
+    h03 = fluid.h(T03)
+    h04 = fluid.h(T04)
+    f = (h04 - h03) / (Qr * eta_b - h04)
+    if not products:
+        return f, fluid
+    f_in = getattr(fluid, "f", 0.0)
+    for _ in range(PRODUCTS_ITERATIONS):
+        h04 = ProductsFluid(f_in + f).h(T04)
+        f = (h04 - h03) / (Qr * eta_b - h04)
+    return f, ProductsFluid(f_in + f)
+
+
+def turbine(P04, T04, T03, T02, f, eta_t, fluid: Fluid, compressor_fluid=None):
+    # Work balance with the compressor
+    air = compressor_fluid or fluid
+    h04 = fluid.h(T04)
+    h05 = h04 - (air.h(T03) - air.h(T02)) / (1 + f)
+    T05 = fluid.T_from_h(h05)
+    T05s = fluid.T_from_h(h04 - (h04 - h05) / eta_t)
+    P05 = P04 * fluid.pressure_ratio(T04, T05s)
+
+    return P05, T05
+
+
+def nozzle(P0, T0, Pa, eta_n, fluid: Fluid):
+    Tes = fluid.isentropic_T(T0, Pa / P0)
+    h0 = fluid.h(T0)
+    he = h0 - eta_n * (h0 - fluid.h(Tes))
+    Te = fluid.T_from_h(he)
+    ue = np.sqrt(2 * (h0 - he))
+
+    return ue, Te
+
+
+# Inputs that only affect the afterburner and the nozzle, see solve_variants
+DOWNSTREAM = ("eta_n", "afterburner_included", "eta_ab", "Qr_ab", "T06")
+
+
+def solve_batch(
+    p,
+    T,
+    u,
+    pr,
+    T04,
+    Qr,
+    eta_d,
+    eta_c,
+    eta_b,
+    eta_t,
+    eta_n,
+    mdot_air,
+    afterburner_included=False,
+    eta_ab=1.0,
+    Qr_ab=1.0,
+    T06=1.0,
+    fluid=Fluid(gamma=1.4, R=287),
+    products=False,
+):
+    """
+    Solve many design points at once. Inputs are broadcast against each other
+    and the result has the same keys as Engine.solve, with every value an array
+    of the broadcast shape. afterburner_included may be a boolean array to mix
+    dry and wet points; dry points then report T06 = T05 and f_ab = 0.
+    With products=True the gas downstream of each burner is
+    gas_tables.ProductsFluid at the per-point fuel-air ratio.
+    """
+    (p, T, u, pr, T04, Qr, eta_d, eta_c, eta_b, eta_t, eta_n, mdot_air, eta_ab,
+     Qr_ab, T06, ab) = np.broadcast_arrays(
+        *(
+            np.asarray(x, dtype=float)
+            for x in (
+                p, T, u, pr, T04, Qr, eta_d, eta_c, eta_b, eta_t, eta_n, mdot_air,
+                eta_ab, Qr_ab, T06,
+            )
+        ),
+        np.asarray(afterburner_included, dtype=bool),
+    )  # fmt: skip
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stations = upstream(
+            p, T, u, pr, T04, Qr, eta_d, eta_c, eta_b, eta_t, fluid, products
+        )
+        return downstream(
+            stations, p, u, mdot_air, eta_n, ab, eta_ab, Qr_ab, T06, products
+        )
+
+
+def solve_variants(
+    p,
+    T,
+    u,
+    pr,
+    T04,
+    Qr,
+    eta_d,
+    eta_c,
+    eta_b,
+    eta_t,
+    eta_n,
+    mdot_air,
+    afterburner_included=False,
+    eta_ab=1.0,
+    Qr_ab=1.0,
+    T06=1.0,
+    fluid=Fluid(gamma=1.4, R=287),
+    products=False,
+):
+    """
+    Solve every design point with every downstream variant, sharing the
+    upstream work. Takes the solve_batch arguments, but the DOWNSTREAM ones
+    (eta_n, afterburner_included, eta_ab, Qr_ab, T06) describe the variants:
+    they broadcast against each other to a variant shape V, the other inputs
+    to a design shape S. The diffuser, compressor, combustor and turbine are
+    solved once per design point and only the afterburner and nozzle once
+    per combination, so the result is that of solve_batch on the full grid,
+    with arrays of shape S + V:
+
+        # dry and wet at three afterburner temperatures for every pr
+        solve_variants(..., pr=pr_array, afterburner_included=[[False], [True]],
+                       T06=[1800, 2000, 2200])  # shape (len(pr), 2, 3)
+    """
+    (p, T, u, pr, T04, Qr, eta_d, eta_c, eta_b, eta_t, mdot_air) = (
+        np.broadcast_arrays(
+            *(
+                np.asarray(x, dtype=float)
+                for x in (p, T, u, pr, T04, Qr, eta_d, eta_c, eta_b, eta_t, mdot_air)
+            )
+        )
+    )
+    (ab, eta_n, eta_ab, Qr_ab, T06) = np.broadcast_arrays(
+        np.asarray(afterburner_included, dtype=bool),
+        *(np.asarray(x, dtype=float) for x in (eta_n, eta_ab, Qr_ab, T06)),
+    )
+    # Design axes first, then the variant axes
+    expand = (...,) + (np.newaxis,) * ab.ndim
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        stations = upstream(
+            p, T, u, pr, T04, Qr, eta_d, eta_c, eta_b, eta_t, fluid, products
+        )
+        stations = {
+            key: value if key == "gas" else value[expand]
+            for key, value in stations.items()
+        }
+        if products:
+            stations["gas"] = ProductsFluid(stations["f"])
+        return downstream(
+            stations,
+            p[expand],
+            u[expand],
+            mdot_air[expand],
+            eta_n,
+            ab,
+            eta_ab,
+            Qr_ab,
+            T06,
+            products,
+        )
+
+
+def upstream(p, T, u, pr, T04, Qr, eta_d, eta_c, eta_b, eta_t, fluid, products):
+    """
+    Stations 02 to 05, which do not depend on the DOWNSTREAM inputs, with the
+    fuel-air ratio f and the gas leaving the turbine.
+    """
+    P02, T02 = diffuser(p, T, u, eta_d, fluid)
+    P03, T03 = compressor(P02, T02, pr, eta_c, fluid)
+    f, gas = combustor(T03, T04, Qr, eta_b, fluid, products)
+    P05, T05 = turbine(P03, T04, T03, T02, f, eta_t, gas, fluid)
+    return {
+        "P02": P02,
+        "T02": T02,
+        "P03": P03,
+        "T03": T03,
+        "P04": P03,
+        "T04": T04,
+        "P05": P05,
+        "T05": T05,
+        "f": f,
+        "gas": gas,
+    }
+
+
+def downstream(
+    stations, p, u, mdot_air, eta_n, afterburner_included, eta_ab, Qr_ab, T06, products
+):
+    """
+    Afterburner, nozzle and performance from the upstream stations, as a
+    solve_batch result. Every value is broadcast to the shape of the thrust,
+    so upstream values shared by several variants are read-only views.
+    """
+    P05, T05, f, gas = (stations[key] for key in ("P05", "T05", "f", "gas"))
+    ab = np.asarray(afterburner_included, dtype=bool)
+    if ab.any():
+        T06 = np.where(ab, T06, T05)
+        f_ab, gas_ab = combustor(T05, T06, Qr_ab, eta_ab, gas, products)
+        f_ab = np.where(ab, f_ab, 0.0)
+        f_tot = f + f_ab
+        if products:
+            # Dry points keep the products at f since f_ab = 0
+            gas_ab = ProductsFluid(f_tot)
+        ue, Te = nozzle(P05, T06, p, eta_n, gas_ab)
+    else:
+        f_tot = f
+        ue, Te = nozzle(P05, T05, p, eta_n, gas)
+
+    # Turbojet Performance Characteristics
+    Thrust = mdot_air * (1 + f_tot) * ue - mdot_air * u
+    mdot_f = mdot_air * f_tot
+    TSFC = mdot_f / Thrust
+    Isp = Thrust / (mdot_f * 9.81)
+
+    shape = np.shape(Thrust)
+
+    def full(x):
+        return x if np.shape(x) == shape else np.broadcast_to(x, shape)
+
+    result = {
+        "T02": ThermoState(full(stations["P02"]), full(stations["T02"])),
+        "T03": ThermoState(full(stations["P03"]), full(stations["T03"])),
+        "T04": ThermoState(full(stations["P04"]), full(stations["T04"])),
+        "T05": ThermoState(full(P05), full(T05)),
+        "ue": ue,
+        "Te": full(Te),
+        "f": full(f),
+        "Thrust": Thrust,
+        "TSFC": TSFC,
+        "Isp": Isp,
+    }
+    if ab.any():
+        result["T06"] = ThermoState(full(P05), full(T06))
+        result["f_ab"] = full(f_ab)
+        result["f_total"] = full(f_tot)
+    return result
+
+
+def to_columns(result: dict) -> dict:
+    """
+    Flatten a solve/solve_batch result into 1-D arrays named by RESULT_COLUMNS.
+    Dry results get P06/T06 = P05/T05 and f_ab = 0 so every result has the same
+    columns.
+    """
+    cols = {}
+    for station in ("T02", "T03", "T04", "T05"):
+        cols["P" + station[1:]] = np.ravel(result[station].P0)
+        cols[station] = np.ravel(result[station].T0)
+    stage06 = result.get("T06", result["T05"])
+    cols["P06"] = np.ravel(stage06.P0)
+    cols["T06"] = np.ravel(stage06.T0)
+    for key in ("ue", "Te", "f", "Thrust", "TSFC", "Isp"):
+        cols[key] = np.ravel(result[key])
+    cols["f_ab"] = np.ravel(result.get("f_ab", np.zeros_like(cols["f"])))
+    cols["f_total"] = np.ravel(result.get("f_total", cols["f"]))
+    return {key: cols[key] for key in RESULT_COLUMNS}
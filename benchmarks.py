@@ -0,0 +1,367 @@
+"""
+Benchmark suite for the solve, sweep and plotting hot paths.
+
+    python benchmarks.py run                 # run everything, append to history
+    python benchmarks.py run --filter solve  # only benchmarks whose name matches
+    python benchmarks.py compare             # last two history entries
+    python benchmarks.py compare abc123 HEAD # two commits (prefixes are fine)
+
+Each benchmark reports the best time per operation over several repeats.
+Runs are appended as one JSON line each to the history file together with the
+git commit they were run on, and compare exits with status 1 when any
+benchmark got slower than the threshold between two entries.
+"""
+
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import timeit
+from functools import partial
+
+HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks.jsonl")
+
+ENGINE_PARAMS = dict(
+    pr=8.3,
+    T04=1250,
+    Qr=43e6,
+    eta_d=0.95,
+    eta_c=0.82,
+    eta_b=0.98,
+    eta_t=0.88,
+    eta_n=0.97,
+    mdot_air=20,
+)
+AFTERBURNER_PARAMS = dict(afterburner_included=True, eta_ab=0.95, Qr_ab=43e6, T06=2000)
+
+BATCH_SIZES = (1_000, 100_000, 1_000_000)
+SWEEP_SIZES = (10_000, 1_000_000)
+PLOT_RUNS = (1, 10, 50, 1_000, 100_000)
+
+
+def _engine(**kwargs):
+    from diffuser import InletConditions
+    from engine import Engine
+
+    return Engine(InletConditions(p=101325, T=288, u=250), **ENGINE_PARAMS, **kwargs)
+
+
+def _node_benchmarks():
+    """One uncached get_outlet_conditions per component, upstream kept cached."""
+    engine = _engine(**AFTERBURNER_PARAMS)
+    engine.solve()
+    cases = {}
+    for name, node in (
+        ("diffuser", engine.diff),
+        ("compressor", engine.comp),
+        ("combustor", engine.comb),
+        ("turbine", engine.turb),
+        ("afterburner", engine.afterburn),
+    ):
+
+        def recompute(node=node):
+            node.invalidate()
+            node.get_outlet_conditions()
+
+        cases[f"node.{name}"] = (recompute, 1)
+
+    nozzle, Pa = engine.nozz, engine.inlet_cond.p
+    cases["node.nozzle"] = (lambda: nozzle.get_outlet_conditions(Pa), 1)
+    return cases
+
+
+def _solve_benchmarks():
+    from cache import SolveCache
+
+    cases = {}
+    for label, kwargs in (("dry", {}), ("afterburner", AFTERBURNER_PARAMS)):
+        engine = _engine(**kwargs)
+
+        def solve(engine=engine):
+            engine.diff.invalidate()
+            engine.solve()
+
+        cases[f"solve.{label}"] = (solve, 1)
+        cases[f"solve.{label}.cached"] = (engine.solve, 1)
+        cases[f"solve.{label}.compiled"] = (engine.compile(), 1)
+        cases[f"solve.{label}.memoized"] = (partial(SolveCache().solve, engine), 1)
+    return cases
+
+
+def _batch_benchmarks():
+    import numpy as np
+
+    from batch import solve_batch, solve_variants
+    from surrogate import Surrogate
+
+    cases = {}
+    for n in BATCH_SIZES:
+        rng = np.random.default_rng(0)
+        pr = rng.uniform(4, 20, n)
+        T04 = rng.uniform(1100, 1600, n)
+        params = dict(ENGINE_PARAMS, pr=pr, T04=T04)
+
+        def solve(params=params):
+            solve_batch(101325, 288, 250, **params, **AFTERBURNER_PARAMS)
+
+        cases[f"batch.{n}"] = (solve, n)
+
+    # 1000 design points, each dry and at 99 afterburner temperatures
+    params = dict(ENGINE_PARAMS, pr=np.linspace(4, 20, 1000))
+    variants = dict(
+        AFTERBURNER_PARAMS,
+        afterburner_included=np.arange(100) > 0,
+        T06=np.linspace(1700, 2200, 100),
+    )
+    solve = partial(solve_variants, 101325, 288, 250, **params, **variants)
+    cases["batch.variants.100000"] = (solve, 100_000)
+
+    fixed = dict(ENGINE_PARAMS, **AFTERBURNER_PARAMS, p=101325, T=288, u=250)
+    del fixed["pr"], fixed["T04"]
+    surrogate = Surrogate.fit(dict(pr=(4, 20), T04=(1100, 1600)), fixed, holdout=0)
+    rng = np.random.default_rng(0)
+    query = dict(pr=rng.uniform(4, 20, 100_000), T04=rng.uniform(1100, 1600, 100_000))
+    cases["batch.surrogate.100000"] = (partial(surrogate, **query), 100_000)
+    return cases
+
+
+def _sweep_benchmarks():
+    import numpy as np
+
+    from sweep import Sweep
+
+    cases = {}
+    for n in SWEEP_SIZES:
+        side = int(round(n**0.5))
+        grid = {"pr": np.linspace(4, 20, side), "T04": np.linspace(1100, 1600, side)}
+        fixed = dict(ENGINE_PARAMS, p=101325, T=288, u=250)
+        del fixed["pr"], fixed["T04"]
+        # Serial so the numbers do not depend on the core count
+        sweep = Sweep(grid, fixed, workers=1)
+        cases[f"sweep.{n}"] = (sweep.run, side * side)
+    return cases
+
+
+def _plot_benchmarks():
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    import plot_engine
+    from plot_engine import PLOT_TYPES, EnginePlotter, plot_engine_results
+
+    engine = _engine(**AFTERBURNER_PARAMS)
+    results = engine.solve()
+    cases = {}
+    for plot_type in PLOT_TYPES:
+        if plot_type == "Carpet Plot":
+            continue  # drawn from parameters, not runs; see below
+        for n in PLOT_RUNS:
+
+            def render(plot_type=plot_type, n=n):
+                fig = plot_engine_results([results] * n, engine.inlet_cond, plot_type)
+                FigureCanvasAgg(fig).draw()
+                plt.close(fig)
+
+            key = plot_type.lower().replace(" ", "_")
+            cases[f"plot.{key}.{n}"] = (render, 1)
+
+    plotter = EnginePlotter()
+    plotter.carpet_params = dict(p=101325, T=288, u=250, **ENGINE_PARAMS)
+
+    def carpet(cached=True):
+        if not cached:
+            plot_engine._carpet_cache.clear()
+        FigureCanvasAgg(plotter.figure("Carpet Plot")).draw()
+
+    cases["plot.carpet"] = (partial(carpet, cached=False), 1)
+    cases["plot.carpet.redraw"] = (carpet, 1)
+    return cases
+
+
+# Every benchmark of a suite is named "<suite>.<case>"
+SUITES = {
+    "node": _node_benchmarks,
+    "solve": _solve_benchmarks,
+    "batch": _batch_benchmarks,
+    "sweep": _sweep_benchmarks,
+    "plot": _plot_benchmarks,
+}
+
+
+def measure(fn, repeat=5, min_time=0.2) -> float:
+    """Best wall time of one call to fn, over repeat timing rounds."""
+    timer = timeit.Timer(fn)
+    number, elapsed = timer.autorange()
+    number = max(1, int(number * min_time / max(elapsed, 1e-9)))
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run(pattern="*", repeat=5, min_time=0.2, progress=None) -> dict:
+    """
+    Run every benchmark whose name matches the glob pattern, or starts with
+    pattern followed by a dot. Returns
+    {name: {"seconds": per call, "items": per call, "per_item": seconds}}.
+    """
+    results = {}
+    # Building a suite can be costly (fitting, large inputs, imports), so
+    # suites whose prefix cannot match are skipped. A "*" before the first
+    # dot may match across dots, so it can match any suite
+    head = pattern.split(".", 1)[0]
+    for suite, build in SUITES.items():
+        if "*" not in head and not fnmatch.fnmatch(suite, head):
+            continue
+        for name, (fn, items) in build().items():
+            # A bare prefix such as "solve" selects that whole group
+            if not (
+                fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(name, pattern + ".*")
+            ):
+                continue
+            seconds = measure(fn, repeat, min_time)
+            results[name] = {
+                "seconds": seconds,
+                "items": items,
+                "per_item": seconds / items,
+            }
+            if progress is not None:
+                progress(name, results[name])
+    return results
+
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        commit = out.stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+        return commit + ("-dirty" if dirty else "")
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def append_history(results: dict, path=HISTORY) -> dict:
+    entry = {
+        "commit": git_commit(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "cpus": os.cpu_count(),
+        "results": results,
+    }
+    with open(path, "a") as file:
+        file.write(json.dumps(entry) + "\n")
+    return entry
+
+
+def load_history(path=HISTORY) -> list:
+    if not os.path.exists(path):
+        return []
+    with open(path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def _find(history, ref):
+    """Latest entry whose commit starts with ref (HEAD is the current commit)."""
+    if ref == "HEAD":
+        ref = git_commit().removesuffix("-dirty")
+    for entry in reversed(history):
+        if entry["commit"].startswith(ref):
+            return entry
+    raise SystemExit(f"No benchmark history for {ref!r}")
+
+
+def compare(old: dict, new: dict, threshold=0.1) -> list:
+    """
+    (name, old seconds, new seconds, ratio, regressed) for every benchmark in
+    both entries; regressed when new is more than threshold slower.
+    """
+    rows = []
+    for name, result in new["results"].items():
+        if name not in old["results"]:
+            continue
+        before = old["results"][name]["seconds"]
+        after = result["seconds"]
+        ratio = after / before
+        rows.append((name, before, after, ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _format_time(seconds):
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.3f} {unit}"
+    return f"{seconds / 1e-9:8.1f} ns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--history", default=HISTORY, help="JSON-lines history file")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run benchmarks, append to history")
+    run_parser.add_argument("--filter", default="*", help="glob on benchmark names")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--min-time", type=float, default=0.2, help="s per round")
+    run_parser.add_argument("--no-save", action="store_true")
+
+    compare_parser = commands.add_parser("compare", help="compare two history entries")
+    compare_parser.add_argument("old", nargs="?", help="commit (default: second last)")
+    compare_parser.add_argument("new", nargs="?", help="commit (default: last)")
+    compare_parser.add_argument(
+        "--threshold", type=float, default=0.1, help="allowed slowdown, 0.1 = 10%%"
+    )
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+
+        def report(name, result):
+            per_item = ""
+            if result["items"] > 1:
+                per_item = f"  ({_format_time(result['per_item'])} per case)"
+            print(f"{name:<36} {_format_time(result['seconds'])}{per_item}")
+
+        results = run(args.filter, args.repeat, args.min_time, report)
+        if not args.no_save and results:
+            entry = append_history(results, args.history)
+            print(f"Saved to {args.history} at {entry['commit'][:12]}")
+        return
+
+    history = load_history(args.history)
+    if args.old is None and len(history) < 2:
+        raise SystemExit("Need at least two history entries to compare")
+    old = _find(history, args.old) if args.old else history[-2]
+    new = _find(history, args.new) if args.new else history[-1]
+
+    print(f"{old['commit'][:12]} -> {new['commit'][:12]}")
+    rows = compare(old, new, args.threshold)
+    for name, before, after, ratio, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(
+            f"{name:<36} {_format_time(before)} {_format_time(after)}"
+            f" {ratio:6.2f}x{flag}"
+        )
+    regressions = [row[0] for row in rows if row[4]]
+    if regressions:
+        message = f"{len(regressions)} regression(s) over {args.threshold:.0%}"
+        print(message, file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
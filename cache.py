@@ -0,0 +1,310 @@
+"""
+Content-addressed cache of Engine.solve() results.
+
+A result is stored under the SHA-256 of the engine's inputs in canonical form
+(floats by their exact hex representation, fluids by type and constructor
+arguments) together with the model version, a hash of the source of every
+module the solve runs through. Editing any of them changes every key, so
+stale results are never returned; prune() deletes them from disk.
+
+Results live in a bounded in-memory LRU, keyed by the raw input values since
+those hash much faster, and, if a directory is given, in one pickle file per
+key on disk, shared by all processes using that directory. Files are written
+to a temporary name and renamed into place, so concurrent writers and readers
+never see a partial file. Only point the cache at
+directories you trust: entries are unpickled.
+"""
+
+import dataclasses
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+
+from node import ThermoState
+
+# Modules whose source determines the results (and this one, for the keys)
+MODEL_MODULES = (
+    "node", "diffuser", "compressor", "combustor", "turbine", "nozzle",
+    "afterburner", "engine", "gas_tables", "cache",
+)  # fmt: skip
+
+
+@functools.cache
+def model_version() -> str:
+    """Hash of the source of MODEL_MODULES."""
+    digest = hashlib.sha256()
+    for name in MODEL_MODULES:
+        with open(importlib.util.find_spec(name).origin, "rb") as file:
+            digest.update(name.encode() + b"\0" + file.read() + b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _canonical(value):
+    """JSON-able form of an input that is equal exactly when the values are."""
+    if hasattr(value, "item"):  # NumPy scalar
+        value = value.item()
+    if value is None or isinstance(value, (bool, str)):
+        return value
+    if isinstance(value, (int, float)):
+        return float(value).hex()
+    if isinstance(value, (tuple, list)):
+        return [_canonical(v) for v in value]
+    kind = f"{type(value).__module__}.{type(value).__qualname__}"
+    if type(value).__reduce__ is not object.__reduce__:
+        # Types that pickle by constructor arguments, like the table fluids
+        _, args = value.__reduce__()[:2]
+        return [kind, _canonical(args)]
+    if dataclasses.is_dataclass(value):
+        fields = dataclasses.fields(value)
+        return [kind, {f.name: _canonical(getattr(value, f.name)) for f in fields}]
+    raise TypeError(f"Cannot build a cache key from {kind}")
+
+
+def engine_inputs(engine):
+    """
+    Every input of engine as read from its components, so edits made after
+    construction (engine.comp.pi = ...) are seen. None if the component chain
+    is not the one Engine builds, or its components were given different
+    fluids, since the inputs would not determine solve() alone.
+    """
+    standard = (
+        engine.comp.inlet is engine.diff
+        and engine.comb.inlet is engine.comp
+        and engine.turb.inlet is engine.comb
+        and all(len(node._downstream) <= 1 for node in (engine.diff, engine.comp))
+    )
+    if engine.afterburn is not None:
+        standard = standard and engine.afterburn.inlet is engine.turb
+    if not standard or engine.diff.inlet is not engine.inlet_cond:
+        return None
+    # The key holds one fluid. solve() hands the turbine, afterburner and
+    # nozzle the gas leaving the burners, so only these are set independently
+    fluid = engine.diff.fluid
+    fluids = (engine.comp.fluid, engine.comb.fluid, engine.turb.compressor_fluid)
+    if any(other is not fluid and other != fluid for other in fluids):
+        return None
+    if engine.afterburn is not None and (
+        engine.afterburn.products != engine.comb.products
+    ):
+        return None
+    inlet = engine.inlet_cond
+    inputs = dict(
+        p=inlet.p,
+        T=inlet.T,
+        u=inlet.u,
+        pr=engine.comp.pi,
+        T04=engine.comb.T04,
+        Qr=engine.comb.Qr,
+        eta_d=engine.diff.eta,
+        eta_c=engine.comp.eta,
+        eta_b=engine.comb.eta,
+        eta_t=engine.turb.eta,
+        eta_n=engine.nozz.eta,
+        mdot_air=engine.mdot_air,
+        fluid=engine.diff.fluid,
+        products=engine.comb.products,
+        afterburner_included=bool(engine.afterburner_included),
+    )
+    if engine.afterburner_included and engine.afterburn is not None:
+        inputs.update(
+            eta_ab=engine.afterburn.eta,
+            Qr_ab=engine.afterburn.Qr,
+            T06=engine.afterburn.T04,
+        )
+    return inputs
+
+
+def _memory_key(inputs: dict):
+    """
+    Cheap in-process key of engine_inputs: the raw values, which hash much
+    faster than the canonical form. None if the fluid does not reduce to
+    hashable values.
+    """
+    fluid = inputs["fluid"]
+    if type(fluid).__reduce__ is not object.__reduce__:
+        state = fluid.__reduce__()[1]
+    else:
+        state = tuple(vars(fluid).values())
+    key = tuple(v for name, v in inputs.items() if name != "fluid")
+    key += (type(fluid), state)
+    try:
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
+def _copy(result: dict) -> dict:
+    """Copy of a solve() result that callers may modify freely."""
+    return {
+        key: ThermoState(v.P0, v.T0) if isinstance(v, ThermoState) else v
+        for key, v in result.items()
+    }
+
+
+@dataclasses.dataclass
+class CacheStats:
+    hits: int = 0  # answered from memory
+    disk_hits: int = 0  # answered from disk
+    misses: int = 0  # solved
+    evictions: int = 0  # dropped from memory to stay within maxsize
+    bypassed: int = 0  # engines whose inputs could not be keyed
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class SolveCache:
+    """
+    Cache in front of Engine.solve(): cache.solve(engine) returns the same
+    result as engine.solve(), solving only on a miss. maxsize bounds the
+    number of results kept in memory; directory enables the disk tier.
+    Safe to share between threads.
+    """
+
+    def __init__(self, maxsize: int = 1024, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.stats = CacheStats()
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._memory)
+
+    def key(self, engine):
+        """
+        Disk key of the engine's current inputs and the model version, or
+        None if the engine cannot be cached.
+        """
+        inputs = engine_inputs(engine)
+        return None if inputs is None else self._digest(inputs)
+
+    def _digest(self, inputs):
+        try:
+            canonical = {name: _canonical(value) for name, value in inputs.items()}
+        except TypeError:
+            return None
+        text = json.dumps([model_version(), canonical], sort_keys=True)
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.directory, model_version(), key[:2], key + ".pkl")
+
+    def _read(self, key):
+        try:
+            with open(self._path(key), "rb") as file:
+                return pickle.load(file)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _write(self, key, result):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                pickle.dump(result, file, protocol=pickle.HIGHEST_PROTOCOL)
+            # Atomic; writers racing on one key store identical results
+            os.replace(temporary, path)
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+    def _remember(self, key, result):
+        with self._lock:
+            self._memory[key] = result
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+                self.stats.evictions += 1
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+
+    def solve(self, engine) -> dict:
+        inputs = engine_inputs(engine)
+        key = None if inputs is None else _memory_key(inputs)
+        if key is None:
+            self._count("bypassed")
+            return engine.solve()
+
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.stats.hits += 1
+                return _copy(result)
+
+        digest = None if self.directory is None else self._digest(inputs)
+        if digest is not None:
+            result = self._read(digest)
+            if result is not None:
+                self._remember(key, result)
+                self._count("disk_hits")
+                return _copy(result)
+
+        self._count("misses")
+        result = engine.solve()
+        self._remember(key, _copy(result))
+        if digest is not None:
+            self._write(digest, result)
+        return result
+
+    def clear(self, disk: bool = False):
+        """Empty the memory tier, and the disk tier too if disk is set."""
+        with self._lock:
+            self._memory.clear()
+        if disk and self.directory is not None:
+            shutil.rmtree(os.path.join(self.directory, model_version()), True)
+
+    def prune(self) -> int:
+        """Delete disk entries of other model versions; returns how many."""
+        if self.directory is None or not os.path.isdir(self.directory):
+            return 0
+        removed = 0
+        for version in os.listdir(self.directory):
+            path = os.path.join(self.directory, version)
+            if version != model_version() and os.path.isdir(path):
+                removed += sum(len(files) for _, _, files in os.walk(path))
+                shutil.rmtree(path, True)
+        return removed
+
+
+if __name__ == "__main__":
+    import time
+
+    from diffuser import InletConditions
+    from engine import Engine
+
+    engine = Engine(
+        InletConditions(p=101325, T=288, u=250),
+        pr=8.3,
+        T04=1250,
+        Qr=43e6,
+        eta_d=0.95,
+        eta_c=0.82,
+        eta_b=0.98,
+        eta_t=0.88,
+        eta_n=0.97,
+        mdot_air=20,
+    )
+    cache = SolveCache(directory=os.path.join(tempfile.gettempdir(), "engine-cache"))
+    start = time.perf_counter()
+    for _ in range(10):
+        for pr in range(4, 20):
+            engine.comp.pi = pr
+            cache.solve(engine)
+    elapsed = time.perf_counter() - start
+    print(f"160 solves in {elapsed * 1e3:.2f} ms, model version {model_version()}")
+    print(cache.stats, f"hit rate {cache.stats.hit_rate:.0%}")
@@ -1,21 +1,49 @@
-from node import Node, ThermoState
+from node import Fluid, Node, ThermoState
+
+# Fixed-point iterations for f when the outlet enthalpy depends on f
+PRODUCTS_ITERATIONS = 4
 
 
 class Combustor(Node):
+    outputs = ("f", "outlet_fluid")
+
     def __init__(
-        self, inlet: Node, eta_b: float = 1.0, Qr: float = 1.0, T04: float = 1.0
+        self,
+        inlet: Node,
+        eta_b: float = 1.0,
+        Qr: float = 1.0,
+        T04: float = 1.0,
+        fluid: Fluid = Fluid(gamma=1.4, R=287),
+        products: bool = False,
     ):
-        super().__init__(inlet, eta_b)
+        super().__init__(inlet, eta_b, fluid)
         self.T04 = T04  # Turbine Inlet Temp Given
         self.Qr = Qr
+        # With products, the outlet gas is gas_tables.ProductsFluid at the
+        # total fuel-air ratio instead of the inlet fluid
+        self.products = products
         self.f = None
+        self.outlet_fluid = fluid
 
-    def get_outlet_conditions(self):
+    def compute_outlet_conditions(self):
         inlet = self.get_inlet_conditions()
         P03 = inlet.P0  # P02 = P03
         T03 = inlet.T0
-        cp = self.fluid.cp
-        # Fuel-air ratio
-        self.f = (self.T04 - T03) / ((self.Qr * self.eta) / cp - self.T04)
+        h03 = self.fluid.h(T03)
+        h04 = self.fluid.h(self.T04)
+        # Fuel-air ratio, (1 + f) * h04 = h03 + f * eta_b * Qr
+        self.f = (h04 - h03) / (self.Qr * self.eta - h04)
+        self.outlet_fluid = self.fluid
+
+        if self.products:
+            # Imported here so plain air models never load NumPy
+            from gas_tables import ProductsFluid
+
+            # h04 now depends on f through the products composition
+            f_in = getattr(self.fluid, "f", 0.0)
+            for _ in range(PRODUCTS_ITERATIONS):
+                h04 = ProductsFluid(f_in + self.f).h(self.T04)
+                self.f = (h04 - h03) / (self.Qr * self.eta - h04)
+            self.outlet_fluid = ProductsFluid(f_in + self.f)
 
         return ThermoState(P03, self.T04)
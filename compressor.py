@@ -1,23 +1,30 @@
-from node import Node, ThermoState
+from node import Fluid, Node, ThermoState
 
 
 class Compressor(Node):
-    def __init__(self, inlet: Node, pressure_ratio: float, eta: float = 1.0):
-        super().__init__(inlet, eta)
+    def __init__(
+        self,
+        inlet: Node,
+        pressure_ratio: float,
+        eta: float = 1.0,
+        fluid: Fluid = Fluid(gamma=1.4, R=287),
+    ):
+        super().__init__(inlet, eta, fluid)
         self.pi = pressure_ratio
 
-    def get_outlet_conditions(self) -> ThermoState:
+    def compute_outlet_conditions(self) -> ThermoState:
         # Unpack some variables for readability
         inlet = self.get_inlet_conditions()
         P02 = inlet.P0
         T02 = inlet.T0
-        k = self.fluid.gamma
+        fluid = self.fluid
 
         # Calculate real outlet total pressure
         P03 = self.pi * P02
 
         # Calculate real and isentropic outlet total temperature
-        T03s = T02 * self.pi ** ((k - 1) / k)
-        T03 = T02 + (T03s - T02) / self.eta
+        T03s = fluid.isentropic_T(T02, self.pi)
+        h02 = fluid.h(T02)
+        T03 = fluid.T_from_h(h02 + (fluid.h(T03s) - h02) / self.eta)
 
         return ThermoState(P03, T03)
@@ -0,0 +1,53 @@
+"""Design point shared by the tests (the one in engine.py's testing block)."""
+
+import pytest
+
+from diffuser import InletConditions
+from engine import Engine
+from gas_tables import VariableCpFluid
+
+INLET = dict(p=101325, T=288, u=250)
+DESIGN = dict(
+    pr=8.3,
+    T04=1250,
+    Qr=43e6,
+    eta_d=0.95,
+    eta_c=0.82,
+    eta_b=0.98,
+    eta_t=0.88,
+    eta_n=0.97,
+    mdot_air=20,
+)
+AFTERBURNER = dict(afterburner_included=True, eta_ab=0.95, Qr_ab=43e6, T06=1900)
+FLUIDS = {
+    "perfect": {},
+    "variable-cp": dict(fluid=VariableCpFluid()),
+    "products": dict(fluid=VariableCpFluid(), products=True),
+}
+
+
+@pytest.fixture
+def inputs():
+    """solve_batch arguments of the design point, dry."""
+    return dict(INLET, **DESIGN)
+
+
+@pytest.fixture
+def afterburner():
+    return dict(AFTERBURNER)
+
+
+@pytest.fixture
+def make_engine():
+    """Engine at the design point, with keyword overrides."""
+
+    def make(**kwargs):
+        return Engine(InletConditions(**INLET), **dict(DESIGN, **kwargs))
+
+    return make
+
+
+@pytest.fixture(params=FLUIDS, ids=list(FLUIDS))
+def fluid(request):
+    """Gas model keyword arguments, once per gas model."""
+    return FLUIDS[request.param]
@@ -1,5 +1,4 @@
 from dataclasses import dataclass
-from math import sqrt
 
 from node import Node, ThermoState
 
@@ -12,26 +11,35 @@ class InletConditions:
 
 
 class Diffuser(Node):
+    _inlet_key = None
+
     def get_inlet_conditions(self) -> InletConditions:
         return self.inlet
 
     def get_outlet_conditions(self) -> ThermoState:
+        # InletConditions is a plain dataclass and cannot notify us when its
+        # fields are edited in place, so compare against the values last used.
+        key = (self.inlet.p, self.inlet.T, self.inlet.u)
+        if key != self._inlet_key:
+            self.invalidate()
+            self._inlet_key = key
+        return super().get_outlet_conditions()
+
+    def compute_outlet_conditions(self) -> ThermoState:
         # Unpack some variables for readability
         Pa = self.inlet.p
         Ta = self.inlet.T
-        k = self.fluid.gamma
-        R = self.fluid.R
-
-        # Calculate inlet Mach No.
-        a = sqrt(k * R * Ta)  # [m/s] - Speed of Sound
-        Ma = self.inlet.u / a
+        fluid = self.fluid
 
-        # Calculate real and isentropic outlet total temperature
-        T02 = Ta * (1 + 0.5 * (k - 1) * Ma**2)
-        T02s = self.eta * (T02 - Ta) + Ta
+        # Calculate real and isentropic outlet total temperature from the
+        # stagnation enthalpy; for constant cp this is Ta * (1 + (k-1)/2 * Ma^2)
+        ha = fluid.h(Ta)
+        h02 = ha + 0.5 * self.inlet.u**2
+        T02 = fluid.T_from_h(h02)
+        T02s = fluid.T_from_h(self.eta * (h02 - ha) + ha)
 
         # Calculate real outlet total pressure
-        P02 = Pa * (T02s / Ta) ** (k / (k - 1))
+        P02 = Pa * fluid.pressure_ratio(Ta, T02s)
 
         return ThermoState(P02, T02)
 
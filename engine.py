@@ -4,8 +4,9 @@ from combustor import Combustor
 from turbine import Turbine
 from nozzle import Nozzle
 from afterburner import Afterburner
-from node import ThermoState
+from node import Fluid, ThermoState
 import math
+import profiling
 
 
 class Engine:
@@ -26,10 +27,26 @@ class Engine:
         self.mdot_air = mdot_air
         self.inlet_cond = inlet_cond
 
-        self.diff = Diffuser(inlet_cond, eta=eta_d)
-        self.comp = Compressor(self.diff, pressure_ratio=pr, eta=eta_c)
-        self.comb = Combustor(self.comp, T04=T04, Qr=Qr, eta_b=eta_b)
-        self.turb = Turbine(self.comb, eta_t=eta_t, T03=None, T02=None, f=None)
+        # Working fluid for every component, e.g. gas_tables.VariableCpFluid()
+        fluid = kwargs.get("fluid", Fluid(gamma=1.4, R=287))
+        # Hand combustion products (gas_tables.ProductsFluid) downstream of the
+        # burners instead of the inlet fluid
+        products = kwargs.get("products", False)
+
+        self.diff = Diffuser(inlet_cond, eta=eta_d, fluid=fluid)
+        self.comp = Compressor(self.diff, pressure_ratio=pr, eta=eta_c, fluid=fluid)
+        self.comb = Combustor(
+            self.comp, T04=T04, Qr=Qr, eta_b=eta_b, fluid=fluid, products=products
+        )
+        self.turb = Turbine(
+            self.comb,
+            eta_t=eta_t,
+            T03=None,
+            T02=None,
+            f=None,
+            fluid=fluid,
+            compressor_fluid=fluid,
+        )
 
         self.afterburner_included = kwargs.get("afterburner_included", False)
         eta_ab = kwargs.get("eta_ab")
@@ -37,13 +54,27 @@ class Engine:
             eta_ab = kwargs["eta_ab"]
             Qr_ab = kwargs["Qr_ab"]
             T06 = kwargs["T06"]
-            self.afterburn = Combustor(self.turb, T04=T06, Qr=Qr_ab, eta_b=eta_ab)
+            self.afterburn = Combustor(
+                self.turb,
+                T04=T06,
+                Qr=Qr_ab,
+                eta_b=eta_ab,
+                fluid=fluid,
+                products=products,
+            )
+            self.afterburn._label = "Afterburner"
             self.nozz = Nozzle(eta_n=eta_n, fluid=self.afterburn.fluid)
         else:
             self.afterburn = None
             self.nozz = Nozzle(eta_n=eta_n, fluid=self.turb.fluid)
 
     def solve(self):
+        profile = profiling.active
+        if profile is not None:
+            return profile.measure("Engine.solve", self._solve)
+        return self._solve()
+
+    def _solve(self):
         # Diffuser
         stage02 = self.diff.get_outlet_conditions()
         # Compressor
@@ -55,15 +86,19 @@ class Engine:
         self.turb.T03 = stage03.T0
         self.turb.T02 = stage02.T0
         self.turb.f = f
+        self.turb.fluid = self.comb.outlet_fluid
         stage05 = self.turb.get_outlet_conditions()
         # Afterburner
         if self.afterburner_included and self.afterburn is not None:
+            self.afterburn.fluid = self.turb.fluid
             stage06 = self.afterburn.get_outlet_conditions()
             f_ab = self.afterburn.f
             f_tot = f + f_ab
+            self.nozz.fluid = self.afterburn.outlet_fluid
             self.nozz.set_inlet(stage06)
             afterburner_station = stage06
         else:
+            self.nozz.fluid = self.turb.fluid
             self.nozz.set_inlet(stage05)
             f_ab = 0.0
             f_tot = f
@@ -100,6 +135,136 @@ class Engine:
             result["f_total"] = f_tot
         return result
 
+    def solve_variants(self, **variants):
+        """
+        Solve the engine for many afterburner and nozzle settings at once.
+        variants are any of batch.DOWNSTREAM (eta_n, afterburner_included,
+        eta_ab, Qr_ab, T06) as arrays broadcasting against each other; the
+        others keep the engine's own values. The diffuser to turbine chain is
+        solved once, through the usual component caches, and only the
+        afterburner and nozzle are evaluated per variant. Returns the solve()
+        result dict with arrays of the variant shape in place of floats:
+
+            engine.solve_variants(afterburner_included=[False, True])
+            engine.solve_variants(afterburner_included=True, T06=T06_array)
+        """
+        import batch
+        import numpy as np
+
+        unknown = set(variants) - set(batch.DOWNSTREAM)
+        if unknown:
+            raise TypeError(f"Not downstream inputs: {sorted(unknown)}")
+        settings = dict(
+            eta_n=self.nozz.eta, afterburner_included=self.afterburner_included
+        )
+        if self.afterburn is not None:
+            settings.update(
+                eta_ab=self.afterburn.eta,
+                Qr_ab=self.afterburn.Qr,
+                T06=self.afterburn.T04,
+            )
+        settings.update(variants)
+        if np.any(settings["afterburner_included"]):
+            missing = {"eta_ab", "Qr_ab", "T06"} - set(settings)
+            if missing:
+                raise ValueError(f"Afterburning variants need {sorted(missing)}")
+        else:
+            settings.update(eta_ab=1.0, Qr_ab=1.0, T06=1.0)
+
+        stage02 = self.diff.get_outlet_conditions()
+        stage03 = self.comp.get_outlet_conditions()
+        stage04 = self.comb.get_outlet_conditions()
+        self.turb.T03 = stage03.T0
+        self.turb.T02 = stage02.T0
+        self.turb.f = self.comb.f
+        self.turb.fluid = self.comb.outlet_fluid
+        stage05 = self.turb.get_outlet_conditions()
+        stations = {
+            "P02": stage02.P0,
+            "T02": stage02.T0,
+            "P03": stage03.P0,
+            "T03": stage03.T0,
+            "P04": stage04.P0,
+            "T04": stage04.T0,
+            "P05": stage05.P0,
+            "T05": stage05.T0,
+            "f": self.comb.f,
+            "gas": self.turb.fluid,
+        }
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return batch.downstream(
+                stations,
+                self.inlet_cond.p,
+                self.diff.inlet.u,
+                self.mdot_air,
+                np.asarray(settings["eta_n"], dtype=float),
+                settings["afterburner_included"],
+                np.asarray(settings["eta_ab"], dtype=float),
+                np.asarray(settings["Qr_ab"], dtype=float),
+                np.asarray(settings["T06"], dtype=float),
+                self.comb.products,
+            )
+
+    def compile(self):
+        """
+        Flatten the component chain into one generated function (see plan.py)
+        that gives the same result as solve(). Its arguments are the engine
+        parameters (p, T, u, pr, T04, ..., mdot_air), defaulting to the values
+        at compile time, so new inputs are passed as keywords:
+
+            run = engine.compile()
+            run(pr=12.0, T04=1400)
+
+        Changes to the components after compiling are not seen by the plan.
+        """
+        import plan
+
+        return plan.compile_engine(self)
+
+    @staticmethod
+    def solve_batch(
+        inlet_cond,
+        pr,
+        T04,
+        Qr,
+        eta_d,
+        eta_c,
+        eta_b,
+        eta_t,
+        eta_n,
+        mdot_air,
+        **kwargs,
+    ):
+        """
+        Vectorized counterpart of Engine(...).solve(). Takes the same arguments
+        as the constructor, but any of them (including the fields of inlet_cond)
+        may be NumPy arrays. Returns the solve() result dict with arrays in
+        place of floats.
+        """
+        # Imported on first use so scalar solves never load NumPy
+        import batch
+
+        return batch.solve_batch(
+            inlet_cond.p,
+            inlet_cond.T,
+            inlet_cond.u,
+            pr,
+            T04,
+            Qr,
+            eta_d,
+            eta_c,
+            eta_b,
+            eta_t,
+            eta_n,
+            mdot_air,
+            afterburner_included=kwargs.get("afterburner_included", False),
+            eta_ab=kwargs.get("eta_ab", 1.0),
+            Qr_ab=kwargs.get("Qr_ab", 1.0),
+            T06=kwargs.get("T06", 1.0),
+            fluid=kwargs.get("fluid", Fluid(gamma=1.4, R=287)),
+            products=kwargs.get("products", False),
+        )
+
 
 # Testing block
 if __name__ == "__main__":
@@ -0,0 +1,275 @@
+import os
+import tempfile
+import warnings
+
+import numpy as np
+
+from node import Fluid
+
+# Specific heat of dry air, cp [kJ/(kg*K)] = sum(A[i] * (T/1000)**i),
+# Walsh & Fletcher, "Gas Turbine Performance", valid 200-2000 K
+AIR_CP = (
+    0.992313, 0.236688, -1.852148, 6.083152, -8.893933,
+    7.097112, -3.234725, 0.794571, -0.081873,
+)  # fmt: skip
+
+# Additional cp of kerosene combustion products, added as
+# f/(1 + f) * sum(B[i] * (T/1000)**i) [kJ/(kg*K)] for fuel-air ratio f
+PRODUCTS_CP = (
+    -0.718874, 8.747481, -15.863157, 17.254096,
+    -10.233795, 3.081778, -0.361112, -0.003919,
+)  # fmt: skip
+
+# Bump whenever the tables change so stale disk caches are rebuilt
+TABLE_VERSION = 2
+# The validity range of the cp polynomials; lookups outside it are clamped
+# with a TableRangeWarning
+T_MIN = 200.0  # [K]
+T_MAX = 2000.0  # [K]
+DT = 0.5  # [K]
+N_INVERSE = 8192  # points in the inverse T(h) and T(s0) tables
+F_MAX = 0.1  # [1] fuel-air ratio range of the products tables
+DF = 0.0025  # [1]
+NEWTON_ITERATIONS = 4  # for the products inverse relations
+
+
+def cache_dir() -> str:
+    default = os.path.join(os.path.expanduser("~"), ".cache", "turbojet")
+    return os.environ.get("TURBOJET_CACHE_DIR", default)
+
+
+class TableRangeWarning(UserWarning):
+    """A gas property was looked up outside its table and clamped."""
+
+
+def _clamp(pos, last, warn=True):
+    """pos clipped to [0, last], warning if any (non-NaN) value was outside."""
+    if warn:
+        if np.ndim(pos) == 0:
+            outside = pos < 0 or pos > last
+        else:
+            outside = (pos < 0).any() or (pos > last).any()
+        if outside:
+            warnings.warn(
+                f"Gas property lookup outside the tables ({T_MIN:g}-{T_MAX:g} K,"
+                f" fuel-air ratio 0-{F_MAX:g}); values were clamped",
+                TableRangeWarning,
+                stacklevel=3,
+            )
+    return np.clip(pos, 0, last)
+
+
+def lookup(x, x0, dx, table, warn=True):
+    """
+    Linear interpolation in a table sampled at x0, x0 + dx, ... Values beyond
+    the ends are clamped, with a TableRangeWarning unless warn is False.
+    """
+    pos = _clamp((x - x0) / dx, len(table) - 1, warn)
+    i = np.minimum(np.asarray(pos).astype(np.intp), len(table) - 2)
+    w = pos - i
+    return table[i] + w * (table[i + 1] - table[i])
+
+
+def _polynomial_h_s0(coeffs, T):
+    """
+    Enthalpy h(T) [J/kg] with h(0 K) = 0 and standard-state entropy s0(T)
+    [J/(kg*K)] for a cp polynomial in T/1000, integrated analytically.
+    """
+    tz = T / 1000
+    h = sum(a * tz ** (i + 1) / (i + 1) for i, a in enumerate(coeffs)) * 1e6
+    s0 = coeffs[0] * np.log(tz) + sum(a * tz**i / i for i, a in enumerate(coeffs) if i)
+    s0 = s0 * 1e3
+    return h, s0
+
+
+def _inverse(y, x, n):
+    """Resample the monotonic relation y(x) as x on a uniform grid of y."""
+    y_grid = np.linspace(y[0], y[-1], n)
+    return y_grid[0], y_grid[1] - y_grid[0], np.interp(y_grid, y, x)
+
+
+def _build_air_tables() -> dict:
+    T = np.arange(T_MIN, T_MAX + DT / 2, DT)
+    cp = sum(a * (T / 1000) ** i for i, a in enumerate(AIR_CP)) * 1e3
+    h, s0 = _polynomial_h_s0(AIR_CP, T)
+    h0, dh, T_of_h = _inverse(h, T, N_INVERSE)
+    s00, ds0, T_of_s0 = _inverse(s0, T, N_INVERSE)
+    return dict(
+        cp=cp, h=h, s0=s0, T_of_h=T_of_h, T_of_s0=T_of_s0,
+        inverse=np.array([h0, dh, s00, ds0]),
+    )  # fmt: skip
+
+
+def _build_products_tables() -> dict:
+    T = np.arange(T_MIN, T_MAX + DT / 2, DT)[:, None]
+    f = np.arange(0.0, F_MAX + DF / 2, DF)[None, :]
+    g = f / (1 + f)
+    cp_air = sum(a * (T / 1000) ** i for i, a in enumerate(AIR_CP)) * 1e3
+    cp_fuel = sum(b * (T / 1000) ** i for i, b in enumerate(PRODUCTS_CP)) * 1e3
+    h_air, s0_air = _polynomial_h_s0(AIR_CP, T)
+    h_fuel, s0_fuel = _polynomial_h_s0(PRODUCTS_CP, T)
+    return dict(
+        cp=cp_air + g * cp_fuel,
+        h=h_air + g * h_fuel,
+        s0=s0_air + g * s0_fuel,
+        R=(287.05 - 0.00990 * f + 1e-7 * f**2).ravel(),
+    )
+
+
+def _cached(name, build):
+    """Load tables from the disk cache, building and saving them on a miss."""
+    path = os.path.join(cache_dir(), f"{name}_v{TABLE_VERSION}.npz")
+    try:
+        with np.load(path) as data:
+            return dict(data)
+    except (OSError, ValueError):
+        pass
+    tables = build()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so concurrent builders never see a
+        # partial cache file
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".npz")
+        with os.fdopen(fd, "wb") as file:
+            np.savez(file, **tables)
+        os.replace(tmp, path)
+    except OSError:
+        pass  # Read-only home: keep the tables in memory only
+    return tables
+
+
+_AIR_TABLES = None
+
+
+def air_tables() -> dict:
+    global _AIR_TABLES
+    if _AIR_TABLES is None:
+        _AIR_TABLES = _cached("air", _build_air_tables)
+    return _AIR_TABLES
+
+
+_PRODUCTS_TABLES = None
+
+
+def products_tables() -> dict:
+    global _PRODUCTS_TABLES
+    if _PRODUCTS_TABLES is None:
+        _PRODUCTS_TABLES = _cached("products", _build_products_tables)
+    return _PRODUCTS_TABLES
+
+
+class VariableCpFluid(Fluid):
+    """
+    Thermally perfect air: cp, h and s0 vary with temperature and come from
+    precomputed tables (built once and cached on disk). gamma and cp hold the
+    values at T_ref for code that needs a single representative value.
+    """
+
+    def __init__(self, R: float = 287.05, T_ref: float = 288.15):
+        self.tables = air_tables()
+        self.T_ref = T_ref
+        cp = float(self.cp_at(T_ref))
+        super().__init__(gamma=cp / (cp - R), R=R)
+
+    def __reduce__(self):
+        # Workers rebuild from their own cached tables instead of pickling them
+        return (type(self), (self.R, self.T_ref))
+
+    def cp_at(self, T):
+        return lookup(T, T_MIN, DT, self.tables["cp"])
+
+    def gamma_at(self, T):
+        cp = self.cp_at(T)
+        return cp / (cp - self.R)
+
+    def h(self, T):
+        return lookup(T, T_MIN, DT, self.tables["h"])
+
+    def T_from_h(self, h):
+        h0, dh = self.tables["inverse"][:2]
+        return lookup(h, h0, dh, self.tables["T_of_h"])
+
+    def s0(self, T):
+        return lookup(T, T_MIN, DT, self.tables["s0"])
+
+    def isentropic_T(self, T1, pressure_ratio):
+        s0, ds0 = self.tables["inverse"][2:]
+        target = self.s0(T1) + self.R * np.log(pressure_ratio)
+        return lookup(target, s0, ds0, self.tables["T_of_s0"])
+
+    def pressure_ratio(self, T1, T2s):
+        return np.exp((self.s0(T2s) - self.s0(T1)) / self.R)
+
+
+class ProductsFluid(Fluid):
+    """
+    Kerosene combustion products at fuel-air ratio f, with cp, h and s0 from
+    2-D (T, f) tables (built once and cached on disk). f may be an array, one
+    fuel-air ratio per point, for the batch path. The position of f in the
+    table is computed once here, so each lookup only interpolates in T.
+    Inverse relations are solved by Newton iteration from the air tables.
+    """
+
+    def __init__(self, f, T_ref: float = 288.15):
+        self.tables = products_tables()
+        self.f = f
+        self.T_ref = T_ref
+        n_f = self.tables["h"].shape[1]
+        pos = _clamp(np.asarray(f, dtype=float) / DF, n_f - 1)
+        self._j = np.minimum(pos.astype(np.intp), n_f - 2)
+        self._wf = pos - self._j
+        R = lookup(f, 0.0, DF, self.tables["R"], warn=False)  # warned above
+        cp = self.cp_at(T_ref)
+        super().__init__(gamma=cp / (cp - R), R=R)
+
+    def __reduce__(self):
+        return (type(self), (self.f, self.T_ref))
+
+    def __eq__(self, other):
+        return type(other) is type(self) and np.array_equal(self.f, other.f)
+
+    __hash__ = None
+
+    def _lookup(self, name, T):
+        table = self.tables[name]
+        pos = _clamp((T - T_MIN) / DT, len(table) - 1)
+        i = np.minimum(np.asarray(pos).astype(np.intp), len(table) - 2)
+        w = pos - i
+        j, wf = self._j, self._wf
+        lo = table[i, j] + w * (table[i + 1, j] - table[i, j])
+        hi = table[i, j + 1] + w * (table[i + 1, j + 1] - table[i, j + 1])
+        return lo + wf * (hi - lo)
+
+    def cp_at(self, T):
+        return self._lookup("cp", T)
+
+    def gamma_at(self, T):
+        cp = self.cp_at(T)
+        return cp / (cp - self.R)
+
+    def h(self, T):
+        return self._lookup("h", T)
+
+    def T_from_h(self, h):
+        air = air_tables()
+        # Starting guess only. Products have the higher cp, so at equal h they
+        # are cooler than air and the guess lies above T, past the air table
+        # near T_MAX (hence no warning); Newton converges from there
+        T = lookup(h, *air["inverse"][:2], air["T_of_h"], warn=False)
+        for _ in range(NEWTON_ITERATIONS):
+            T = T - (self.h(T) - h) / self.cp_at(T)
+        return T
+
+    def s0(self, T):
+        return self._lookup("s0", T)
+
+    def isentropic_T(self, T1, pressure_ratio):
+        target = self.s0(T1) + self.R * np.log(pressure_ratio)
+        k = self.gamma_at(T1)
+        T = T1 * pressure_ratio ** ((k - 1) / k)
+        for _ in range(NEWTON_ITERATIONS):
+            T = T - (self.s0(T) - target) * T / self.cp_at(T)
+        return T
+
+    def pressure_ratio(self, T1, T2s):
+        return np.exp((self.s0(T2s) - self.s0(T1)) / self.R)
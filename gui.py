@@ -1,4 +1,7 @@
 import sys
+import threading
+import traceback
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
 from PyQt5.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -12,14 +15,121 @@ from PyQt5.QtWidgets import (
     QGroupBox,
     QGridLayout,
     QComboBox,
+    QProgressBar,
 )
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-import matplotlib.colors as mcolors
 import random
 
+from cache import SolveCache
 from engine import Engine
 from diffuser import InletConditions
-from plot_engine import plot_engine_results
+from plot_engine import (
+    CARPET_STYLES,
+    CONTOUR_VARIABLES,
+    PLOT_TYPES,
+    EnginePlotter,
+    preload,
+)
+
+# Matplotlib and CoolProp are imported on first use rather than here, so the
+# window appears without waiting for them
+
+
+class TaskSignals(QObject):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+
+class Task(QRunnable):
+    """
+    Runs fn(progress, cancelled) on a pool thread. progress(done, total)
+    reports back to the UI thread; cancelled() tells fn to stop early.
+    """
+
+    def __init__(self, fn):
+        super().__init__()
+        self.fn = fn
+        self.signals = TaskSignals()
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+    def run(self):
+        try:
+            result = self.fn(self.signals.progress.emit, self.cancelled)
+        except Exception as e:
+            traceback.print_exc()
+            self.signals.error.emit(str(e))
+        else:
+            self.signals.finished.emit(result)
+
+
+class LatestTaskRunner(QObject):
+    """
+    Runs one Task at a time on its own thread pool. Submitting while a task
+    is running cancels it and queues the new one, replacing any task already
+    waiting, so rapid repeated requests collapse into the latest one.
+    Callbacks run on the UI thread and only for tasks that were not cancelled.
+    """
+
+    busy = pyqtSignal(bool)
+    progress = pyqtSignal(int, int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.running = None
+        self.pending = None
+
+    def submit(self, fn, on_done, on_error):
+        self.pending = (Task(fn), on_done, on_error)
+        if self.running is None:
+            self._start_pending()
+        else:
+            self._cancel_running()
+
+    def cancel(self):
+        """Drop the queued task and cancel the running one without waiting."""
+        self.pending = None
+        if self.running is not None:
+            self._cancel_running()
+
+    def _cancel_running(self):
+        # Its result is dropped in _done; its progress is ignored from now on
+        task = self.running[0]
+        if not task.cancelled():
+            task.cancel()
+            task.signals.progress.disconnect(self.progress)
+
+    def _start_pending(self):
+        self.running, self.pending = self.pending, None
+        task = self.running[0]
+        task.signals.progress.connect(self.progress)
+        task.signals.finished.connect(self._finished)
+        task.signals.error.connect(self._error)
+        self.busy.emit(True)
+        self.pool.start(task)
+
+    def _done(self, callback_index, value):
+        task, *callbacks = self.running
+        self.running = None
+        if not task.cancelled():
+            callbacks[callback_index](value)
+        if self.pending is not None:
+            self._start_pending()
+        else:
+            self.busy.emit(False)
+
+    def _finished(self, result):
+        self._done(0, result)
+
+    def _error(self, message):
+        self._done(1, message)
 
 
 class EngineGUI(QMainWindow):
@@ -99,9 +209,20 @@ class EngineGUI(QMainWindow):
 
         # Plot settings drop down
         self.plot_type = QComboBox()
-        self.plot_type.addItems(["TS Diagram", "Station Diagram", "Performance Metrics"])
+        self.plot_type.addItems(PLOT_TYPES)
         left_panel.addWidget(self.plot_type)
 
+        # Carpet plot display settings; changing them only redraws the chart
+        carpet_layout = QHBoxLayout()
+        self.carpet_style = QComboBox()
+        self.carpet_style.addItems(CARPET_STYLES)
+        self.contour_variable = QComboBox()
+        self.contour_variable.addItems(list(CONTOUR_VARIABLES))
+        for combo in (self.carpet_style, self.contour_variable):
+            combo.currentTextChanged.connect(self.carpet_settings_changed)
+            carpet_layout.addWidget(combo)
+        left_panel.addLayout(carpet_layout)
+
         # Calculate Button
         self.calc_button = QPushButton("Calculate")
         self.calc_button.clicked.connect(self.calculate)
@@ -113,6 +234,27 @@ class EngineGUI(QMainWindow):
         left_panel.addWidget(self.plot_button)
 
         self.results_list = []
+        self.plotter = EnginePlotter()
+
+        # Solving and rendering happen on worker threads
+        self.solver = LatestTaskRunner(self)
+        # Re-clicking Calculate on unchanged inputs reuses the earlier result
+        self.cache = SolveCache(maxsize=256)
+        self.renderer = LatestTaskRunner(self)
+        for runner in (self.solver, self.renderer):
+            runner.busy.connect(self.set_busy)
+            runner.progress.connect(self.show_progress)
+
+        # Progress bar and cancel button for background work
+        progress_layout = QHBoxLayout()
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setVisible(False)
+        progress_layout.addWidget(self.progress_bar)
+        self.cancel_button = QPushButton("Cancel")
+        self.cancel_button.setEnabled(False)
+        self.cancel_button.clicked.connect(self.cancel)
+        progress_layout.addWidget(self.cancel_button)
+        left_panel.addLayout(progress_layout)
 
         # Clear Button
         self.clear_button = QPushButton("Clear Results")
@@ -136,7 +278,8 @@ class EngineGUI(QMainWindow):
         # Right panel: plots
         right_panel = QVBoxLayout()
 
-        self.canvas = None
+        # One persistent canvas per plot type, only the selected one is shown
+        self.canvases = {}
         self.plot_widget = QWidget()
         self.plot_layout = QVBoxLayout()
         self.plot_widget.setLayout(self.plot_layout)
@@ -147,9 +290,30 @@ class EngineGUI(QMainWindow):
         layout.addWidget(right_widget)
 
     def clear(self):
+        # Without waiting: a solve or render still running has its result
+        # dropped when it arrives, and the plotter ignores a prepare that
+        # started before the clear
+        self.cancel()
         self.results_list = []
+        self.plotter.clear()
         self.update_plots()
 
+    def cancel(self):
+        self.solver.cancel()
+        self.renderer.cancel()
+
+    def set_busy(self, busy):
+        # Either runner may still be busy when the other one goes idle
+        busy = self.solver.running is not None or self.renderer.running is not None
+        self.progress_bar.setVisible(busy)
+        self.cancel_button.setEnabled(busy)
+        # Busy indicator until a task reports real progress
+        self.progress_bar.setRange(0, 0)
+
+    def show_progress(self, done, total):
+        self.progress_bar.setRange(0, total)
+        self.progress_bar.setValue(done)
+
     def afterburner_toggled(self, checked):
         if checked:
             self.afterburner_toggle.setText("ON")
@@ -209,13 +373,29 @@ class EngineGUI(QMainWindow):
                     afterburner_included=True
                 )
 
-            results = engine.solve()
+            inlet = self.inlet
+            self.solver.submit(
+                lambda progress, cancelled: self.cache.solve(engine),
+                lambda results: self.show_results(results, inlet, mdot_air),
+                self.show_error,
+            )
+
+        except Exception as e:
+            self.show_error(str(e))
+
+    def show_error(self, message):
+        self.result_text.setText(f"Error: {message}")
+
+    def show_results(self, results, inlet, mdot_air):
+        try:
+            import matplotlib.colors as mcolors
 
             color_names = list(mcolors.TABLEAU_COLORS.keys())
             color = random.choice(color_names)
             results["color"] = color
-            
+
             self.results_list.append(results)
+            self.plotter.add_run(results, inlet)
 
             # Display results
             output = "=" * 50 + "\n"
@@ -241,24 +421,67 @@ class EngineGUI(QMainWindow):
             self.result_text.setText(output)
 
         except Exception as e:
-            self.result_text.setText(f"Error: {str(e)}")
+            self.show_error(str(e))
+
+    def engine_params(self) -> dict:
+        """The parameters in the input fields, named as in sweep.PARAMETERS."""
+        keys = (
+            "p", "T", "u", "pr", "T04", "Qr", "eta_d", "eta_c", "eta_b", "eta_t",
+            "eta_n", "T06", "eta_ab", "Qr_ab",
+        )  # fmt: skip
+        params = {key: float(self.inputs[key].text()) for key in keys}
+        params["mdot_air"] = float(self.inputs["mdot"].text())
+        params["afterburner_included"] = self.afterburner_toggle.isChecked()
+        return params
+
+    def carpet_settings_changed(self, _):
+        if self.plot_type.currentText() == "Carpet Plot":
+            self.update_plots()
 
     def update_plots(self):
-        # Update plots
-        if self.canvas:
-            self.plot_layout.removeWidget(self.canvas)
-            self.canvas.deleteLater()
-
-        fig = plot_engine_results(
-            self.results_list, self.inlet, plot_type=self.plot_type.currentText()
+        # Station data, large-data arrays and the carpet grid are computed on
+        # the render thread; matplotlib is not thread-safe, so every artist
+        # change and draw happens back here on the UI thread
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
+
+        plot_type = self.plot_type.currentText()
+        if plot_type == "Carpet Plot":
+            # The grid is cached per parameter set, so only a change of
+            # parameters evaluates it again
+            try:
+                self.plotter.carpet_params = self.engine_params()
+            except ValueError as e:
+                self.show_error(str(e))
+                return
+            self.plotter.carpet_style = self.carpet_style.currentText()
+            self.plotter.contour_variable = self.contour_variable.currentText()
+        if plot_type not in self.canvases:
+            fig = self.plotter.create_figure(plot_type)
+            self.canvases[plot_type] = FigureCanvasQTAgg(fig)
+            self.plot_layout.addWidget(self.canvases[plot_type])
+
+        def prepare(progress, cancelled):
+            self.plotter.prepare(plot_type, progress=progress, cancelled=cancelled)
+
+        self.renderer.submit(
+            prepare, lambda _: self.show_canvas(plot_type), self.show_error
         )
-        self.canvas = FigureCanvas(fig)
-        self.plot_layout.addWidget(self.canvas)
+
+    def show_canvas(self, plot_type):
+        try:
+            self.plotter.figure(plot_type)
+        except Exception as e:
+            self.show_error(str(e))
+        for key, canvas in self.canvases.items():
+            canvas.setVisible(key == plot_type)
+        self.canvases[plot_type].draw_idle()
+
 
 def main():
     app = QApplication(sys.argv)
     window = EngineGUI()
     window.show()
+    threading.Thread(target=preload, daemon=True).start()
     sys.exit(app.exec_())
 
 
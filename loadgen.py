@@ -0,0 +1,184 @@
+"""
+Load generator for server.py, run on the same machine.
+
+Each of --clients concurrent clients keeps one keep-alive connection open and
+sends single-case POST /solve requests back to back (a closed loop) for
+--duration seconds. Cases vary pr and T04 randomly about a nominal engine.
+Reports throughput, latency percentiles, refusals (503) and the server's own
+batch statistics.
+
+    python loadgen.py --spawn                   # start a server, load it, stop it
+    python loadgen.py --port 8765 --clients 256
+    python loadgen.py --spawn --window-ms 0     # compare: no batching window
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+NOMINAL = dict(
+    p=101325,
+    T=288,
+    u=250,
+    pr=8.3,
+    T04=1250,
+    Qr=43e6,
+    eta_d=0.95,
+    eta_c=0.82,
+    eta_b=0.98,
+    eta_t=0.88,
+    eta_n=0.97,
+    mdot_air=20,
+)
+
+
+async def _connect(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+async def request(reader, writer, method, path, payload=None):
+    """Send one HTTP request on an open connection; (status, decoded body)."""
+    body = b"" if payload is None else json.dumps(payload).encode()
+    head = (
+        f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+    )
+    writer.write(head.encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while (line := await reader.readline()) not in (b"\r\n", b""):
+        key, _, value = line.decode("latin-1").partition(":")
+        if key.strip().lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(args, deadline, latencies, counts, seed):
+    rng = random.Random(seed)
+    reader, writer = await _connect(args)
+    try:
+        while time.perf_counter() < deadline:
+            case = dict(
+                NOMINAL, pr=rng.uniform(4, 20), T04=rng.uniform(1100, 1500)
+            )
+            start = time.perf_counter()
+            status, _ = await request(reader, writer, "POST", "/solve", case)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            counts[status] = counts.get(status, 0) + 1
+            if status == 503:
+                await asyncio.sleep(0.01)  # back off as asked
+    finally:
+        writer.close()
+
+
+async def wait_ready(args, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        try:
+            reader, writer = await _connect(args)
+        except OSError:
+            if time.perf_counter() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+            continue
+        await request(reader, writer, "GET", "/health")
+        writer.close()
+        return
+
+
+async def generate(args) -> dict:
+    await wait_ready(args)
+    latencies, counts = [], {}
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(
+        *(
+            client(args, deadline, latencies, counts, args.seed + i)
+            for i in range(args.clients)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    reader, writer = await _connect(args)
+    _, server = await request(reader, writer, "GET", "/metrics")
+    writer.close()
+
+    latencies = np.array(latencies) * 1e3
+    p50, p95, p99 = (
+        np.percentile(latencies, (50, 95, 99)) if len(latencies) else (0, 0, 0)
+    )
+    return {
+        "clients": args.clients,
+        "duration_s": elapsed,
+        "ok": counts.get(200, 0),
+        "refused": counts.get(503, 0),
+        "errors": sum(n for status, n in counts.items() if status not in (200, 503)),
+        "throughput_per_s": counts.get(200, 0) / elapsed,
+        "latency_ms": {"p50": p50, "p95": p95, "p99": p99},
+        "server": server,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to this Unix socket instead")
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=5.0, help="[s]")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--spawn", action="store_true", help="start server.py for the run"
+    )
+    parser.add_argument(
+        "--window-ms", type=float, default=2.0, help="window of a spawned server"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON only")
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.spawn:
+        where = ["--unix", args.unix] if args.unix else ["--port", str(args.port)]
+        server = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+        process = subprocess.Popen(
+            [sys.executable, server, *where, "--window-ms", str(args.window_ms)],
+            stdout=subprocess.DEVNULL,
+        )
+    try:
+        report = asyncio.run(generate(args))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    latency = report["latency_ms"]
+    server = report["server"]
+    print(
+        f"{report['ok']} requests from {report['clients']} clients in"
+        f" {report['duration_s']:.1f} s: {report['throughput_per_s']:.0f}/s"
+    )
+    print(
+        f"latency p50 {latency['p50']:.2f} ms, p95 {latency['p95']:.2f} ms,"
+        f" p99 {latency['p99']:.2f} ms"
+    )
+    print(
+        f"refused {report['refused']}, errors {report['errors']};"
+        f" server batches {server['batches']}, mean size {server['mean_batch']:.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
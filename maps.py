@@ -0,0 +1,109 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Corrected speed and beta grids of the generic maps. Beta is the auxiliary
+# map coordinate along each speed line: 0 at choke, 1 at surge (compressor)
+# or at the highest pressure ratio (turbine).
+GENERIC_SPEEDS = np.arange(0.4, 1.1001, 0.05)
+GENERIC_BETAS = np.linspace(0.0, 1.0, 21)
+
+
+@dataclass
+class ComponentMap:
+    """
+    Compressor or turbine map: corrected mass flow, pressure ratio and
+    isentropic efficiency tabulated on uniform grids of relative corrected
+    speed and beta. Lookups interpolate bilinearly and extrapolate linearly
+    past the edges, so the map stays smooth for Newton iterations that step
+    slightly outside it. All lookups are vectorized.
+    """
+
+    speeds: np.ndarray  # [1] uniform
+    betas: np.ndarray  # [1] uniform
+    flow: np.ndarray  # [kg/s] corrected, shape (len(speeds), len(betas))
+    pr: np.ndarray  # [1]
+    eta: np.ndarray  # [1]
+
+    def __post_init__(self):
+        self.speeds = np.asarray(self.speeds, dtype=float)
+        self.betas = np.asarray(self.betas, dtype=float)
+        # One (speed, beta, 3) table so a lookup gathers all three at once
+        self._table = np.stack([self.flow, self.pr, self.eta], axis=-1)
+
+    def _index(self, x, grid):
+        pos = (x - grid[0]) / (grid[1] - grid[0])
+        i = np.clip(np.floor(pos).astype(np.intp), 0, len(grid) - 2)
+        return i, pos - i
+
+    def __call__(self, speed, beta):
+        """Corrected flow, pressure ratio and efficiency at (speed, beta)."""
+        speed, beta = np.broadcast_arrays(
+            np.asarray(speed, dtype=float), np.asarray(beta, dtype=float)
+        )
+        i, wi = self._index(speed, self.speeds)
+        j, wj = self._index(beta, self.betas)
+        wi, wj = wi[..., None], wj[..., None]
+        t = self._table
+        lo = t[i, j] + wj * (t[i, j + 1] - t[i, j])
+        hi = t[i + 1, j] + wj * (t[i + 1, j + 1] - t[i + 1, j])
+        values = lo + wi * (hi - lo)
+        return values[..., 0], values[..., 1], values[..., 2]
+
+    def scaled(self, speed, beta, flow, pr, eta) -> "ComponentMap":
+        """
+        Copy of the map scaled so that (speed, beta) gives exactly the design
+        flow, pressure ratio and efficiency. As usual for map scaling, the
+        pressure ratio scales as pr - 1 and efficiency and flow by a factor.
+        """
+        flow0, pr0, eta0 = (float(v) for v in self(speed, beta))
+        return ComponentMap(
+            self.speeds,
+            self.betas,
+            self.flow * (flow / flow0),
+            1 + (self.pr - 1) * ((pr - 1) / (pr0 - 1)),
+            self.eta * (eta / eta0),
+        )
+
+    def save(self, path):
+        np.savez(
+            path,
+            speeds=self.speeds,
+            betas=self.betas,
+            flow=self.flow,
+            pr=self.pr,
+            eta=self.eta,
+        )
+
+    @classmethod
+    def load(cls, path) -> "ComponentMap":
+        with np.load(path) as data:
+            return cls(**{key: data[key] for key in data.files})
+
+
+def generic_compressor_map() -> ComponentMap:
+    """
+    Smooth normalized compressor map with design point (speed 1, beta 0.5) at
+    flow 1, pressure ratio 2 and efficiency 1, meant to be scaled to an
+    engine's design point. Flow and pressure ratio rise with speed, pressure
+    ratio rises and flow falls from choke to surge, and efficiency peaks on
+    the design speed line mid-way between the two.
+    """
+    N, beta = np.meshgrid(GENERIC_SPEEDS, GENERIC_BETAS, indexing="ij")
+    flow = N**1.5 * (1.05 - 0.1 * beta)
+    pr = 1 + N**2 * (0.75 + 0.5 * beta)
+    eta = 1 - 0.4 * (N - 1) ** 2 - 0.3 * (beta - 0.5) ** 2
+    return ComponentMap(GENERIC_SPEEDS, GENERIC_BETAS, flow, pr, eta)
+
+
+def generic_turbine_map() -> ComponentMap:
+    """
+    Normalized turbine map with design point (speed 1, beta 0.8). The flow
+    approaches its choked value as the pressure ratio (beta) rises and hardly
+    depends on speed, as for a choked nozzle guide vane.
+    """
+    N, beta = np.meshgrid(GENERIC_SPEEDS, GENERIC_BETAS, indexing="ij")
+    flow = (1 - 0.15 * (1 - beta) ** 2) * (1 - 0.02 * (N - 1))
+    pr = 1 + (0.4 + 0.75 * beta) * (0.9 + 0.1 * N)
+    eta = 1 - 0.3 * (N - 1) ** 2 - 0.2 * (beta - 0.8) ** 2
+    return ComponentMap(GENERIC_SPEEDS, GENERIC_BETAS, flow, pr, eta)
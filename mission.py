@@ -0,0 +1,237 @@
+"""
+Mission analysis: the engine evaluated along a time series of flight
+conditions, with fuel burn and impulse integrated over time.
+
+A mission is given as arrays of time, altitude, Mach number, throttle and
+afterburner state, one entry per time step (see profile() for building them
+from segments). Consecutive steps with the same conditions form one run and
+identical runs are solved once, so cruise and loiter segments cost a single
+solve; a Mission also remembers every condition it has solved, so rerunning
+an edited mission only solves what changed. Everything left is solved in one
+solve_batch call.
+
+Throttle scales the turbine inlet temperature between idle_T04 (throttle 0)
+and the engine's T04 (throttle 1). With flow_lapse the air mass flow follows
+the usual constant corrected flow assumption, mdot_air * delta02 / sqrt(
+theta02) with the diffuser exit conditions relative to sea level; otherwise
+mdot_air is taken as is.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from atmosphere import P_SL, T_SL, inlet_conditions
+from batch import to_columns
+from engine import Engine
+
+KEYS = ("altitude", "mach", "throttle", "afterburner")
+# Result columns kept per solved condition
+COLUMNS = ("P02", "T02", "f_total", "Thrust", "TSFC")
+
+
+@dataclass
+class Segment:
+    duration: float  # [s]
+    altitude: tuple  # [m] at start and end, linear in between (or one value)
+    mach: tuple  # [1] at start and end (or one value)
+    throttle: float = 1.0  # [1]
+    afterburner: bool = False
+    name: str = ""
+
+
+def profile(segments, dt: float = 1.0) -> dict:
+    """
+    Time series sampled every dt seconds through segments, as keyword
+    arguments for Mission.run. Each segment contributes its start, and the
+    last one its end.
+    """
+    parts = {key: [] for key in ("time",) + KEYS}
+    start = 0.0
+    for i, segment in enumerate(segments):
+        last = i == len(segments) - 1
+        steps = max(int(round(segment.duration / dt)), 1)
+        s = np.linspace(0.0, 1.0, steps + 1)[: None if last else -1]
+        parts["time"].append(start + s * segment.duration)
+        for key in ("altitude", "mach"):
+            a, b = np.broadcast_to(getattr(segment, key), 2)
+            parts[key].append(a + s * (b - a))
+        parts["throttle"].append(np.full(len(s), float(segment.throttle)))
+        parts["afterburner"].append(np.full(len(s), bool(segment.afterburner)))
+        start += segment.duration
+    return {key: np.concatenate(values) for key, values in parts.items()}
+
+
+@dataclass
+class MissionResult:
+    time: np.ndarray  # [s]
+    Thrust: np.ndarray  # [N]
+    mdot_air: np.ndarray  # [kg/s]
+    mdot_fuel: np.ndarray  # [kg/s], main burner plus afterburner when lit
+    TSFC: np.ndarray  # [kg/(N*s)]
+    fuel: np.ndarray  # [kg] burnt since the start
+    impulse: np.ndarray  # [N*s] since the start
+    solved: int  # conditions solved in this run
+    reused: int  # time steps answered without a new solve
+    failed: int  # time steps whose solve failed (NaN, counted as zero)
+
+    @property
+    def total_fuel(self) -> float:
+        return float(self.fuel[-1])
+
+    @property
+    def total_impulse(self) -> float:
+        return float(self.impulse[-1])
+
+
+def _cumulative_trapezoid(y, t):
+    out = np.zeros_like(t)
+    np.cumsum(0.5 * (y[1:] + y[:-1]) * np.diff(t), out=out[1:])
+    return out
+
+
+class Mission:
+    """
+    Evaluates one engine along missions. engine_params are the Engine
+    constructor arguments other than inlet_cond, as for
+    atmosphere.envelope; T06, eta_ab and Qr_ab are used where the
+    afterburner is lit.
+    """
+
+    def __init__(self, idle_T04=None, flow_lapse=True, **engine_params):
+        self.engine_params = dict(engine_params)
+        self.engine_params.pop("afterburner_included", None)
+        self.T04 = self.engine_params.pop("T04")
+        self.mdot_air = self.engine_params.pop("mdot_air")
+        self.idle_T04 = 0.6 * self.T04 if idle_T04 is None else idle_T04
+        self.flow_lapse = flow_lapse
+        # Every condition solved so far, sorted by key, with its result columns
+        self._keys = np.empty((0, len(KEYS)))
+        self._columns = {name: np.empty(0) for name in COLUMNS}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def clear(self):
+        self._keys = np.empty((0, len(KEYS)))
+        self._columns = {name: np.empty(0) for name in COLUMNS}
+
+    def _solve(self, keys):
+        altitude, mach, throttle, afterburner = keys.T
+        params = dict(self.engine_params)
+        fluid = params.get("fluid")
+        inlet = (
+            inlet_conditions(altitude, mach)
+            if fluid is None
+            else inlet_conditions(altitude, mach, fluid)
+        )
+        with np.errstate(all="ignore"):
+            result = Engine.solve_batch(
+                inlet,
+                T04=self.idle_T04 + throttle * (self.T04 - self.idle_T04),
+                mdot_air=1.0,  # everything is scaled by the actual flow later
+                afterburner_included=afterburner.astype(bool),
+                **params,
+            )
+        columns = to_columns(result)
+        return {name: columns[name] for name in COLUMNS}
+
+    def _lookup(self, keys):
+        """Result columns for unique keys, solving the ones not seen before."""
+        rows = _rows(keys)
+        known = _rows(self._keys)
+        pos = np.searchsorted(known, rows)
+        found = pos < len(known)
+        found[found] = known[pos[found]] == rows[found]
+        new = keys[~found]
+        if len(new):
+            solved = self._solve(new)
+            merged = np.concatenate([self._keys, new])
+            order = np.argsort(_rows(merged), kind="stable")
+            self._keys = merged[order]
+            for name in COLUMNS:
+                values = np.concatenate([self._columns[name], solved[name]])
+                self._columns[name] = values[order]
+            pos = np.searchsorted(_rows(self._keys), rows)
+        return {name: self._columns[name][pos] for name in COLUMNS}, len(new)
+
+    def run(self, time, altitude, mach, throttle=1.0, afterburner=False):
+        """Evaluate the mission given as arrays (or scalars) over time [s]."""
+        time, *conditions = np.broadcast_arrays(
+            np.asarray(time, dtype=float),
+            altitude,
+            mach,
+            throttle,
+            np.asarray(afterburner, dtype=bool),
+        )
+        keys = np.stack(conditions, axis=-1).astype(float)
+        n = len(time)
+        # Runs of identical consecutive conditions, then the distinct runs
+        starts = np.flatnonzero(np.r_[True, np.any(keys[1:] != keys[:-1], axis=1)])
+        unique, inverse = np.unique(keys[starts], axis=0, return_inverse=True)
+        columns, solved = self._lookup(unique)
+        run_of_step = np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, n]))
+        step = {name: values[inverse][run_of_step] for name, values in columns.items()}
+
+        mdot_air = np.full(n, float(self.mdot_air))
+        if self.flow_lapse:
+            mdot_air *= step["P02"] / P_SL / np.sqrt(step["T02"] / T_SL)
+        Thrust = mdot_air * step["Thrust"]
+        mdot_fuel = mdot_air * step["f_total"]
+        failed = ~(np.isfinite(Thrust) & np.isfinite(mdot_fuel))
+        Thrust = np.where(failed, 0.0, Thrust)
+        mdot_fuel = np.where(failed, 0.0, mdot_fuel)
+        return MissionResult(
+            time=time,
+            Thrust=Thrust,
+            mdot_air=mdot_air,
+            mdot_fuel=mdot_fuel,
+            TSFC=step["TSFC"],
+            fuel=_cumulative_trapezoid(mdot_fuel, time),
+            impulse=_cumulative_trapezoid(Thrust, time),
+            solved=solved,
+            reused=n - solved,
+            failed=int(np.count_nonzero(failed)),
+        )
+
+
+def _rows(keys):
+    """One sortable, comparable scalar per key row."""
+    keys = np.ascontiguousarray(keys, dtype=float)
+    return keys.view(np.dtype((np.void, keys.itemsize * keys.shape[1]))).ravel()
+
+
+if __name__ == "__main__":
+    import time as clock
+
+    segments = [
+        Segment(60, 0, (0, 0.3), name="takeoff"),
+        Segment(900, (0, 11000), (0.3, 0.8), throttle=0.9, name="climb"),
+        Segment(7200, 11000, 0.8, throttle=0.7, name="cruise"),
+        Segment(300, 11000, (0.8, 1.6), afterburner=True, name="dash"),
+        Segment(1800, (11000, 0), (1.6, 0.3), throttle=0.2, name="descent"),
+    ]
+    steps = profile(segments, dt=0.05)
+    mission = Mission(
+        pr=8.3,
+        T04=1250,
+        Qr=43e6,
+        eta_d=0.95,
+        eta_c=0.82,
+        eta_b=0.98,
+        eta_t=0.88,
+        eta_n=0.97,
+        mdot_air=20,
+        eta_ab=0.95,
+        Qr_ab=43e6,
+        T06=2000,
+    )
+    for attempt in ("first", "repeat"):
+        start = clock.perf_counter()
+        result = mission.run(**steps)
+        elapsed = clock.perf_counter() - start
+        print(
+            f"{attempt}: {len(result.time)} steps in {elapsed:.3f} s,"
+            f" {result.solved} solved, {result.failed} failed"
+        )
+    print(f"fuel {result.total_fuel:.1f} kg, impulse {result.total_impulse:.4g} N*s")
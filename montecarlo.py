@@ -0,0 +1,364 @@
+"""
+Monte Carlo propagation of input uncertainty to the engine outputs.
+
+Samples are drawn in chunks from a multivariate normal distribution about
+the nominal inputs, solved with solve_batch and folded into streaming
+statistics, so memory stays constant however many samples are drawn.
+Chunk i always draws from the random stream SeedSequence(seed, spawn_key=
+(i,)) and the per-chunk statistics are merged in chunk order, so a run is
+reproducible from its seed whatever the number of worker processes.
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch import RESULT_COLUMNS, solve_batch, to_columns
+from sweep import PARAMETERS
+
+HISTOGRAM_BINS = 4096
+# Histogram ranges not given are taken from the first chunk, widened by this
+# fraction of its spread on each side
+RANGE_MARGIN = 0.5
+# Rounds of redrawing samples with an efficiency above one before giving up
+MAX_REDRAWS = 100
+
+
+class StreamingStats:
+    """
+    Constant-memory statistics of one output: count, mean and variance
+    (merged with Chan's parallel update), extremes and a fixed-range
+    histogram from which quantiles are interpolated. Non-finite values, from
+    failed solves, are only counted.
+    """
+
+    def __init__(self, lo: float, hi: float, bins: int = HISTOGRAM_BINS):
+        self.lo, self.hi, self.bins = float(lo), float(hi), bins
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        self.failed = 0
+
+    @property
+    def edges(self) -> np.ndarray:
+        return np.linspace(self.lo, self.hi, self.bins + 1)
+
+    @property
+    def outside(self) -> int:
+        """Finite values that fell outside the histogram range."""
+        return self.underflow + self.overflow
+
+    @property
+    def variance(self) -> float:
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+    @property
+    def std(self) -> float:
+        return np.sqrt(self.variance)
+
+    def empty(self) -> "StreamingStats":
+        """New, empty stats with the same histogram range."""
+        return StreamingStats(self.lo, self.hi, self.bins)
+
+    def update(self, x: np.ndarray):
+        finite = np.isfinite(x)
+        self.failed += int(x.size - np.count_nonzero(finite))
+        x = x[finite]
+        if not x.size:
+            return
+        chunk = self.empty()
+        chunk.count = x.size
+        chunk.mean = float(x.mean())
+        chunk.m2 = float(np.square(x - chunk.mean).sum())
+        chunk.min, chunk.max = float(x.min()), float(x.max())
+        i = np.floor((x - self.lo) * (self.bins / (self.hi - self.lo)))
+        chunk.underflow = int(np.count_nonzero(i < 0))
+        chunk.overflow = int(np.count_nonzero(i >= self.bins))
+        inside = i[(i >= 0) & (i < self.bins)].astype(np.intp)
+        chunk.counts = np.bincount(inside, minlength=self.bins)
+        self.merge(chunk)
+
+    def merge(self, other: "StreamingStats"):
+        """Fold in stats gathered over the same histogram range."""
+        self.failed += other.failed
+        if not other.count:
+            return
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / n
+        self.m2 += other.m2 + delta**2 * self.count * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.counts += other.counts
+        self.underflow += other.underflow
+        self.overflow += other.overflow
+
+    def quantile(self, q):
+        """
+        Quantiles interpolated linearly within the histogram bins, accurate
+        to a bin width. NaN where a quantile falls outside the histogram range.
+        """
+        q = np.asarray(q, dtype=float)
+        cumulative = self.underflow + np.concatenate([[0], np.cumsum(self.counts)])
+        target = q * self.count
+        i = np.searchsorted(cumulative, target, side="right") - 1
+        i = np.clip(i, 0, self.bins - 1)
+        in_bin = np.maximum(self.counts[i], 1)
+        value = self.edges[i] + (target - cumulative[i]) / in_bin * (
+            (self.hi - self.lo) / self.bins
+        )
+        outside = (target < self.underflow) | (target > self.count - self.overflow)
+        return np.where(outside, np.nan, value)
+
+    def histogram(self, bins: int = 100):
+        """(counts, edges) regrouped to bins, which must divide the bin count."""
+        if self.bins % bins:
+            raise ValueError(f"bins must divide {self.bins}")
+        counts = self.counts.reshape(bins, -1).sum(axis=1)
+        return counts, np.linspace(self.lo, self.hi, bins + 1)
+
+
+def _solve_chunk(problem, index, size, template):
+    """
+    Draw and solve chunk index; return its StreamingStats per output, on the
+    histogram ranges of template or, for outputs missing there, on ranges
+    fitted to this chunk.
+    """
+    nominal, names, mean, factor, seed, outputs, options = problem
+    rng = np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(index,)))
+    samples = mean + rng.standard_normal((size, len(names))) @ factor.T
+    # Efficiencies above one are unphysical. Samples with any are drawn again,
+    # which truncates the (correlated) normal there instead of piling the
+    # tail up at one
+    eta = np.array([name.startswith("eta") for name in names])
+    redraw = np.flatnonzero(np.any(samples[:, eta] > 1.0, axis=1))
+    for _ in range(MAX_REDRAWS):
+        if not redraw.size:
+            break
+        draw = rng.standard_normal((redraw.size, len(names)))
+        samples[redraw] = mean + draw @ factor.T
+        redraw = redraw[np.any(samples[redraw][:, eta] > 1.0, axis=1)]
+    if redraw.size:
+        raise ValueError("Too few samples have all efficiencies at or below 1")
+    inputs = dict(nominal)
+    inputs.update((name, samples[:, j]) for j, name in enumerate(names))
+    with np.errstate(all="ignore"):
+        columns = to_columns(solve_batch(**inputs, **options))
+    stats = {}
+    for output in outputs:
+        if output in template:
+            stats[output] = template[output].empty()
+        else:
+            finite = columns[output][np.isfinite(columns[output])]
+            lo, hi = (finite.min(), finite.max()) if finite.size else (0.0, 1.0)
+            spread = (hi - lo) or abs(hi) or 1.0
+            stats[output] = StreamingStats(
+                lo - RANGE_MARGIN * spread, hi + RANGE_MARGIN * spread
+            )
+        stats[output].update(columns[output])
+    return stats
+
+
+class MonteCarlo:
+    """
+    Propagate normal uncertainty in some inputs to the outputs.
+
+    nominal holds the solve_batch inputs (scalars) at their nominal values,
+    plus fluid and products if wanted; uncertain maps input names (usually
+    the efficiencies and Qr) to their standard deviations. correlation is
+    the correlation matrix of the uncertain inputs, in the order of
+    uncertain, independent if omitted. ranges optionally fixes the
+    (lo, hi) histogram range per output.
+    """
+
+    def __init__(
+        self,
+        nominal: dict,
+        uncertain: dict,
+        correlation=None,
+        outputs=("Thrust", "TSFC"),
+        chunk_size: int = 65536,
+        workers: int = None,
+        seed: int = None,
+        ranges: dict = None,
+        bins: int = HISTOGRAM_BINS,
+    ):
+        numeric = set(PARAMETERS) - {"afterburner_included"}
+        unknown = (set(uncertain) - numeric) | (set(outputs) - set(RESULT_COLUMNS))
+        if unknown:
+            raise ValueError(f"Unknown inputs or outputs: {sorted(unknown)}")
+        missing = set(uncertain) - set(nominal)
+        if missing:
+            raise ValueError(f"No nominal value for: {sorted(missing)}")
+
+        self.names = tuple(uncertain)
+        std = np.array([uncertain[name] for name in self.names], dtype=float)
+        k = len(self.names)
+        correlation = np.eye(k) if correlation is None else np.asarray(correlation)
+        if correlation.shape != (k, k):
+            raise ValueError(f"correlation must be {k} x {k}")
+        try:
+            self.factor = np.linalg.cholesky(correlation * np.outer(std, std))
+        except np.linalg.LinAlgError:
+            raise ValueError("correlation is not positive definite") from None
+
+        options = {"fluid", "products"}
+        self.nominal = {
+            key: value
+            for key, value in nominal.items()
+            if key not in options and key not in self.names
+        }
+        self.options = {key: nominal[key] for key in options if key in nominal}
+        self.mean = np.array([nominal[name] for name in self.names], dtype=float)
+        self.outputs = tuple(outputs)
+        self.chunk_size = chunk_size
+        self.workers = os.cpu_count() if workers is None else workers
+        self.seed = np.random.SeedSequence(seed).entropy
+        self.ranges = dict(ranges or {})
+        self.bins = bins
+
+    def _problem(self):
+        return (
+            self.nominal,
+            self.names,
+            self.mean,
+            self.factor,
+            self.seed,
+            self.outputs,
+            self.options,
+        )
+
+    def run(self, samples: int, progress=None) -> dict:
+        """
+        Draw samples in total and return a StreamingStats per output.
+        progress, if given, is called as progress(done, samples) after each
+        chunk.
+
+        Histogram ranges not given in ranges are fixed from the first chunk,
+        widened by RANGE_MARGIN of its spread on each side. Later samples
+        beyond them are not clamped: they are counted in underflow and
+        overflow (see StreamingStats.outside), mean, std and extremes still
+        include them, and quantiles falling among them come out NaN. Pass
+        ranges for outputs whose tails matter.
+        """
+        if samples < 1:
+            raise ValueError("samples must be at least 1")
+        sizes = [
+            min(self.chunk_size, samples - start)
+            for start in range(0, samples, self.chunk_size)
+        ]
+        problem = self._problem()
+
+        # The first chunk fixes the histogram ranges not given
+        template = {
+            output: StreamingStats(lo, hi, self.bins)
+            for output, (lo, hi) in self.ranges.items()
+        }
+        stats = _solve_chunk(problem, 0, sizes[0], template)
+        template = {output: stats[output].empty() for output in self.outputs}
+        done = sizes[0]
+        if progress is not None:
+            progress(done, samples)
+
+        def merge(chunk, size):
+            nonlocal done
+            for output in self.outputs:
+                stats[output].merge(chunk[output])
+            done += size
+            if progress is not None:
+                progress(done, samples)
+
+        rest = list(enumerate(sizes))[1:]
+        if self.workers <= 1:
+            for index, size in rest:
+                merge(_solve_chunk(problem, index, size, template), size)
+            return stats
+
+        # Merged in chunk order, so the result does not depend on the pool
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+
+            def submit(index, size):
+                future = pool.submit(_solve_chunk, problem, index, size, template)
+                pending.append((size, future))
+
+            chunks = iter(rest)
+            pending = deque()
+            for chunk in chunks:
+                submit(*chunk)
+                if len(pending) >= 2 * self.workers:
+                    break
+            while pending:
+                size, future = pending.popleft()
+                following = next(chunks, None)
+                if following is not None:
+                    submit(*following)
+                merge(future.result(), size)
+        return stats
+
+
+def summary(stats: dict, quantiles=(0.05, 0.5, 0.95)) -> str:
+    """
+    Table of mean, standard deviation and quantiles per output, and the
+    fraction of samples outside its histogram range.
+    """
+    header = f"{'output':<10} {'mean':>12} {'std':>12}" + "".join(
+        f" {f'q{q:g}':>12}" for q in quantiles
+    )
+    header += f" {'outside':>8}"
+    lines = [header, "-" * len(header)]
+    for name, s in stats.items():
+        values = [s.mean, s.std, *s.quantile(quantiles)]
+        outside = f" {s.outside / s.count:8.2%}" if s.count else f" {'':>8}"
+        lines.append(f"{name:<10}" + "".join(f" {v:12.6g}" for v in values) + outside)
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import time
+
+    mc = MonteCarlo(
+        nominal=dict(
+            p=101325,
+            T=288,
+            u=250,
+            pr=8.3,
+            T04=1250,
+            Qr=43e6,
+            eta_d=0.95,
+            eta_c=0.82,
+            eta_b=0.98,
+            eta_t=0.88,
+            eta_n=0.97,
+            mdot_air=20,
+            afterburner_included=True,
+            eta_ab=0.95,
+            Qr_ab=43e6,
+            T06=2000,
+        ),
+        uncertain=dict(
+            eta_d=0.01, eta_c=0.02, eta_b=0.01, eta_t=0.02, eta_n=0.01, Qr=0.5e6
+        ),
+        # Compressor and turbine efficiency often err together
+        correlation=[
+            [1, 0, 0, 0, 0, 0],
+            [0, 1, 0, 0.5, 0, 0],
+            [0, 0, 1, 0, 0, 0],
+            [0, 0.5, 0, 1, 0, 0],
+            [0, 0, 0, 0, 1, 0],
+            [0, 0, 0, 0, 0, 1],
+        ],
+        seed=1,
+    )
+    start = time.perf_counter()
+    stats = mc.run(2_000_000)
+    elapsed = time.perf_counter() - start
+    print(f"2e6 samples in {elapsed:.2f} s on {mc.workers} worker(s)")
+    print(summary(stats))
@@ -1,8 +1,10 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 
+import profiling
 
-@dataclass
+
+@dataclass(slots=True)
 class ThermoState:
     P0: float  # [Pa]
     T0: float  # [K]
@@ -17,16 +19,102 @@ class Fluid:
     def cp(self) -> float:
         return self.gamma * self.R / (self.gamma - 1)  # [J/(kg*K)]
 
+    # Property relations used by the components. These are the calorically
+    # perfect forms; gas_tables.VariableCpFluid overrides them with tables.
+    # All of them work elementwise on NumPy arrays as well as on floats.
+
+    def cp_at(self, T):
+        return self.cp
+
+    def gamma_at(self, T):
+        return self.gamma
+
+    def h(self, T):
+        return self.cp * T  # [J/kg], h(0 K) = 0
+
+    def T_from_h(self, h):
+        return h / self.cp
+
+    def isentropic_T(self, T1, pressure_ratio):
+        """Temperature reached isentropically from T1 across pressure_ratio."""
+        k = self.gamma
+        return T1 * pressure_ratio ** ((k - 1) / k)
+
+    def pressure_ratio(self, T1, T2s):
+        """Pressure ratio of the isentropic process from T1 to T2s."""
+        k = self.gamma
+        return (T2s / T1) ** (k / (k - 1))
+
+
+_MISSING = object()
+
+
+def _unchanged(old, value) -> bool:
+    """
+    Whether setting a parameter from old to value leaves it as it was. Values
+    whose comparison has no single truth value, like NumPy arrays, count as
+    changed.
+    """
+    if old is value:
+        return True
+    try:
+        return bool(old == value)
+    except (TypeError, ValueError):
+        return False
+
 
 class Node(ABC):
+    # Attributes written by the node itself while solving; they are results,
+    # not parameters, so setting them does not invalidate the cached outlet.
+    outputs = ()
+    # Name the node is reported under by profiling, if not its class name
+    _label = None
+
     def __init__(self, inlet, eta: float = 1.0, fluid=Fluid(gamma=1.4, R=287)):
+        object.__setattr__(self, "_outlet", None)
+        object.__setattr__(self, "_downstream", [])
         self.inlet = inlet
         self.eta = eta
         self.fluid = fluid
 
+    def __setattr__(self, name, value):
+        if not name.startswith("_") and name not in self.outputs:
+            old = getattr(self, name, _MISSING)
+            if not _unchanged(old, value):
+                if name == "inlet":
+                    if isinstance(old, Node):
+                        old._downstream.remove(self)
+                    if isinstance(value, Node):
+                        value._downstream.append(self)
+                self.invalidate()
+        object.__setattr__(self, name, value)
+
+    def invalidate(self):
+        """Drop the cached outlet of this node and of every node downstream."""
+        if self._outlet is None:
+            # Nothing downstream can be cached without this node being cached
+            return
+        self._outlet = None
+        for node in self._downstream:
+            node.invalidate()
+
     def get_inlet_conditions(self) -> ThermoState:
         return self.inlet.get_outlet_conditions()
 
-    @abstractmethod
     def get_outlet_conditions(self) -> ThermoState:
+        profile = profiling.active
+        if profile is not None:
+            name = self._label or type(self).__name__
+            if self._outlet is None:
+                self._outlet = profile.measure(
+                    name, self.compute_outlet_conditions, cached=True
+                )
+            else:
+                profile.hit(name)
+        elif self._outlet is None:
+            self._outlet = self.compute_outlet_conditions()
+        return self._outlet
+
+    @abstractmethod
+    def compute_outlet_conditions(self) -> ThermoState:
         pass
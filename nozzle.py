@@ -1,5 +1,6 @@
 from node import ThermoState, Fluid
 import math
+import profiling
 
 
 class Nozzle:
@@ -12,18 +13,25 @@ class Nozzle:
         self.inlet = inlet_state
 
     def get_outlet_conditions(self, Pa):
+        profile = profiling.active
+        if profile is not None:
+            return profile.measure("Nozzle", self.compute_outlet_conditions, Pa)
+        return self.compute_outlet_conditions(Pa)
+
+    def compute_outlet_conditions(self, Pa):
         P0_inlet = self.inlet.P0
         T0_inlet = self.inlet.T0
-        k = self.fluid.gamma
-        cp = self.fluid.cp
+        fluid = self.fluid
 
         # Isentropic exit static temperature
-        Tes = T0_inlet * (Pa / P0_inlet) ** ((k - 1) / k)
+        Tes = fluid.isentropic_T(T0_inlet, Pa / P0_inlet)
 
         # Real Exit Temperature
-        Te = T0_inlet - self.eta * (T0_inlet - Tes)
+        h0 = fluid.h(T0_inlet)
+        he = h0 - self.eta * (h0 - fluid.h(Tes))
+        Te = fluid.T_from_h(he)
 
         # Exit Veolcity
-        ue = math.sqrt(2 * cp * (T0_inlet - Te))
+        ue = math.sqrt(2 * (h0 - he))
 
         return ue, Te
@@ -0,0 +1,295 @@
+"""
+Off-design matching of a single-spool turbojet.
+
+The Engine at its design point fixes the hardware: component maps are scaled
+so the design point sits at relative speed 1 on them, and the nozzle throat
+area is sized to pass the design flow. Off-design, for each operating point
+(flight condition p, T, u and throttle setting T04) the solver finds the
+relative shaft speed N and the map positions beta_c and beta_t where
+
+    - the compressor flow plus fuel matches the turbine flow capacity,
+    - the turbine work equals the compressor work, and
+    - the flow matches the nozzle throat capacity (choked or not).
+
+Newton iterations run on all operating points at once, with a finite
+difference Jacobian and a batched 3x3 solve. Points are solved in blocks
+ordered outward from the design point, each warm-started from the nearest
+point already solved; solved points are remembered for later calls.
+
+The nozzle keeps the Engine model for thrust (isentropic expansion to Pa
+with eta_n); the throat only sets the flow it can pass. The afterburner is
+not modelled off-design.
+"""
+
+import numpy as np
+
+from batch import combustor, compressor, diffuser, nozzle
+from maps import generic_compressor_map, generic_turbine_map
+
+UNKNOWNS = ("N", "beta_c", "beta_t")
+STEP = 1e-7  # finite difference step in the unknowns
+MAX_STEP = 0.1  # largest Newton update of any unknown
+
+
+def throat_flux(P0, T0, Pa, gas):
+    """
+    Mass flow per unit throat area [kg/(s*m^2)] of a convergent nozzle with
+    inlet stagnation state (P0, T0) exhausting to Pa; constant once choked.
+    """
+    k = gas.gamma_at(T0)
+    critical = (2 / (k + 1)) ** (k / (k - 1))
+    ratio = np.maximum(Pa / P0, critical)
+    return P0 * np.sqrt(
+        2 * k / (gas.R * T0 * (k - 1)) * (ratio ** (2 / k) - ratio ** ((k + 1) / k))
+    )
+
+
+class OffDesign:
+    """
+    Off-design model of engine, a design-point Engine without afterburner.
+    compressor_map and turbine_map are maps.ComponentMap objects in any units;
+    they are scaled so that (speed 1, beta_c) and (speed 1, beta_t) reproduce
+    the design point. The generic maps are used when none are given.
+    """
+
+    def __init__(
+        self,
+        engine,
+        compressor_map=None,
+        turbine_map=None,
+        beta_c: float = 0.5,
+        beta_t: float = 0.8,
+        max_history: int = 4096,
+    ):
+        if engine.afterburner_included:
+            raise ValueError("Off-design matching does not model the afterburner")
+        design = engine.solve()
+        inlet = engine.inlet_cond
+
+        self.fluid = engine.diff.fluid
+        self.products = engine.comb.products
+        self.eta_d = engine.diff.eta
+        self.eta_b = engine.comb.eta
+        self.eta_n = engine.nozz.eta
+        self.Qr = engine.comb.Qr
+
+        # Design values everything is referred to
+        self.p_d, self.T_d, self.u_d = inlet.p, inlet.T, inlet.u
+        self.P02_d, self.T02_d = design["T02"].P0, design["T02"].T0
+        self.P04_d, self.T04_d = design["T04"].P0, design["T04"].T0
+        self.mdot_d = engine.mdot_air
+        mdot4 = engine.mdot_air * (1 + design["f"])
+        pr_t = design["T04"].P0 / design["T05"].P0
+
+        self.compressor_map = (compressor_map or generic_compressor_map()).scaled(
+            1.0, beta_c, self.mdot_d, engine.comp.pi, engine.comp.eta
+        )
+        self.turbine_map = (turbine_map or generic_turbine_map()).scaled(
+            1.0, beta_t, mdot4, pr_t, engine.turb.eta
+        )
+        T05 = design["T05"]
+        self.throat_area = mdot4 / throat_flux(
+            T05.P0, T05.T0, inlet.p, engine.turb.fluid
+        )
+
+        self.max_history = max_history
+        self._features = self.features(self.p_d, self.T_d, self.u_d, self.T04_d)
+        self._solutions = np.array([[1.0, beta_c, beta_t]])
+
+    def features(self, p, T, u, T04):
+        """
+        Coordinates used to find the nearest solved point: the match depends
+        mostly on the temperature ratio T04/T and the flight Mach number, and
+        only weakly on the ambient pressure.
+        """
+        p, T, u, T04 = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (p, T, u, T04))
+        )
+        a = np.sqrt(self.fluid.gamma * self.fluid.R * T)
+        return np.stack(
+            [T04 / T * (self.T_d / self.T04_d), u / a, 0.1 * p / self.p_d], axis=-1
+        ).reshape(-1, 3)
+
+    def evaluate(self, x, p, T, u, T04) -> tuple:
+        """
+        Residuals (n, 3) of the matching conditions for unknowns x (n, 3) at
+        the given operating points, and the engine state they imply.
+        """
+        N, beta_c, beta_t = x.T
+        fluid = self.fluid
+        P02, T02 = diffuser(p, T, u, self.eta_d, fluid)
+        theta2 = T02 / self.T02_d
+        flow, pr_c, eta_c = self.compressor_map(N / np.sqrt(theta2), beta_c)
+        mdot = flow * (P02 / self.P02_d) / np.sqrt(theta2)
+        P03, T03 = compressor(P02, T02, pr_c, eta_c, fluid)
+        P04 = P03
+        f, gas = combustor(T03, T04, self.Qr, self.eta_b, fluid, self.products)
+
+        theta4 = T04 / self.T04_d
+        flow_t, pr_t, eta_t = self.turbine_map(N / np.sqrt(theta4), beta_t)
+        h04 = gas.h(T04)
+        h05 = h04 - eta_t * (h04 - gas.h(gas.isentropic_T(T04, 1 / pr_t)))
+        T05 = gas.T_from_h(h05)
+        P05 = P04 / pr_t
+
+        mdot4 = mdot * (1 + f)
+        residuals = np.stack(
+            [
+                mdot4 * np.sqrt(theta4) / (P04 / self.P04_d) / flow_t - 1,
+                (1 + f) * (h04 - h05) / (fluid.h(T03) - fluid.h(T02)) - 1,
+                mdot4 / (self.throat_area * throat_flux(P05, T05, p, gas)) - 1,
+            ],
+            axis=-1,
+        )
+        state = dict(
+            P02=P02, T02=T02, P03=P03, T03=T03, P04=P04, T05=T05, P05=P05,
+            f=f, gas=gas, mdot_air=mdot, pr_c=pr_c, eta_c=eta_c, pr_t=pr_t,
+            eta_t=eta_t,
+        )  # fmt: skip
+        return residuals, state
+
+    def newton(self, x, inputs: dict, tol=1e-10, maxiter=30):
+        """
+        Newton iterations from x (n, 3) on all points at once; points drop out
+        as they converge. Returns (x, iterations, converged).
+        """
+        x = np.array(x, dtype=float)
+        iterations = np.zeros(len(x), dtype=int)
+        converged = np.zeros(len(x), dtype=bool)
+        active = np.arange(len(x))
+        for it in range(maxiter + 1):
+            sub = {key: value[active] for key, value in inputs.items()}
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                R, _ = self.evaluate(x[active], **sub)
+            error = np.abs(R).max(axis=1)
+            done = error < tol
+            converged[active[done]] = True
+            keep = ~done & np.isfinite(error)
+            if it == maxiter or not keep.any():
+                break
+            active, R = active[keep], R[keep]
+            sub = {key: value[keep] for key, value in sub.items()}
+            iterations[active] += 1
+
+            J = np.empty((len(active), 3, 3))
+            for j in range(3):
+                xj = x[active].copy()
+                xj[:, j] += STEP
+                with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                    Rj, _ = self.evaluate(xj, **sub)
+                J[:, :, j] = (Rj - R) / STEP
+            # Points with a singular or non-finite Jacobian are given up on
+            # and keep their last iterate
+            usable = np.isfinite(J).all(axis=(1, 2))
+            usable[usable] = np.abs(np.linalg.det(J[usable])) > 1e-12
+            active, R, J = active[usable], R[usable], J[usable]
+            dx = np.linalg.solve(J, -R[..., None])[..., 0]
+            scale = np.minimum(1.0, MAX_STEP / np.abs(dx).max(axis=1))
+            x[active] += scale[:, None] * dx
+        return x, iterations, converged
+
+    def _nearest(self, features):
+        """Index of the nearest remembered solution for each row of features."""
+        known = self._features
+        # |a - b|^2 = |a|^2 - 2 a.b + |b|^2, in blocks to bound memory
+        nearest = np.empty(len(features), dtype=np.intp)
+        for start in range(0, len(features), 1024):
+            block = features[start : start + 1024]
+            d = (known**2).sum(axis=1) - 2 * block @ known.T
+            nearest[start : start + 1024] = d.argmin(axis=1)
+        return nearest
+
+    def _remember(self, features, solutions):
+        self._features = np.concatenate([self._features, features])
+        self._solutions = np.concatenate([self._solutions, solutions])
+        if len(self._features) > self.max_history:
+            # Thin out evenly, always keeping the design point first
+            keep = np.linspace(0, len(self._features) - 1, self.max_history)
+            keep = np.unique(keep.astype(np.intp))
+            self._features = self._features[keep]
+            self._solutions = self._solutions[keep]
+
+    def solve(self, p, T, u, T04, tol=1e-10, maxiter=30, block_size=256):
+        """
+        Match the engine at every operating point; inputs broadcast against
+        each other. Returns the Engine.solve keys (T02-T05, ue, Te, f, Thrust,
+        TSFC, Isp) as arrays plus mdot_air, the unknowns N, beta_c, beta_t,
+        the map values pr_c, eta_c, pr_t, eta_t, and per point the Newton
+        iterations taken and whether it converged. Outputs of points that did
+        not converge are NaN.
+        """
+        p, T, u, T04 = np.broadcast_arrays(
+            *(np.asarray(x, dtype=float) for x in (p, T, u, T04))
+        )
+        shape = p.shape
+        inputs = dict(p=p.ravel(), T=T.ravel(), u=u.ravel(), T04=T04.ravel())
+        features = self.features(p, T, u, T04)
+        n = len(features)
+
+        x = np.empty((n, 3))
+        iterations = np.zeros(n, dtype=int)
+        converged = np.zeros(n, dtype=bool)
+        # Outward from the design point, so each block starts close to the
+        # solutions of the blocks before it
+        order = np.argsort(np.abs(features - self._features[0]).sum(axis=1))
+        for start in range(0, n, block_size):
+            idx = order[start : start + block_size]
+            x0 = self._solutions[self._nearest(features[idx])]
+            sub = {key: value[idx] for key, value in inputs.items()}
+            x[idx], iterations[idx], converged[idx] = self.newton(
+                x0, sub, tol, maxiter
+            )
+            ok = idx[converged[idx]]
+            self._remember(features[ok], x[ok])
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            _, state = self.evaluate(x, **inputs)
+            ue, Te = nozzle(
+                state["P05"], state["T05"], inputs["p"], self.eta_n, state["gas"]
+            )
+            f, mdot = state["f"], state["mdot_air"]
+            Thrust = mdot * (1 + f) * ue - mdot * inputs["u"]
+            mdot_f = mdot * f
+
+        result = dict(
+            P02=state["P02"], T02=state["T02"], P03=state["P03"], T03=state["T03"],
+            P04=state["P04"], T04=inputs["T04"], P05=state["P05"], T05=state["T05"],
+            ue=ue, Te=Te, f=f, Thrust=Thrust, TSFC=mdot_f / Thrust,
+            Isp=Thrust / (mdot_f * 9.81), mdot_air=mdot, N=x[:, 0],
+            beta_c=x[:, 1], beta_t=x[:, 2], pr_c=state["pr_c"],
+            eta_c=state["eta_c"], pr_t=state["pr_t"], eta_t=state["eta_t"],
+        )  # fmt: skip
+        for key, value in result.items():
+            value = np.where(converged, value, np.nan)
+            result[key] = value.reshape(shape)
+        result["iterations"] = iterations.reshape(shape)
+        result["converged"] = converged.reshape(shape)
+        return result
+
+
+if __name__ == "__main__":
+    from diffuser import InletConditions
+    from engine import Engine
+
+    engine = Engine(
+        InletConditions(p=101325, T=288, u=0),
+        pr=8.3,
+        T04=1250,
+        Qr=43e6,
+        eta_d=0.95,
+        eta_c=0.82,
+        eta_b=0.98,
+        eta_t=0.88,
+        eta_n=0.97,
+        mdot_air=20,
+    )
+    model = OffDesign(engine)
+    throttle = np.linspace(900, 1300, 9)
+    line = model.solve(101325, 288, 0, throttle)
+    print(" T04 [K]     N    pr_c  mdot [kg/s]  Thrust [kN]  iterations")
+    for i, T04 in enumerate(throttle):
+        print(
+            f"{T04:8.0f} {line['N'][i]:6.3f} {line['pr_c'][i]:6.2f}"
+            f" {line['mdot_air'][i]:10.2f} {line['Thrust'][i] / 1e3:12.2f}"
+            f" {line['iterations'][i]:8d}"
+        )
@@ -0,0 +1,190 @@
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from batch import RESULT_COLUMNS, solve_batch, to_columns
+from sweep import PARAMETERS
+
+GOLDEN = (np.sqrt(5) - 1) / 2
+
+
+@dataclass
+class OptimizationResult:
+    x: dict  # optimal value of each design variable
+    value: float  # objective at x
+    n_evals: int  # number of design points solved
+    wall_time: float  # [s]
+    method: str
+    result: dict  # full solve_batch result at x
+
+
+class _Objective:
+    """Batched objective: solves a population of points in one solve_batch call."""
+
+    def __init__(self, objective, names, fixed, maximize):
+        if objective not in RESULT_COLUMNS:
+            raise ValueError(
+                f"Unknown objective {objective!r}, use one of {RESULT_COLUMNS}"
+            )
+        self.objective = objective
+        self.names = names
+        self.fixed = fixed
+        self.sign = -1.0 if maximize else 1.0
+        self.n_evals = 0
+
+    def solve(self, X):
+        return solve_batch(**self.fixed, **dict(zip(self.names, np.asarray(X).T)))
+
+    def __call__(self, X):
+        """
+        Return the cost (minimized) for each row of X. Points that fail to solve
+        or produce no thrust (where TSFC and Isp lose their meaning) cost inf.
+        """
+        X = np.atleast_2d(X)
+        self.n_evals += len(X)
+        columns = to_columns(self.solve(X))
+        cost = self.sign * columns[self.objective]
+        return np.where(np.isfinite(cost) & (columns["Thrust"] > 0), cost, np.inf)
+
+
+def _golden(fun, lo, hi, xtol, maxiter, **_):
+    """Classic golden-section search, one point per evaluation."""
+    a, b = lo[0], hi[0]
+    c = b - GOLDEN * (b - a)
+    d = a + GOLDEN * (b - a)
+    fc, fd = fun([[c]])[0], fun([[d]])[0]
+    for _ in range(maxiter):
+        if b - a < xtol[0]:
+            break
+        if fc < fd:
+            b, d, fd = d, c, fc
+            c = b - GOLDEN * (b - a)
+            fc = fun([[c]])[0]
+        else:
+            a, c, fc = c, d, fd
+            d = a + GOLDEN * (b - a)
+            fd = fun([[d]])[0]
+    return np.array([c if fc < fd else d])
+
+
+def _bracket(fun, lo, hi, xtol, maxiter, population=64, **_):
+    """
+    Batched bracketing: evaluate an evenly spaced population across the
+    bracket, then shrink the bracket to the neighbours of the best point.
+    """
+    a, b = lo[0], hi[0]
+    best = 0.5 * (a + b)
+    for _ in range(maxiter):
+        x = np.linspace(a, b, population)
+        cost = fun(x[:, None])
+        i = int(np.argmin(cost))
+        best = x[i]
+        a, b = x[max(i - 1, 0)], x[min(i + 1, population - 1)]
+        if b - a < xtol[0]:
+            break
+    return np.array([best])
+
+
+def _differential_evolution(
+    fun, lo, hi, xtol, maxiter, population=None, F=0.7, CR=0.9, seed=None, ftol=1e-10
+):
+    """
+    DE/rand/1/bin. Each generation's trial population is solved in one batch.
+    """
+    rng = np.random.default_rng(seed)
+    d = len(lo)
+    n = population or max(15 * d, 8)
+    X = lo + rng.random((n, d)) * (hi - lo)
+    cost = fun(X)
+    for _ in range(maxiter):
+        r = np.argsort(rng.random((n, n - 1)), axis=1)[:, :3]
+        r += r >= np.arange(n)[:, None]  # never pick the target itself
+        mutant = np.clip(X[r[:, 0]] + F * (X[r[:, 1]] - X[r[:, 2]]), lo, hi)
+        cross = rng.random((n, d)) < CR
+        cross[np.arange(n), rng.integers(d, size=n)] = True
+        trial = np.where(cross, mutant, X)
+        trial_cost = fun(trial)
+        better = trial_cost <= cost
+        X[better], cost[better] = trial[better], trial_cost[better]
+        finite = cost[np.isfinite(cost)]
+        if (
+            len(finite) == n
+            and np.ptp(finite) <= ftol * (1 + abs(finite.min()))
+            and np.all(np.ptp(X, axis=0) < xtol)
+        ):
+            break
+    return X[np.argmin(cost)]
+
+
+METHODS = {
+    "golden": _golden,
+    "bracket": _bracket,
+    "de": _differential_evolution,
+}
+
+
+def optimize(
+    objective: str,
+    bounds: dict,
+    fixed: dict,
+    maximize: bool = True,
+    method: str = "auto",
+    xtol: float = 1e-6,
+    maxiter: int = 200,
+    **options,
+) -> OptimizationResult:
+    """
+    Maximize (or minimize) one solve() output over some Engine inputs.
+
+    objective is a column of batch.to_columns, e.g. "Thrust", "TSFC", "Isp".
+    bounds maps each design variable (e.g. "pr", "T04", "T06", "u") to a
+    (low, high) pair; fixed holds the remaining inputs as for a Sweep.
+    method is "golden" or "bracket" for a single variable, "de" for any number
+    of variables, or "auto" to pick "bracket" in 1-D and "de" otherwise.
+    xtol is relative to the width of each bound. Extra options go to the
+    method (population, seed, F, CR, ...).
+    """
+    names = tuple(bounds)
+    unknown = set(names) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown design variables: {sorted(unknown)}")
+    lo = np.array([bounds[name][0] for name in names], dtype=float)
+    hi = np.array([bounds[name][1] for name in names], dtype=float)
+
+    if method == "auto":
+        method = "bracket" if len(names) == 1 else "de"
+    if method in ("golden", "bracket") and len(names) != 1:
+        raise ValueError(f"Method {method!r} only handles one design variable")
+
+    fun = _Objective(objective, names, fixed, maximize)
+    start = time.perf_counter()
+    x = METHODS[method](fun, lo, hi, xtol * (hi - lo), maxiter, **options)
+    wall_time = time.perf_counter() - start
+
+    result = fun.solve(x[None, :])
+    value = float(to_columns(result)[objective][0])
+    return OptimizationResult(
+        x=dict(zip(names, map(float, x))),
+        value=value,
+        n_evals=fun.n_evals,
+        wall_time=wall_time,
+        method=method,
+        result=result,
+    )
+
+
+if __name__ == "__main__":
+    fixed = dict(
+        p=101325, T=288, u=250, Qr=43e6, eta_d=0.95, eta_c=0.82, eta_b=0.98,
+        eta_t=0.88, eta_n=0.97, mdot_air=20,
+    )  # fmt: skip
+    for method in ("golden", "bracket", "de"):
+        res = optimize(
+            "Thrust", {"pr": (1.5, 60)}, dict(fixed, T04=1250), method=method
+        )
+        print(res.method, res.x, res.value, res.n_evals, f"{res.wall_time:.4f} s")
+    res = optimize(
+        "TSFC", {"pr": (1.5, 60), "T04": (1000, 1700)}, fixed, maximize=False, seed=1
+    )
+    print(res.method, res.x, res.value, res.n_evals, f"{res.wall_time:.4f} s")
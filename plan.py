@@ -0,0 +1,304 @@
+"""
+Flat evaluation plans for Engine.compile().
+
+The component chain of an engine is walked once, in flow order, and turned
+into the source of a single Python function. Every component equation is
+written out inline with the engine's parameters as arguments, so calling the
+plan does no attribute lookups, method dispatch or ThermoState allocation
+until the result dict is built. For the calorically perfect Fluid, cp and the
+isentropic exponents are hoisted into literals; other fluids are called
+through bound methods looked up once at compile time.
+
+Stages are taken from the chain as it is wired, so extra compressor and
+turbine stages spliced in with Node.inlet are compiled too. When a role has
+several stages, the last one keeps the usual names (T03, pr, eta_c, ...) and
+the earlier ones get a stage suffix (T03_1, pr_1, eta_c_1, ...). Turbines
+drive compressors innermost first: the first turbine drives the last
+compressor, and the last turbine drives every compressor left over.
+"""
+
+import linecache
+import math
+from itertools import count
+
+from combustor import PRODUCTS_ITERATIONS, Combustor
+from compressor import Compressor
+from diffuser import Diffuser
+from node import Fluid, ThermoState
+from turbine import Turbine
+
+# Station result key and (argument, node attribute) pairs of each role
+STATIONS = {
+    "compressor": "T03",
+    "burner": "T04",
+    "turbine": "T05",
+    "afterburner": "T06",
+}
+ARGUMENTS = {
+    "compressor": (("pr", "pi"), ("eta_c", "eta")),
+    "burner": (("T04", "T04"), ("Qr", "Qr"), ("eta_b", "eta")),
+    "turbine": (("eta_t", "eta"),),
+    "afterburner": (("T06", "T04"), ("Qr_ab", "Qr"), ("eta_ab", "eta")),
+}
+
+_plans = count()
+
+
+class _Gas:
+    """Source snippets for the property relations of one fluid."""
+
+    def __init__(self, namespace: dict, fluid=None, name=None):
+        # name: the plan variable holding a fluid only known at run time
+        self.fluid = fluid
+        self.name = name
+        self.inline = name is None and type(fluid) is Fluid
+        if self.inline:
+            k = fluid.gamma
+            self.cp = repr(fluid.cp)
+            self.isentropic = repr((k - 1) / k)
+            self.ratio = repr(k / (k - 1))
+        elif name is None:
+            self.name = f"gas{len(namespace)}"
+            namespace[self.name] = fluid
+
+    def _call(self, method, *args):
+        return f"{self.name}.{method}({', '.join(args)})"
+
+    def h(self, T):
+        if self.inline:
+            return f"({self.cp} * {T})"
+        return self._call("h", T)
+
+    def T_from_h(self, h):
+        if self.inline:
+            return f"(({h}) / {self.cp})"
+        return self._call("T_from_h", h)
+
+    def isentropic_T(self, T1, pressure_ratio):
+        if self.inline:
+            return f"({T1} * ({pressure_ratio}) ** {self.isentropic})"
+        return self._call("isentropic_T", T1, pressure_ratio)
+
+    def pressure_ratio(self, T1, T2s):
+        if self.inline:
+            return f"(({T2s} / {T1}) ** {self.ratio})"
+        return self._call("pressure_ratio", T1, T2s)
+
+    def fuel(self):
+        """Fuel-air ratio already burnt in this gas."""
+        if self.fluid is None:
+            return f"{self.name}.f"
+        return repr(getattr(self.fluid, "f", 0.0))
+
+
+def _stages(engine) -> list:
+    """(role, node) for every stage from the diffuser on, in flow order."""
+    stages = []
+    node = engine.diff
+    seen_turbine = False
+    while node is not None:
+        if isinstance(node, Diffuser):
+            role = "diffuser"
+        elif isinstance(node, Compressor):
+            role = "compressor"
+        elif isinstance(node, Combustor):
+            role = "afterburner" if seen_turbine else "burner"
+            if role == "afterburner" and not engine.afterburner_included:
+                break
+        elif isinstance(node, Turbine):
+            role = "turbine"
+            seen_turbine = True
+        else:
+            raise TypeError(f"Cannot compile {type(node).__name__} stages")
+        stages.append((role, node))
+        if len(node._downstream) > 1:
+            raise ValueError("Cannot compile a branching component graph")
+        node = node._downstream[0] if node._downstream else None
+
+    roles = [role for role, _ in stages]
+    if roles[:1] != ["diffuser"] or "burner" not in roles:
+        raise ValueError("An engine needs a diffuser and a combustor")
+    if roles.count("turbine") > roles.count("compressor"):
+        raise ValueError("More turbine stages than compressor stages to drive")
+    return stages
+
+
+def compile_engine(engine):
+    """
+    Generate the plan function for engine. It takes p, T, u, eta_d, the stage
+    arguments (see ARGUMENTS), eta_n and mdot_air, all defaulting to the
+    engine's current values, and returns the same dict as engine.solve().
+    The generated source is kept on the function as .source.
+    """
+    stages = _stages(engine)
+    namespace = {"sqrt": math.sqrt, "ThermoState": ThermoState}
+    inlet = engine.diff.inlet
+    arguments = dict(p=inlet.p, T=inlet.T, u=inlet.u, eta_d=engine.diff.eta)
+    body = []
+    stations = {}  # result key -> (P variable, T variable), in flow order
+    gases = {}
+
+    def static(fluid):
+        if id(fluid) not in gases:
+            gases[id(fluid)] = _Gas(namespace, fluid)
+        return gases[id(fluid)]
+
+    counts = {role: 0 for role in STATIONS}
+    totals = {role: sum(r == role for r, _ in stages) for role in STATIONS}
+    compressors = []  # (T out, T in) still to be driven by a turbine
+    burnt = {"burner": [], "afterburner": []}
+    P, Tin = "P02", "T02"
+
+    for role, node in stages:
+        if role == "diffuser":
+            gas = static(node.fluid)
+            body += [
+                "# Diffuser",
+                f"ha = {gas.h('T')}",
+                "h02 = ha + 0.5 * u ** 2",
+                f"T02 = {gas.T_from_h('h02')}",
+                f"T02s = {gas.T_from_h('eta_d * (h02 - ha) + ha')}",
+                f"P02 = p * {gas.pressure_ratio('T', 'T02s')}",
+            ]
+            stations["T02"] = ("P02", "T02")
+            continue
+
+        counts[role] += 1
+        suffix = "" if counts[role] == totals[role] else f"_{counts[role]}"
+        key = STATIONS[role] + suffix
+        names = {}
+        for argument, attribute in ARGUMENTS[role]:
+            names[attribute] = argument + suffix
+            arguments[argument + suffix] = getattr(node, attribute)
+        Pout, Tout = "P" + key[1:], key
+        hi, ho, Ts = "hi" + key[1:], "ho" + key[1:], key + "s"
+        body.append(f"# {role.capitalize()} {key}")
+
+        if role == "compressor":
+            gas = static(node.fluid)
+            pr, eta = names["pi"], names["eta"]
+            body += [
+                f"{Pout} = {pr} * {P}",
+                f"{Ts} = {gas.isentropic_T(Tin, pr)}",
+                f"{hi} = {gas.h(Tin)}",
+                f"{Tout} = {gas.T_from_h(f'{hi} + ({gas.h(Ts)} - {hi}) / {eta}')}",
+            ]
+            compressors.append((Tout, Tin))
+        elif role in ("burner", "afterburner"):
+            if role == "burner" and not burnt["burner"]:
+                # The main combustor burns in its own fluid, like solve()
+                gas = static(node.fluid)
+            T04, Qr, eta = names["T04"], names["Qr"], names["eta"]
+            f = "f" + key[1:]
+            body += [
+                f"{hi} = {gas.h(Tin)}",
+                f"{ho} = {gas.h(T04)}",
+                f"{f} = ({ho} - {hi}) / ({Qr} * {eta} - {ho})",
+            ]
+            if node.products:
+                namespace["ProductsFluid"] = _products_fluid()
+                f_in = gas.fuel()
+                gas = _Gas(namespace, name="gas" + key[1:])
+                body += [
+                    f"for _ in range({PRODUCTS_ITERATIONS}):",
+                    f"    {ho} = ProductsFluid({f_in} + {f}).h({T04})",
+                    f"    {f} = ({ho} - {hi}) / ({Qr} * {eta} - {ho})",
+                    f"{gas.name} = ProductsFluid({f_in} + {f})",
+                ]
+            body.append(f"{Pout} = {P}")
+            Tout = T04
+            burnt[role].append(f)
+        else:
+            # Innermost compressors first; the last turbine takes the rest
+            last = counts[role] == totals[role]
+            driven = compressors[:] if last else compressors[-1:]
+            del compressors[len(compressors) - len(driven) :]
+            # As in Turbine: compressor work in compressor_fluid if given
+            air = gas
+            if node.compressor_fluid is not None:
+                air = static(node.compressor_fluid)
+            work = " + ".join(f"({air.h(T2)} - {air.h(T1)})" for T2, T1 in driven)
+            if len(driven) > 1:
+                work = f"({work})"
+            eta = names["eta"]
+            f = "(" + " + ".join(burnt["burner"]) + ")"
+            if len(burnt["burner"]) == 1:
+                f = burnt["burner"][0]
+            body += [
+                f"{hi} = {gas.h(Tin)}",
+                f"{ho} = {hi} - {work} / (1 + {f})",
+                f"{Tout} = {gas.T_from_h(ho)}",
+                f"{Ts} = {gas.T_from_h(f'{hi} - ({hi} - {ho}) / {eta}')}",
+                f"{Pout} = {P} * {gas.pressure_ratio(Tin, Ts)}",
+            ]
+        stations[key] = (Pout, Tout)
+        P, Tin = Pout, Tout
+
+    arguments["eta_n"] = engine.nozz.eta
+    arguments["mdot_air"] = engine.mdot_air
+    f = " + ".join(burnt["burner"])
+    body += [
+        "# Nozzle",
+        f"Tes = {gas.isentropic_T(Tin, f'p / {P}')}",
+        f"h0 = {gas.h(Tin)}",
+        f"he = h0 - eta_n * (h0 - {gas.h('Tes')})",
+        f"Te = {gas.T_from_h('he')}",
+        "ue = sqrt(2 * (h0 - he))",
+        "# Performance",
+        f"f = {f}",
+    ]
+    afterburner = bool(burnt["afterburner"])
+    if afterburner:
+        body += [
+            f"f_ab = {' + '.join(burnt['afterburner'])}",
+            "f_tot = f + f_ab",
+            "Thrust = mdot_air * (1 + f_tot) * ue - mdot_air * u",
+            "mdot_f = mdot_air * f_tot",
+        ]
+    else:
+        body += [
+            "Thrust = mdot_air * (1 + f) * ue - mdot_air * u",
+            "mdot_f = mdot_air * f",
+        ]
+
+    items = [
+        f'"{key}": ThermoState({P_}, {T_})'
+        for key, (P_, T_) in stations.items()
+        if not key.startswith("T06")
+    ]
+    items += ['"ue": ue', '"Te": Te', '"f": f']
+    items += ['"Thrust": Thrust', '"TSFC": mdot_f / Thrust']
+    items += ['"Isp": Thrust / (mdot_f * 9.81)']
+    if afterburner:
+        items += [
+            f'"{key}": ThermoState({P_}, {T_})'
+            for key, (P_, T_) in stations.items()
+            if key.startswith("T06")
+        ]
+        items += ['"f_ab": f_ab', '"f_total": f_tot']
+
+    for name, value in arguments.items():
+        namespace[f"_{name}"] = value
+    signature = ", ".join(f"{name}=_{name}" for name in arguments)
+    source = "\n".join(
+        [f"def plan({signature}):"]
+        + ["    " + line for line in body]
+        + ["    return {"]
+        + [f"        {item}," for item in items]
+        + ["    }", ""]
+    )
+
+    # Register the source so tracebacks through the plan show its lines
+    filename = f"<engine plan {next(_plans)}>"
+    linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+    exec(compile(source, filename, "exec"), namespace)
+    function = namespace["plan"]
+    function.source = source
+    function.arguments = tuple(arguments)
+    return function
+
+
+def _products_fluid():
+    from gas_tables import ProductsFluid
+
+    return ProductsFluid
@@ -1,70 +1,433 @@
-import matplotlib.pyplot as plt
-from CoolProp.CoolProp import PropsSI
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+
 import numpy as np
 from node import Fluid
 
+PLOT_TYPES = ("TS Diagram", "Station Diagram", "Performance Metrics", "Carpet Plot")
+STATIONS = (
+    "Inlet", "Station 02", "Station 03", "Station 04", "Station 05", "Station 06",
+    "Exit",
+)  # fmt: skip
+
+# With more runs than this the plotter switches to the large-data mode
+LARGE_RUNS = 200
+# Lines drawn per plot in the large-data mode; more runs are decimated
+MAX_LINES = 1000
+HISTOGRAM_BINS = 50
+
+# Carpet plot grid: ranges of the design variables and points along each
+CARPET_PR = (4.0, 30.0)
+CARPET_T04 = (1000.0, 1700.0)  # [K]
+CARPET_POINTS = 61
+CARPET_STYLES = ("Carpet", "Contour")
+# Quantities a contour map can show, with their axis labels
+CONTOUR_VARIABLES = {
+    "Specific Thrust": "Specific Thrust (N·s/kg)",
+    "TSFC": "TSFC [(g/s)/kN]",
+    "Isp": "Specific Impulse (s)",
+    "Fuel-Air Ratio": "Fuel-Air Ratio",
+}
+
+
+@lru_cache(maxsize=256)
+def reference_entropy(p, T):
+    """Specific entropy of air at (p, T) from CoolProp, cached per inlet state."""
+    from CoolProp.CoolProp import PropsSI
+
+    return PropsSI("S", "P", p, "T", T, "Air")
+
+
+def preload():
+    """
+    Import the slow plotting backends ahead of the first plot. CoolProp alone
+    takes seconds to load, so the GUI calls this on a background thread once
+    its window is up; importing this module itself stays cheap.
+    """
+    import CoolProp.CoolProp  # noqa: F401
+
 
-def plot_engine_results(results_list: list[dict], inlet_cond, plot_type):
+def station_data(results, inlet_cond):
     """
-    Plot pressure and temperature at each station, plus T-S diagram
+    Station names, labels, pressures, temperatures and entropies of one run
     """
-    fig_station, ax_station = plt.subplots(1, 1, figsize=(14, 6))
-    fig_TS, ax_TS = plt.subplots(1, 1, figsize=(14, 6))
-    ax_twin = ax_station.twinx()
-    fig_performance, ax_performance = plt.subplots(1, 2, figsize=(14,6))
-
-
-    for i, results in enumerate(results_list):
-        color = results["color"]
-
-        stations = ["Inlet", "Station 02", "Station 03", "Station 04", "Station 05"]
-        station_labels = ["0", "02", "03", "04", "05"]
-
-        # Extract pressure and temperature data
-        pressures = np.array(
-            [
-                inlet_cond.p,
-                results["T02"].P0,
-                results["T03"].P0,
-                results["T04"].P0,
-                results["T05"].P0,
-            ]
-        )
+    stations = ["Inlet", "Station 02", "Station 03", "Station 04", "Station 05"]
+    station_labels = ["0", "02", "03", "04", "05"]
+
+    # Extract pressure and temperature data
+    pressures = [
+        inlet_cond.p,
+        results["T02"].P0,
+        results["T03"].P0,
+        results["T04"].P0,
+        results["T05"].P0,
+    ]
+    temperatures = [
+        inlet_cond.T,
+        results["T02"].T0,
+        results["T03"].T0,
+        results["T04"].T0,
+        results["T05"].T0,
+    ]
+
+    if "T06" in results.keys():
+        pressures.append(results["T06"].P0)
+        temperatures.append(results["T06"].T0)
+        stations.append("Station 06")
+        station_labels.append("06")
+
+    pressures.append(inlet_cond.p)
+    temperatures.append(results["Te"])
+    stations.append("Exit")
+    station_labels.append("e")
+
+    pressures = np.array(pressures)
+    temperatures = np.array(temperatures)
+
+    # Baseline entropy and properties of air
+    s0 = reference_entropy(inlet_cond.p, inlet_cond.T)
+    air = Fluid(gamma=1.4, R=287)
+
+    # Compute specific entropies at each station, assuming calorically perfect
+    entropies = (
+        air.cp * np.log(temperatures / inlet_cond.T)
+        - air.R * np.log(pressures / inlet_cond.p)
+        + s0
+    )
+    return stations, station_labels, pressures, temperatures, entropies
 
-        temperatures = np.array(
-            [
-                inlet_cond.T,
-                results["T02"].T0,
-                results["T03"].T0,
-                results["T04"].T0,
-                results["T05"].T0,
-            ]
-        )
 
-        if "T06" in results.keys():
-            pressures = np.append(pressures, results["T06"].P0)
-            temperatures = np.append(temperatures, results["T06"].T0)
-            stations.append("Station 06")
-            station_labels.append("06")
+@dataclass
+class CarpetGrid:
+    params: dict  # the fixed engine parameters
+    pr: np.ndarray  # [1], shape (n,)
+    T04: np.ndarray  # [K], shape (m,)
+    values: dict  # CONTOUR_VARIABLES -> array of shape (n, m)
 
-        pressures = np.append(pressures, inlet_cond.p)
-        temperatures = np.append(temperatures, results["Te"])
-        stations.append("Exit")
-        station_labels.append("e")
 
-        # Baseline entropy and properties of air
-        s0 = PropsSI("S", "P", inlet_cond.p, "T", inlet_cond.T, "Air")
-        air = Fluid(gamma=1.4, R=287)
+_carpet_cache = OrderedDict()
+_carpet_lock = threading.Lock()
+CARPET_CACHE_SIZE = 16
+
+
+def carpet_grid(params: dict, pr=CARPET_PR, T04=CARPET_T04, points=CARPET_POINTS):
+    """
+    Evaluate the engine over a points x points grid of pr x T04 spanning the
+    given ranges, in one solve_batch call. params holds every other Engine
+    parameter (p, T, u, Qr, efficiencies, mdot_air and, for an afterburning
+    chart, afterburner_included, eta_ab, Qr_ab, T06); any pr or T04 in it is
+    ignored. Grids are cached by their parameters, so redrawing with other
+    display settings does not evaluate again.
+    """
+    from batch import solve_batch
+
+    fixed = {k: v for k, v in params.items() if k not in ("pr", "T04")}
+    # repr keeps floats exact and also covers unhashable values like fluids
+    key = repr((sorted(fixed.items()), tuple(pr), tuple(T04), points))
+    with _carpet_lock:
+        if key in _carpet_cache:
+            _carpet_cache.move_to_end(key)
+            return _carpet_cache[key]
+
+    pr_axis = np.linspace(*pr, points)
+    T04_axis = np.linspace(*T04, points)
+    pr_grid, T04_grid = np.meshgrid(pr_axis, T04_axis, indexing="ij")
+    with np.errstate(all="ignore"):
+        result = solve_batch(pr=pr_grid, T04=T04_grid, **fixed)
+    values = {
+        "Specific Thrust": result["Thrust"] / fixed["mdot_air"],  # [N*s/kg]
+        "TSFC": result["TSFC"] * 1e6,  # [(g/s)/kN]
+        "Isp": result["Isp"],  # [s]
+        "Fuel-Air Ratio": result.get("f_total", result["f"]),
+    }
+    # Points with no positive thrust are outside the useful design space
+    useless = ~(values["Specific Thrust"] > 0)
+    for name in values:
+        values[name] = np.where(useless, np.nan, values[name])
+    grid = CarpetGrid(params=fixed, pr=pr_axis, T04=T04_axis, values=values)
+    with _carpet_lock:
+        _carpet_cache[key] = grid
+        while len(_carpet_cache) > CARPET_CACHE_SIZE:
+            _carpet_cache.popitem(last=False)
+    return grid
+
+
+def draw_carpet(ax, grid: CarpetGrid, lines: int = 7, cax=None):
+    """
+    TSFC against specific thrust with lines of constant pr and of constant
+    T04, lines of each picked evenly from the grid. cax is hidden if given.
+    """
+    x, y = grid.values["Specific Thrust"], grid.values["TSFC"]
+    n, m = x.shape
+    for i in np.unique(np.linspace(0, n - 1, lines).round().astype(int)):
+        ax.plot(x[i], y[i], color="C0", linewidth=1.2)
+        ends = np.flatnonzero(np.isfinite(x[i]))
+        if len(ends):
+            j = ends[-1]
+            ax.annotate(
+                f"pr {grid.pr[i]:.3g}", (x[i, j], y[i, j]), fontsize=8, color="C0"
+            )
+    for j in np.unique(np.linspace(0, m - 1, lines).round().astype(int)):
+        ax.plot(x[:, j], y[:, j], color="C1", linewidth=1.2)
+        ends = np.flatnonzero(np.isfinite(x[:, j]))
+        if len(ends):
+            i = ends[0]
+            ax.annotate(
+                f"{grid.T04[j]:.0f} K",
+                (x[i, j], y[i, j]),
+                xytext=(0, -12),
+                textcoords="offset points",
+                fontsize=8,
+                color="C1",
+            )
+    # TSFC grows without bound as specific thrust goes to zero; keep the
+    # useful part of the chart in view
+    finite = y[np.isfinite(y)]
+    if finite.size:
+        ax.set_ylim(0.9 * finite.min(), 1.1 * np.percentile(finite, 90))
+    ax.set_xlabel("Specific Thrust (N·s/kg)", fontsize=11)
+    ax.set_ylabel("TSFC [(g/s)/kN]", fontsize=11)
+    if cax is not None:
+        cax.set_visible(False)
+
+
+def draw_contour(ax, grid: CarpetGrid, variable="Specific Thrust", cax=None):
+    """
+    Filled contours of variable over pr x T04, with TSFC contour lines on top
+    (specific thrust lines when TSFC is the variable).
+    """
+
+    def levels(values, n):
+        # Spread over the bulk of the values; TSFC has a long tail near zero
+        # thrust that would otherwise take up every level
+        lo, hi = np.nanpercentile(values, (2, 95))
+        return np.linspace(lo, hi, n)
+
+    values = grid.values[variable]
+    filled = ax.contourf(
+        grid.T04, grid.pr, values, levels=levels(values, 20), extend="both"
+    )
+    other = grid.values["TSFC" if variable != "TSFC" else "Specific Thrust"]
+    lines = ax.contour(
+        grid.T04,
+        grid.pr,
+        other,
+        levels=levels(other, 10),
+        colors="k",
+        linewidths=0.6,
+    )
+    ax.clabel(lines, fontsize=7, fmt="%.3g")
+    ax.set_xlabel("Turbine Inlet Temperature T04 (K)", fontsize=11)
+    ax.set_ylabel("Compressor Pressure Ratio", fontsize=11)
+    if cax is not None:
+        cax.set_visible(True)
+        ax.figure.colorbar(filled, cax=cax, label=CONTOUR_VARIABLES[variable])
 
-        # Compute specific entropies at each station, assuming calorically perfect
-        entropies = (
-            air.cp * np.log(temperatures / inlet_cond.T)
-            - air.R * np.log(pressures / inlet_cond.p)
-            + s0
-        )
 
-        # Plot 1: Pressure and Temperature vs Station
-        x_pos = range(len(stations))
+class EnginePlotter:
+    """
+    Keeps one persistent figure per plot type. Runs are queued with add_run
+    and only the runs not yet drawn are added to a figure when it is requested,
+    so the cost of showing a plot does not grow with the number of runs.
+
+    The Carpet Plot is drawn from carpet_params (the engine parameters other
+    than pr and T04) in carpet_style, not from the runs. Its grid is cached, so
+    changing carpet_style, carpet_lines or contour_variable only redraws.
+
+    With more than LARGE_RUNS runs (or large=True) the plotter switches to a
+    large-data mode whose render time does not depend on the number of runs:
+    station and T-s lines of at most max_lines evenly spaced runs are drawn as
+    one LineCollection per axis, the performance metrics become histograms,
+    and only the runs in highlight are drawn individually with annotations.
+    """
+
+    def __init__(self, large=None, max_lines=MAX_LINES):
+        self.runs = []  # (results, inlet_cond) per run
+        self.figures = {}
+        self.axes = {}
+        self.drawn = {}  # number of runs already drawn in each figure
+        self.large = large  # None: switch automatically above LARGE_RUNS
+        self.max_lines = max_lines
+        self.highlight = set()  # run indices drawn in full in large-data mode
+        self._mode = {}  # "large" or "runs", per figure
+        self._table = {}  # station and performance arrays of every run
+        self._tabled = 0  # runs already in _table
+        self._stations = []  # station_data of the first runs, see prepare
+        # Guards swapping the caches above in clear() against a prepare()
+        # still running on a worker thread
+        self._lock = threading.Lock()
+        self.carpet_params = None
+        self.carpet_style = "Carpet"  # one of CARPET_STYLES
+        self.carpet_lines = 7
+        self.contour_variable = "Specific Thrust"
+
+    def add_run(self, results: dict, inlet_cond):
+        self.runs.append((results, inlet_cond))
+
+    def clear(self):
+        """
+        Remove every run. The figures are kept and only reset. Does not wait
+        for a prepare() running on another thread; what it computes for the
+        old runs is dropped.
+        """
+        with self._lock:
+            self.runs = []
+            self._table, self._tabled = {}, 0
+            self._stations = []
+        self.highlight = set()
+        for plot_type in self.figures:
+            self._reset(plot_type)
+
+    def _reset(self, plot_type):
+        for ax in self.figures[plot_type].axes:
+            ax.cla()
+        self._setup(plot_type)
+        self.drawn[plot_type] = 0
+
+    def is_large(self) -> bool:
+        """Whether figures are drawn in the large-data mode."""
+        return len(self.runs) > LARGE_RUNS if self.large is None else self.large
+
+    def create_figure(self, plot_type):
+        """Return the figure for plot_type, creating it empty if needed."""
+        if plot_type not in PLOT_TYPES:
+            raise ValueError(f"Unknown plot type {plot_type!r}")
+        if plot_type not in self.figures:
+            self._create(plot_type)
+        return self.figures[plot_type]
+
+    def prepare(self, plot_type, progress=None, cancelled=None):
+        """
+        Compute what drawing plot_type needs (station data of new runs, the
+        large-data arrays or the carpet grid) without touching any artist, so
+        it may run on a worker thread while figure() runs on the UI thread.
+        progress and cancelled are as for figure().
+        """
+        if plot_type == "Carpet Plot":
+            if self.carpet_params is not None:
+                carpet_grid(self.carpet_params)
+            return
+        if self.is_large():
+            self._update_table()
+            return
+        # clear() replaces both lists, so after a clear this only fills the
+        # old ones
+        runs, stations = self.runs, self._stations
+        total = len(runs)
+        for i in range(len(stations), total):
+            if cancelled is not None and cancelled():
+                break
+            stations.append(station_data(*runs[i]))
+            if progress is not None:
+                progress(i + 1, total)
+
+    def _station_data(self, i, results, inlet_cond):
+        if i < len(self._stations):
+            return self._stations[i]
+        return station_data(results, inlet_cond)
+
+    def figure(self, plot_type, progress=None, cancelled=None):
+        """
+        Return the figure for plot_type with every queued run drawn into it.
+        progress(done, total) is called after each new run is drawn; if
+        cancelled() returns True drawing stops early and the remaining runs
+        are drawn on the next call.
+        """
+        fig = self.create_figure(plot_type)
+        if plot_type == "Carpet Plot":
+            self._reset(plot_type)
+            self._draw_carpet()
+            return fig
+        mode = "large" if self.is_large() else "runs"
+        if self._mode.get(plot_type, "runs") != mode or mode == "large":
+            # Large-data figures are redrawn whole; their cost is bounded
+            self._reset(plot_type)
+            self._mode[plot_type] = mode
+        if mode == "large":
+            self._draw_large(plot_type)
+            self.drawn[plot_type] = len(self.runs)
+            if progress is not None:
+                progress(len(self.runs), len(self.runs))
+            return fig
+        draw = {
+            "TS Diagram": self._draw_ts,
+            "Station Diagram": self._draw_station,
+            "Performance Metrics": self._draw_performance,
+        }[plot_type]
+        total = len(self.runs)
+        for i in range(self.drawn[plot_type], total):
+            if cancelled is not None and cancelled():
+                break
+            draw(i, *self.runs[i])
+            self.drawn[plot_type] = i + 1
+            if progress is not None:
+                progress(i + 1, total)
+        return fig
+
+    def _create(self, plot_type):
+        import matplotlib.pyplot as plt
+
+        if plot_type == "TS Diagram":
+            fig, ax = plt.subplots(1, 1, figsize=(14, 6))
+            self.axes[plot_type] = ax
+        elif plot_type == "Station Diagram":
+            fig, ax = plt.subplots(1, 1, figsize=(14, 6))
+            self.axes[plot_type] = (ax, ax.twinx())
+        elif plot_type == "Carpet Plot":
+            # Second axes holds the colorbar of contour maps
+            fig, ax = plt.subplots(
+                1, 2, figsize=(14, 6), gridspec_kw={"width_ratios": (40, 1)}
+            )
+            self.axes[plot_type] = ax
+        else:
+            fig, ax = plt.subplots(1, 2, figsize=(14, 6))
+            self.axes[plot_type] = ax
+        self.figures[plot_type] = fig
+        self.drawn[plot_type] = 0
+        self._setup(plot_type)
+        # Lay out once here rather than per run: tight_layout renders the
+        # whole figure, which would make every update scale with the runs
+        fig.tight_layout()
+
+    def _setup(self, plot_type):
+        """Draw the decorations that do not depend on the runs."""
+        if plot_type == "TS Diagram":
+            ax_TS = self.axes[plot_type]
+            ax_TS.set_xlabel("Specific Entropy (J/kg·K)", fontsize=11)
+            ax_TS.set_ylabel("Temperature (K)", fontsize=11)
+            ax_TS.set_title("Temperature-Entropy Diagram", fontsize=12, pad=15)
+            ax_TS.grid(True, alpha=0.3)
+        elif plot_type == "Station Diagram":
+            ax_station, ax_twin = self.axes[plot_type]
+            ax_station.set_xlabel("Station", fontsize=11)
+            ax_station.set_ylabel("Pressure (kPa)", fontsize=11)
+            ax_station.tick_params(axis="y")
+            # Every station gets a fixed position so dry and wet runs line up
+            ax_station.set_xticks(range(len(STATIONS)))
+            ax_station.set_xticklabels(STATIONS, rotation=45, ha="right")
+            ax_station.grid(True, alpha=0.3)
+            ax_station.set_title(
+                "Pressure and Temperature at Each Station", fontsize=12, pad=15
+            )
+            ax_twin.set_ylabel("Temperature (K)", fontsize=11)
+            ax_twin.tick_params(axis="y")
+        elif plot_type == "Carpet Plot":
+            self.axes[plot_type][0].grid(True, alpha=0.3)
+        else:
+            ax_performance = self.axes[plot_type]
+            ax_performance[0].set_ylabel(f"Thrust (kN)")
+            ax_performance[1].set_ylabel(f"Thrust Specific Fuel Consumption [(g/s)/kN]")
+            self.figures[plot_type].suptitle(f"Thrust and TSFC Metrics", fontsize=12)
+
+    def _draw_station(self, i, results, inlet_cond):
+        ax_station, ax_twin = self.axes["Station Diagram"]
+        color = results.get("color")
+        stations, _, pressures, temperatures, _ = self._station_data(
+            i, results, inlet_cond
+        )
+        x_pos = [STATIONS.index(station) for station in stations]
 
         line1 = ax_station.plot(
             x_pos,
@@ -75,13 +438,6 @@ def plot_engine_results(results_list: list[dict], inlet_cond, plot_type):
             markersize=8,
             label="Pressure",
         )
-        ax_station.set_xlabel("Station", fontsize=11)
-        ax_station.set_ylabel("Pressure (kPa)", fontsize=11)
-        ax_station.tick_params(axis="y")
-        ax_station.set_xticks(x_pos)
-        ax_station.set_xticklabels(stations, rotation=45, ha="right")
-        ax_station.grid(True, alpha=0.3)
-
         line2 = ax_twin.plot(
             x_pos,
             temperatures,
@@ -91,98 +447,245 @@ def plot_engine_results(results_list: list[dict], inlet_cond, plot_type):
             markersize=8,
             label="Temperature",
         )
-        ax_twin.set_ylabel("Temperature (K)", fontsize=11)
-        ax_twin.tick_params(axis="y")
-
-        lines = line1 + line2
-        labels = [l.get_label() for l in lines]
-        ax_station.legend(lines, labels, loc="upper left")
-        ax_station.set_title(
-            "Pressure and Temperature at Each Station", fontsize=12, pad=15
-        )
-
-        plt.tight_layout()
-
-        # Plot 2: T-S Diagram
-
-        valid_s = [s for s in entropies if s is not None]
-        valid_T = [T for s, T in zip(entropies, temperatures) if s is not None]
-
-        if len(valid_s) > 0:
-            ax_TS.plot(valid_s, valid_T, "o--", linewidth=2, markersize=8, color=color)
-
-            # Add station labels
-            for s, T, label in zip(valid_s, valid_T, station_labels):
-                ax_TS.annotate(
-                    label,
-                    (s, T),
-                    xytext=(5, 5),
-                    textcoords="offset points",
-                    fontsize=9,
-                    bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.3),
-                )
-
-            # Add isobar lines
-            s_min, s_max = min(valid_s), max(valid_s)
-            s_plot = np.linspace(s_min, s_max, 100)
 
-            # Draw isobars for key pressure levels
-            pressure_levels = [
-                inlet_cond.p,
-                results["T03"].P0,
-                results["T05"].P0,
-            ]  # [Pa]
+        if ax_station.get_legend() is None:
+            lines = line1 + line2
+            labels = [l.get_label() for l in lines]
+            ax_station.legend(lines, labels, loc="upper left")
 
-            delta_s = entropies - s0
-
-            for p in pressure_levels:
-                delta_s = s_plot - s0
-                T_isobar = inlet_cond.T * np.exp(
-                    (delta_s + air.R * np.log(p / inlet_cond.p)) / air.cp
-                )
-
-                if len(T_isobar) > 2:
-                    ax_TS.plot(
-                        s_plot, T_isobar, "--", color="gray", alpha=0.4, linewidth=0.8
-                    )
-                    if len(T_isobar) > 0:
-                        ax_TS.text(
-                            s_plot[-1],
-                            T_isobar[-1],
-                            f"{p / 1000:0.0f} kPa",
-                            fontsize=7,
-                            color="gray",
-                            alpha=0.6,
-                        )
-
-            ax_TS.set_xlabel("Specific Entropy (J/kg·K)", fontsize=11)
-            ax_TS.set_ylabel("Temperature (K)", fontsize=11)
-            ax_TS.set_title("Temperature-Entropy Diagram", fontsize=12, pad=15)
-            ax_TS.grid(True, alpha=0.3)
+    def _draw_ts(self, i, results, inlet_cond):
+        ax_TS = self.axes["TS Diagram"]
+        color = results.get("color")
+        _, station_labels, _, temperatures, entropies = self._station_data(
+            i, results, inlet_cond
+        )
+        s0 = reference_entropy(inlet_cond.p, inlet_cond.T)
+        air = Fluid(gamma=1.4, R=287)
 
-        plt.tight_layout()
+        ax_TS.plot(
+            entropies, temperatures, "o--", linewidth=2, markersize=8, color=color
+        )
 
-        # Plot 3: Performance Metrics
+        # Add station labels
+        for s, T, label in zip(entropies, temperatures, station_labels):
+            ax_TS.annotate(
+                label,
+                (s, T),
+                xytext=(5, 5),
+                textcoords="offset points",
+                fontsize=9,
+                bbox=dict(boxstyle="round,pad=0.3", facecolor="yellow", alpha=0.3),
+            )
+
+        # Add isobar lines for key pressure levels
+        s_plot = np.linspace(entropies.min(), entropies.max(), 100)
+        pressure_levels = [
+            inlet_cond.p,
+            results["T03"].P0,
+            results["T05"].P0,
+        ]  # [Pa]
+
+        for p in pressure_levels:
+            delta_s = s_plot - s0
+            T_isobar = inlet_cond.T * np.exp(
+                (delta_s + air.R * np.log(p / inlet_cond.p)) / air.cp
+            )
+            ax_TS.plot(s_plot, T_isobar, "--", color="gray", alpha=0.4, linewidth=0.8)
+            ax_TS.text(
+                s_plot[-1],
+                T_isobar[-1],
+                f"{p / 1000:0.0f} kPa",
+                fontsize=7,
+                color="gray",
+                alpha=0.6,
+            )
+
+    def _draw_performance(self, i, results, inlet_cond):
+        ax_performance = self.axes["Performance Metrics"]
+        color = results.get("color")
 
         # Thrust
-        bar_thrust = ax_performance[0].bar(f"Run {i}", results["Thrust"] * 1e-3, color=color)
-        ax_performance[0].set_ylabel(f"Thrust (kN)")
-        ax_performance[0].bar_label(bar_thrust, label_type='edge')
+        bar_thrust = ax_performance[0].bar(
+            f"Run {i}", results["Thrust"] * 1e-3, color=color
+        )
+        ax_performance[0].bar_label(bar_thrust, label_type="edge")
 
         bar_tsfc = ax_performance[1].bar(f"Run {i}", results["TSFC"] * 1e6, color=color)
-        ax_performance[1].set_ylabel(f"Thrust Specific Fuel Consumption [(g/s)/kN]")
-        ax_performance[1].bar_label(bar_tsfc, label_type='edge')
-
-        fig_performance.suptitle(f"Thrust and TSFC Metrics", fontsize=12)
-
-        plt.tight_layout()
+        ax_performance[1].bar_label(bar_tsfc, label_type="edge")
+
+    def _draw_carpet(self):
+        ax, cax = self.axes["Carpet Plot"]
+        if self.carpet_params is None:
+            cax.set_visible(False)
+            ax.text(0.5, 0.5, "No engine parameters yet", ha="center", va="center")
+            return
+        grid = carpet_grid(self.carpet_params)
+        if self.carpet_style == "Contour":
+            draw_contour(ax, grid, self.contour_variable, cax=cax)
+            design = None
+            if "pr" in self.carpet_params and "T04" in self.carpet_params:
+                design = (self.carpet_params["T04"], self.carpet_params["pr"])
+        else:
+            draw_carpet(ax, grid, self.carpet_lines, cax=cax)
+            design = self._design_point()
+        if design is not None:
+            ax.plot(*design, "*", color="C3", markersize=14, label="Current engine")
+            ax.legend(loc="best")
+        title = "Turbojet Design Chart"
+        if grid.params.get("afterburner_included"):
+            title += f" (afterburner, T06 = {grid.params['T06']:.0f} K)"
+        ax.set_title(title, fontsize=12, pad=15)
+        self.figures["Carpet Plot"].tight_layout()
+
+    def _design_point(self):
+        """(specific thrust, TSFC) of carpet_params, or None if incomplete."""
+        from batch import solve_batch
+
+        params = self.carpet_params
+        if "pr" not in params or "T04" not in params:
+            return None
+        with np.errstate(all="ignore"):
+            result = solve_batch(**params)
+        return result["Thrust"] / params["mdot_air"], result["TSFC"] * 1e6
+
+    def _update_table(self):
+        """Append the station and performance values of new runs to _table."""
+        # Runs may be added meanwhile on another thread; they wait for next time
+        with self._lock:
+            table, runs, tabled = self._table, self.runs, self._tabled
+        total = len(runs)
+        new = runs[tabled:total]
+        if not new:
+            return table
+        nan = float("nan")
+        rows = []
+        for results, inlet in new:
+            stage06 = results.get("T06")
+            T02, T03, T04, T05 = (results[k] for k in ("T02", "T03", "T04", "T05"))
+            rows.append(
+                (
+                    inlet.p, T02.P0, T03.P0, T04.P0, T05.P0,
+                    stage06.P0 if stage06 is not None else nan, inlet.p,
+                    inlet.T, T02.T0, T03.T0, T04.T0, T05.T0,
+                    stage06.T0 if stage06 is not None else nan, results["Te"],
+                    results["Thrust"], results["TSFC"],
+                )
+            )  # fmt: skip
+        rows = np.array(rows, dtype=float)
+        P, T = rows[:, :7], rows[:, 7:14]
+        # Entropy as in station_data, with one reference per distinct inlet
+        inlets, inverse = np.unique(P[:, 0] + 1j * T[:, 0], return_inverse=True)
+        s0 = np.array([reference_entropy(z.real, z.imag) for z in inlets])
+        air = Fluid(gamma=1.4, R=287)
+        s = (
+            air.cp * np.log(T / T[:, :1])
+            - air.R * np.log(P / P[:, :1])
+            + s0[inverse.ravel()][:, None]
+        )
+        colors = [results.get("color") for results, _ in new]
+        chunk = dict(P=P, T=T, s=s, Thrust=rows[:, 14], TSFC=rows[:, 15])
+        with self._lock:
+            if self._table is not table:
+                return table  # cleared meanwhile
+            for key, values in chunk.items():
+                if key in table:
+                    values = np.concatenate([table[key], values])
+                table[key] = values
+            table["color"] = table.get("color", []) + colors
+            self._tabled = total
+        return table
+
+    def _sample(self):
+        """Indices of the runs drawn as lines: all, or max_lines evenly spaced."""
+        n = len(self.runs)
+        if n <= self.max_lines:
+            return np.arange(n)
+        return np.unique(np.linspace(0, n - 1, self.max_lines).astype(int))
+
+    def _collection(self, ax, x, y, index, colors):
+        from matplotlib.collections import LineCollection
+        from matplotlib.colors import to_rgba
+
+        # Dry runs have no station 06; drop the missing point from their line
+        segments = []
+        for i in index:
+            valid = np.isfinite(x[i]) & np.isfinite(y[i])
+            segments.append(np.column_stack([x[i][valid], y[i][valid]]))
+        rgba = [to_rgba(colors[i] or "C0", alpha=0.3) for i in index]
+        lines = LineCollection(segments, colors=rgba, linewidths=0.8)
+        ax.add_collection(lines)
+        ax.autoscale_view()
+        return lines
+
+    def _draw_large(self, plot_type):
+        table = self._update_table()
+        n = len(self.runs)
+        highlight = sorted(i for i in self.highlight if 0 <= i < n)
+        if not n:
+            return
+        index = self._sample()
+        shown = f"{len(index)} of {n} runs" if len(index) < n else f"{n} runs"
+
+        if plot_type == "TS Diagram":
+            ax_TS = self.axes[plot_type]
+            self._collection(ax_TS, table["s"], table["T"], index, table["color"])
+            ax_TS.set_title(f"Temperature-Entropy Diagram ({shown})", fontsize=12)
+            for i in highlight:
+                self._draw_ts(i, *self.runs[i])
+        elif plot_type == "Station Diagram":
+            ax_station, ax_twin = self.axes[plot_type]
+            x = np.broadcast_to(np.arange(len(STATIONS), dtype=float), (n, 7))
+            self._collection(ax_station, x, table["P"] / 1000, index, table["color"])
+            self._collection(ax_twin, x, table["T"], index, table["color"])
+            ax_station.set_title(
+                f"Pressure and Temperature at Each Station ({shown})", fontsize=12
+            )
+            for i in highlight:
+                self._draw_station(i, *self.runs[i])
+        else:
+            ax_performance = self.axes[plot_type]
+            for ax, values, label in (
+                (ax_performance[0], table["Thrust"] * 1e-3, "Thrust (kN)"),
+                (ax_performance[1], table["TSFC"] * 1e6, "TSFC [(g/s)/kN]"),
+            ):
+                finite = values[np.isfinite(values)]
+                ax.hist(finite, bins=HISTOGRAM_BINS, color="C0", alpha=0.7)
+                ax.set_xlabel(label)
+                ax.set_ylabel("Runs")
+                for i in highlight:
+                    color = table["color"][i] or "C3"
+                    ax.axvline(values[i], color=color, linewidth=1.5)
+                    ax.annotate(
+                        f"Run {i}: {values[i]:.3g}",
+                        (values[i], 1),
+                        xycoords=("data", "axes fraction"),
+                        xytext=(3, -12),
+                        textcoords="offset points",
+                        fontsize=8,
+                        color=color,
+                    )
+            self.figures[plot_type].suptitle(
+                f"Thrust and TSFC Distributions ({n} runs)", fontsize=12
+            )
 
-    figs = {"TS Diagram": fig_TS, "Station Diagram": fig_station, "Performance Metrics": fig_performance}
 
-    return figs[plot_type]
+def plot_engine_results(
+    results_list: list[dict], inlet_cond, plot_type, highlight=(), large=None
+):
+    """
+    Plot pressure and temperature at each station, plus T-S diagram. Past
+    LARGE_RUNS runs (or with large=True) the large-data mode is used, in which
+    only the runs indexed by highlight are annotated.
+    """
+    plotter = EnginePlotter(large=large)
+    plotter.highlight = set(highlight)
+    for results in results_list:
+        plotter.add_run(results, inlet_cond)
+    return plotter.figure(plot_type)
 
 
 if __name__ == "__main__":
+    import matplotlib.pyplot as plt
     from engine import Engine
     from diffuser import InletConditions
 
@@ -0,0 +1,161 @@
+"""
+Opt-in per-component profiling for scalar solves.
+
+Node.get_outlet_conditions, Nozzle.get_outlet_conditions and Engine.solve
+report to the active Profile, if any. While none is active each hook is a
+single attribute check, so the hooks stay in place for production runs.
+
+    with Profile() as prof:
+        engine.solve()
+    print(prof.summary())
+    prof.to_json("profile.json")
+"""
+
+import json
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+# The Profile currently collecting, or None
+active = None
+
+
+@dataclass
+class ComponentStats:
+    calls: int = 0
+    hits: int = 0  # cached outlet returned without computing
+    misses: int = 0  # outlet computed
+    total: float = 0.0  # [s] wall time of computing calls, upstream included
+    self_time: float = 0.0  # [s] total minus time spent in nested profiled calls
+    max_time: float = 0.0  # [s] slowest single computing call
+    cached: bool = False  # whether the component caches its outlet at all
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.misses if self.misses else 0.0
+
+
+class Profile:
+    """
+    Collects ComponentStats per component name while entered as a context
+    manager. Profiles nest: the inner one collects until it exits, then the
+    outer one resumes. Solves on several threads may share one Profile.
+    """
+
+    def __init__(self):
+        self.stats = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._previous = []
+
+    def __enter__(self):
+        global active
+        self._previous.append(active)
+        active = self
+        return self
+
+    def __exit__(self, *exc_info):
+        global active
+        active = self._previous.pop()
+
+    def _get(self, name) -> ComponentStats:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats.setdefault(name, ComponentStats())
+        return stats
+
+    def hit(self, name):
+        """Record a call answered from the cache."""
+        with self._lock:
+            stats = self._get(name)
+            stats.calls += 1
+            stats.hits += 1
+            stats.cached = True
+
+    def measure(self, name, fn, *args, cached=False):
+        """Call fn(*args) and record it as one computing call of name."""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        stack.append(0.0)  # time spent in nested calls
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                stats = self._get(name)
+                stats.calls += 1
+                stats.misses += 1
+                stats.total += elapsed
+                stats.self_time += elapsed - nested
+                stats.max_time = max(stats.max_time, elapsed)
+                stats.cached |= cached
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {name: asdict(stats) for name, stats in self.stats.items()}
+
+    def to_json(self, path=None) -> str:
+        """JSON export of the stats; also written to path if given."""
+        text = json.dumps(self.to_dict(), indent=2)
+        if path is not None:
+            with open(path, "w") as file:
+                file.write(text)
+        return text
+
+    def summary(self) -> str:
+        """Table of the stats, slowest component (by self time) first."""
+        header = (
+            f"{'component':<16} {'calls':>8} {'hits':>8} {'misses':>8}"
+            f" {'total ms':>10} {'self ms':>10} {'mean us':>9} {'max us':>9}"
+        )
+        lines = [header, "-" * len(header)]
+        with self._lock:
+            items = sorted(self.stats.items(), key=lambda item: -item[1].self_time)
+            for name, s in items:
+                hits = f"{s.hits:8d}" if s.cached else f"{'-':>8}"
+                misses = f"{s.misses:8d}" if s.cached else f"{'-':>8}"
+                lines.append(
+                    f"{name:<16} {s.calls:8d} {hits} {misses}"
+                    f" {s.total * 1e3:10.3f} {s.self_time * 1e3:10.3f}"
+                    f" {s.mean * 1e6:9.2f} {s.max_time * 1e6:9.2f}"
+                )
+        return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    # Run as a script this module is __main__; the hooks read the imported one
+    import profiling
+    from diffuser import InletConditions
+    from engine import Engine
+
+    engine = Engine(
+        InletConditions(p=101325, T=288, u=250),
+        pr=8.3,
+        T04=1250,
+        Qr=43e6,
+        eta_d=0.95,
+        eta_c=0.82,
+        eta_b=0.98,
+        eta_t=0.88,
+        eta_n=0.97,
+        mdot_air=20,
+        afterburner_included=True,
+        eta_ab=0.95,
+        Qr_ab=43e6,
+        T06=2000,
+    )
+    with profiling.Profile() as prof:
+        for pr in range(4, 20):
+            engine.comp.pi = pr
+            for _ in range(100):
+                engine.solve()
+    print(prof.summary())
@@ -0,0 +1,207 @@
+"""
+Headless batch runner: solve engine cases streamed from a CSV or JSONL file
+and stream the results to CSV, JSONL or a column directory.
+
+Each input row holds one set of Engine parameters, named as in sweep.PARAMETERS
+(p, T, u, pr, T04, Qr, eta_d, eta_c, eta_b, eta_t, eta_n, mdot_air and the
+optional afterburner_included, eta_ab, Qr_ab, T06). Parameters missing from the
+file can be given once with --set. Rows are read and solved in batches of
+--batch-size, so memory use does not depend on the number of cases.
+
+    python run_cases.py cases.csv results.csv
+    python run_cases.py cases.jsonl results.jsonl --set mdot_air=20
+    python run_cases.py cases.csv results_dir --format columns
+
+Only NumPy is imported; no plotting or GUI packages are loaded.
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+from itertools import islice
+
+import numpy as np
+
+from batch import solve_batch, to_columns
+from sweep import PARAMETERS, ColumnFileSink, input_column
+
+AFTERBURNER_DEFAULTS = {
+    "afterburner_included": False,
+    "eta_ab": 1.0,
+    "Qr_ab": 1.0,
+    "T06": 1.0,
+}
+TRUE = {"1", "true", "yes", "on", "y", "t"}
+
+
+def parse_bool(value) -> bool:
+    """Boolean parameter from a file or command line value, e.g. "yes", 1."""
+    if isinstance(value, str):
+        return value.strip().lower() in TRUE
+    return bool(value)
+
+
+def read_cases(file, fmt):
+    """Yield one dict of raw parameter values per case."""
+    if fmt == "csv":
+        yield from csv.DictReader(file)
+    else:
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _batch_inputs(rows, defaults, first_row):
+    """Turn a list of case dicts into one array per Engine parameter."""
+    inputs = {}
+    for name in PARAMETERS:
+        values = []
+        for i, row in enumerate(rows):
+            value = row.get(name)
+            if value is None or value == "":
+                value = defaults.get(name, AFTERBURNER_DEFAULTS.get(name))
+            if value is None:
+                raise ValueError(f"Case {first_row + i}: missing parameter {name!r}")
+            if name == "afterburner_included":
+                value = parse_bool(value)
+            else:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError):
+                    raise ValueError(
+                        f"Case {first_row + i}: {name} must be a number"
+                    ) from None
+            values.append(value)
+        inputs[name] = np.array(values)
+    return inputs
+
+
+class CsvWriter:
+    def __init__(self, file):
+        self.writer = csv.writer(file)
+        self.header = None
+
+    def write(self, columns: dict):
+        if self.header is None:
+            self.header = list(columns)
+            self.writer.writerow(self.header)
+        self.writer.writerows(zip(*(columns[key].tolist() for key in self.header)))
+
+    def close(self):
+        pass
+
+
+class JsonlWriter:
+    def __init__(self, file):
+        self.file = file
+
+    def write(self, columns: dict):
+        keys = list(columns)
+        for row in zip(*(columns[key].tolist() for key in keys)):
+            # Failed solves as null, since NaN is not valid JSON
+            case = {k: v if math.isfinite(v) else None for k, v in zip(keys, row)}
+            self.file.write(json.dumps(case, allow_nan=False) + "\n")
+
+    def close(self):
+        pass
+
+
+def run(source, sink, fmt, defaults=None, batch_size=4096, **solve_options):
+    """
+    Solve every case read from the open file source in batches and write the
+    inputs plus RESULT_COLUMNS to sink. Returns the number of cases solved.
+    """
+    defaults = dict(defaults or {})
+    rows = read_cases(source, fmt)
+    n = 0
+    while True:
+        chunk = list(islice(rows, batch_size))
+        if not chunk:
+            break
+        inputs = _batch_inputs(chunk, defaults, n)
+        result = solve_batch(**inputs, **solve_options)
+        # T04 and T06 are also stations; the inputs are kept as T04_in, T06_in
+        columns = {
+            input_column(name): inputs[name].astype(float) for name in PARAMETERS
+        }
+        columns.update(to_columns(result))
+        sink.write(columns)
+        n += len(chunk)
+    return n
+
+
+def _format(path, explicit):
+    if explicit:
+        return explicit
+    if path.endswith(".jsonl") or path.endswith(".ndjson"):
+        return "jsonl"
+    if path.endswith(".csv") or path == "-":
+        return "csv"
+    return "columns"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("input", help="CSV or JSONL case file, or - for stdin")
+    parser.add_argument("output", help="CSV/JSONL file, column directory, or -")
+    parser.add_argument("--input-format", choices=("csv", "jsonl"))
+    parser.add_argument("--format", choices=("csv", "jsonl", "columns"))
+    parser.add_argument("--batch-size", type=int, default=4096)
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="value for a parameter missing from the input (repeatable)",
+    )
+    parser.add_argument(
+        "--variable-cp", action="store_true", help="use gas_tables.VariableCpFluid"
+    )
+    parser.add_argument(
+        "--products", action="store_true", help="use combustion products downstream"
+    )
+    args = parser.parse_args(argv)
+
+    defaults = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        if name not in PARAMETERS:
+            parser.error(f"unknown parameter {name!r}")
+        defaults[name] = value
+
+    solve_options = {"products": args.products}
+    if args.variable_cp:
+        from gas_tables import VariableCpFluid
+
+        solve_options["fluid"] = VariableCpFluid()
+
+    in_fmt = args.input_format or (
+        "jsonl" if _format(args.input, None) == "jsonl" else "csv"
+    )
+    out_fmt = _format(args.output, args.format)
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline="")
+    if out_fmt == "columns":
+        target = None
+        sink = ColumnFileSink(args.output)
+    else:
+        if args.output == "-":
+            target = sys.stdout
+        else:
+            target = open(args.output, "w", newline="")
+        sink = CsvWriter(target) if out_fmt == "csv" else JsonlWriter(target)
+    try:
+        n = run(source, sink, in_fmt, defaults, args.batch_size, **solve_options)
+    finally:
+        sink.close()
+        if source is not sys.stdin:
+            source.close()
+        if target not in (None, sys.stdout):
+            target.close()
+    print(f"Solved {n} cases", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
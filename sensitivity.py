@@ -0,0 +1,305 @@
+"""
+Batch sensitivities of the engine outputs with respect to its inputs.
+
+For the calorically perfect Fluid the derivatives are exact, computed in
+forward mode: every input carries a tangent per differentiated input (a
+Dual), and the component equations of batch.py propagate all tangents for
+all points at once, so one pass gives the whole Jacobian. The table-backed
+fluids interpolate with integer indices that tangents cannot pass through,
+so for them central differences are used, again with every perturbed copy
+solved in one solve_batch call.
+"""
+
+import inspect
+import time
+from dataclasses import dataclass
+
+import numpy as np
+
+from batch import (
+    RESULT_COLUMNS,
+    combustor,
+    compressor,
+    diffuser,
+    nozzle,
+    solve_batch,
+    to_columns,
+    turbine,
+)
+from node import Fluid
+from sweep import PARAMETERS
+
+OUTPUTS = ("Thrust", "TSFC", "Isp", "ue", "f")
+# Every numeric Engine input
+INPUTS = tuple(name for name in PARAMETERS if name != "afterburner_included")
+
+CENTRAL_STEP = 6e-6  # relative, about the cube root of machine epsilon
+
+_DEFAULTS = {
+    name: parameter.default
+    for name, parameter in inspect.signature(solve_batch).parameters.items()
+    if parameter.default is not inspect.Parameter.empty
+}
+
+
+class Dual:
+    """
+    Forward-mode value: x of shape (n,) and its tangents dx of shape (k, n),
+    one row per input differentiated. Supports the arithmetic, powers with
+    constant exponents and np.sqrt used by the component equations.
+    """
+
+    __slots__ = ("x", "dx")
+
+    def __init__(self, x, dx):
+        self.x = x
+        self.dx = dx
+
+    def __add__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.x + other.x, self.dx + other.dx)
+        return Dual(self.x + other, self.dx)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        return Dual(-self.x, -self.dx)
+
+    def __sub__(self, other):
+        return self + -other
+
+    def __rsub__(self, other):
+        return -self + other
+
+    def __mul__(self, other):
+        if isinstance(other, Dual):
+            return Dual(self.x * other.x, self.dx * other.x + self.x * other.dx)
+        return Dual(self.x * other, self.dx * other)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        if isinstance(other, Dual):
+            q = self.x / other.x
+            return Dual(q, (self.dx - q * other.dx) / other.x)
+        return Dual(self.x / other, self.dx / other)
+
+    def __rtruediv__(self, other):
+        q = other / self.x
+        return Dual(q, -q / self.x * self.dx)
+
+    def __pow__(self, c):
+        if c == 2:
+            return Dual(self.x * self.x, 2 * self.x * self.dx)
+        return Dual(self.x**c, c * self.x ** (c - 1) * self.dx)
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        # ndarray (op) Dual lands here; route it to the operators above
+        if method != "__call__" or kwargs:
+            return NotImplemented
+        if ufunc is np.sqrt:
+            s = np.sqrt(self.x)
+            return Dual(s, self.dx / (2 * s))
+        reflected = {
+            np.add: "__radd__",
+            np.subtract: "__rsub__",
+            np.multiply: "__rmul__",
+            np.divide: "__rtruediv__",
+        }
+        if ufunc in reflected:
+            a, b = inputs
+            if isinstance(a, Dual):
+                return getattr(a, reflected[ufunc].replace("__r", "__"))(b)
+            return getattr(b, reflected[ufunc])(a)
+        return NotImplemented
+
+
+def _where(mask, a, b):
+    """np.where for Duals (and plain arrays)."""
+    if not isinstance(a, Dual) and not isinstance(b, Dual):
+        return np.where(mask, a, b)
+    a = a if isinstance(a, Dual) else Dual(a, 0.0)
+    b = b if isinstance(b, Dual) else Dual(b, 0.0)
+    return Dual(np.where(mask, a.x, b.x), np.where(mask, a.dx, b.dx))
+
+
+def _forward(v: dict, ab, fluid) -> dict:
+    """solve_batch on Duals, for the calorically perfect fluid."""
+    P02, T02 = diffuser(v["p"], v["T"], v["u"], v["eta_d"], fluid)
+    P03, T03 = compressor(P02, T02, v["pr"], v["eta_c"], fluid)
+    f, _ = combustor(T03, v["T04"], v["Qr"], v["eta_b"], fluid)
+    P05, T05 = turbine(P03, v["T04"], T03, T02, f, v["eta_t"], fluid, fluid)
+    T06 = _where(ab, v["T06"], T05)
+    f_ab, _ = combustor(T05, T06, v["Qr_ab"], v["eta_ab"], fluid)
+    f_ab = _where(ab, f_ab, 0.0)
+    f_tot = f + f_ab
+    ue, Te = nozzle(P05, T06, v["p"], v["eta_n"], fluid)
+
+    mdot_air = v["mdot_air"]
+    Thrust = mdot_air * (1 + f_tot) * ue - mdot_air * v["u"]
+    mdot_f = mdot_air * f_tot
+    return dict(
+        P02=P02, T02=T02, P03=P03, T03=T03, P04=P03, T04=v["T04"], P05=P05,
+        T05=T05, P06=P05, T06=T06, ue=ue, Te=Te, f=f, f_ab=f_ab, f_total=f_tot,
+        Thrust=Thrust, TSFC=mdot_f / Thrust, Isp=Thrust / (mdot_f * 9.81),
+    )  # fmt: skip
+
+
+def _forward_chunk(base, wrt, outputs, options):
+    """Jacobian (n, outputs, wrt) of one chunk of flat inputs, forward mode."""
+    n, k = len(base["p"]), len(wrt)
+    values = dict(base)
+    for j, name in enumerate(wrt):
+        dx = np.zeros((k, n))
+        dx[j] = 1.0
+        values[name] = Dual(base[name], dx)
+    ab = options["afterburner_included"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        result = _forward(values, ab, options["fluid"])
+    jacobian = np.zeros((n, len(outputs), k))
+    for o, output in enumerate(outputs):
+        y = result[output]
+        if isinstance(y, Dual):
+            jacobian[:, o, :] = np.broadcast_to(y.dx, (k, n)).T
+    return jacobian
+
+
+def _central_chunk(base, wrt, outputs, options):
+    """Jacobian (n, outputs, wrt) of one chunk of flat inputs, central."""
+    n, k = len(base["p"]), len(wrt)
+    # Copy 2j perturbs wrt[j] up, copy 2j + 1 down; all solved in one call
+    stacked = {name: np.tile(x, 2 * k) for name, x in base.items()}
+    for j, name in enumerate(wrt):
+        x = base[name]
+        h = CENTRAL_STEP * np.where(x != 0, np.abs(x), 1.0)
+        stacked[name][2 * j * n : (2 * j + 1) * n] = x + h
+        stacked[name][(2 * j + 1) * n : (2 * j + 2) * n] = x - h
+    options = dict(
+        options, afterburner_included=np.tile(options["afterburner_included"], 2 * k)
+    )
+    columns = to_columns(solve_batch(**stacked, **options))
+
+    jacobian = np.empty((n, len(outputs), k))
+    for j, name in enumerate(wrt):
+        x = base[name]
+        h = CENTRAL_STEP * np.where(x != 0, np.abs(x), 1.0)
+        for o, output in enumerate(outputs):
+            y = columns[output].reshape(2 * k, n)
+            jacobian[:, o, j] = (y[2 * j] - y[2 * j + 1]) / (2 * h)
+    return jacobian
+
+
+@dataclass
+class Sensitivities:
+    outputs: tuple
+    inputs: tuple
+    at: dict  # input values the derivatives were taken at
+    values: dict  # output values there
+    jacobian: np.ndarray  # shape + (len(outputs), len(inputs))
+    method: str  # "forward" or "central"
+    wall_time: float  # [s]
+    solve_time: float  # [s] of one plain solve_batch over the same points
+
+    @property
+    def relative_cost(self) -> float:
+        """Wall time in units of one plain solve of the same points."""
+        return self.wall_time / self.solve_time
+
+    def __getitem__(self, key):
+        """d output / d input for key = (output, input)."""
+        output, name = key
+        return self.jacobian[..., self.outputs.index(output), self.inputs.index(name)]
+
+    def elasticity(self) -> np.ndarray:
+        """Relative sensitivities (dy/y) / (dx/x), same layout as jacobian."""
+        y = np.stack([self.values[name] for name in self.outputs], axis=-1)
+        x = np.stack([self.at[name] for name in self.inputs], axis=-1)
+        return self.jacobian * x[..., None, :] / y[..., :, None]
+
+
+def jacobian(
+    outputs=OUTPUTS, wrt=INPUTS, method="auto", chunk_size=512, **inputs
+) -> Sensitivities:
+    """
+    Derivatives of outputs (result columns, see batch.RESULT_COLUMNS) with
+    respect to the inputs named in wrt, at every point of a solve_batch call.
+    inputs are the solve_batch arguments, broadcast against each other; the
+    afterburner inputs default as in solve_batch. method is "forward",
+    "central" or "auto" (forward whenever the fluid allows it). Points are
+    processed chunk_size at a time, which bounds memory and keeps the
+    tangent arrays in cache.
+    """
+    start = time.perf_counter()
+    outputs, wrt = tuple(outputs), tuple(wrt)
+    unknown = (set(wrt) - set(INPUTS)) | (set(outputs) - set(RESULT_COLUMNS))
+    if unknown:
+        raise ValueError(f"Unknown inputs or outputs: {sorted(unknown)}")
+    options = {
+        key: inputs.pop(key, _DEFAULTS[key])
+        for key in ("afterburner_included", "fluid", "products")
+    }
+    if method == "auto":
+        plain = type(options["fluid"]) is Fluid and not options["products"]
+        method = "forward" if plain else "central"
+    chunk_jacobian = {"forward": _forward_chunk, "central": _central_chunk}[method]
+
+    values = [inputs.get(name, _DEFAULTS.get(name)) for name in INPUTS]
+    arrays = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in values))
+    shape = arrays[0].shape
+    base = {name: a.ravel() for name, a in zip(INPUTS, arrays)}
+    ab = np.broadcast_to(options["afterburner_included"], shape).ravel()
+
+    solve_start = time.perf_counter()
+    result = to_columns(solve_batch(**base, **dict(options, afterburner_included=ab)))
+    solve_time = time.perf_counter() - solve_start
+
+    n = len(base["p"])
+    J = np.empty((n, len(outputs), len(wrt)))
+    for lo in range(0, n, chunk_size):
+        hi = min(lo + chunk_size, n)
+        chunk = {name: x[lo:hi] for name, x in base.items()}
+        chunk_options = dict(options, afterburner_included=ab[lo:hi])
+        J[lo:hi] = chunk_jacobian(chunk, wrt, outputs, chunk_options)
+
+    # Where the plain solve fails, so do its derivatives
+    for o, output in enumerate(outputs):
+        J[~np.isfinite(result[output]), o, :] = np.nan
+
+    return Sensitivities(
+        outputs=outputs,
+        inputs=wrt,
+        at={name: base[name].reshape(shape) for name in wrt},
+        values={name: result[name].reshape(shape) for name in outputs},
+        jacobian=J.reshape(shape + (len(outputs), len(wrt))),
+        method=method,
+        wall_time=time.perf_counter() - start,
+        solve_time=solve_time,
+    )
+
+
+if __name__ == "__main__":
+    n = 100000
+    sens = jacobian(
+        p=101325,
+        T=288,
+        u=250,
+        pr=np.linspace(4, 20, n),
+        T04=1250,
+        Qr=43e6,
+        eta_d=0.95,
+        eta_c=0.82,
+        eta_b=0.98,
+        eta_t=0.88,
+        eta_n=0.97,
+        mdot_air=20,
+        afterburner_included=True,
+        eta_ab=0.95,
+        Qr_ab=43e6,
+        T06=2000,
+    )
+    print(f"{n} points, {len(sens.inputs)} inputs, {sens.method} mode:")
+    print(f"{sens.wall_time * 1e3:.1f} ms, {sens.relative_cost:.1f}x one plain solve")
+    i = n // 4
+    print(f"At pr = {sens.at['pr'][i]:.2f}:")
+    for name in sens.inputs:
+        print(f"  dThrust/d{name:<8} {sens['Thrust', name][i]: .6e}")
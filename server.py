@@ -0,0 +1,357 @@
+"""
+Local solve server: engine performance over HTTP with micro-batching.
+
+Requests arriving within a short window (--window-ms) are collected into one
+micro-batch, solved together with solve_batch on a worker thread and the
+results fanned back out, so many concurrent single-point queries cost about
+as much as one batch. While a batch is being solved the next one collects.
+At most --max-queue cases wait at a time; beyond that requests are refused
+with 503 and a Retry-After header instead of queueing without bound; a
+request with more cases than --max-queue is refused with 413.
+
+    python server.py --port 8765 --set mdot_air=20
+    python server.py --unix /tmp/engine.sock
+
+Endpoints (HTTP/1.1, keep-alive):
+    POST /solve    one case as a JSON object, or a JSON list of cases; returns
+                   the RESULT_COLUMNS of each (null for failed solves)
+    GET /metrics   request, batch, latency and throughput statistics
+    GET /health    {"status": "ok"}
+
+Cases name their parameters as in sweep.PARAMETERS; missing ones are taken
+from --set, then from the afterburner defaults of run_cases.
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from batch import RESULT_COLUMNS, solve_batch, to_columns
+from run_cases import AFTERBURNER_DEFAULTS, parse_bool
+from sweep import PARAMETERS
+
+# Latencies kept for the percentiles in /metrics
+LATENCY_WINDOW = 10000
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    413: "Payload Too Large",
+    503: "Service Unavailable",
+}
+
+
+class Metrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.requests = 0  # cases answered
+        self.rejected = 0  # cases refused because the queue was full
+        self.invalid = 0  # cases refused as malformed
+        self.batches = 0
+        self.largest_batch = 0
+        self.solve_time = 0.0  # [s] spent in solve_batch
+        self.latencies = deque(maxlen=LATENCY_WINDOW)  # [s] enqueue to answer
+        self._recent = deque()  # answer times within the last second
+
+    def record(self, latency):
+        now = time.perf_counter()
+        self.requests += 1
+        self.latencies.append(latency)
+        self._recent.append(now)
+        self._prune(now)
+
+    def _prune(self, now):
+        while self._recent and self._recent[0] < now - 1.0:
+            self._recent.popleft()
+
+    def to_dict(self, queued=0) -> dict:
+        now = time.perf_counter()
+        # Pruned here too, or an idle server would report its last burst
+        self._prune(now)
+        uptime = now - self.started
+        latencies = np.array(self.latencies) * 1e3
+        p50, p95, p99 = (
+            np.percentile(latencies, (50, 95, 99)) if len(latencies) else (0, 0, 0)
+        )
+        return {
+            "uptime_s": uptime,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "queued": queued,
+            "batches": self.batches,
+            "mean_batch": self.requests / self.batches if self.batches else 0.0,
+            "largest_batch": self.largest_batch,
+            "solve_time_s": self.solve_time,
+            "throughput_per_s": self.requests / uptime,
+            "recent_per_s": len(self._recent),
+            "latency_ms": {"p50": p50, "p95": p95, "p99": p99},
+        }
+
+
+def parse_case(case: dict, defaults: dict) -> list:
+    """Parameter values of one case in PARAMETERS order; ValueError if invalid."""
+    if not isinstance(case, dict):
+        raise ValueError("A case must be a JSON object")
+    unknown = set(case) - set(PARAMETERS)
+    if unknown:
+        raise ValueError(f"Unknown parameters: {sorted(unknown)}")
+    values = []
+    for name in PARAMETERS:
+        value = case.get(name)
+        if value is None:
+            value = defaults.get(name, AFTERBURNER_DEFAULTS.get(name))
+        if value is None:
+            raise ValueError(f"Missing parameter {name!r}")
+        if name == "afterburner_included":
+            values.append(float(parse_bool(value)))
+        else:
+            try:
+                values.append(float(value))
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be a number") from None
+    return values
+
+
+class SolveServer:
+    """
+    Micro-batching front end to solve_batch. window is how long [s] the
+    first case of a batch waits for company, max_batch caps the batch size
+    and max_queue the cases waiting; solve_options go to solve_batch.
+    """
+
+    def __init__(
+        self,
+        window=0.002,
+        max_batch=4096,
+        max_queue=16384,
+        defaults=None,
+        **solve_options,
+    ):
+        self.window = window
+        self.max_batch = max_batch
+        self.defaults = dict(defaults or {})
+        self.solve_options = solve_options
+        self.metrics = Metrics()
+        self._queue = asyncio.Queue(maxsize=max_queue)
+        self._batcher = None
+
+    def start(self):
+        if self._batcher is None:
+            self._batcher = asyncio.create_task(self._run_batches())
+
+    async def stop(self):
+        if self._batcher is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+            self._batcher = None
+
+    def submit(self, case: dict) -> asyncio.Future:
+        """
+        Queue one case and return the future of its result dict. Raises
+        ValueError for a malformed case and asyncio.QueueFull when the server
+        is saturated.
+        """
+        return self._submit([self._parse(case)])[0]
+
+    def _parse(self, case):
+        try:
+            return parse_case(case, self.defaults)
+        except ValueError:
+            self.metrics.invalid += 1
+            raise
+
+    def _submit(self, cases: list) -> list:
+        """Queue all of cases (parsed) or, if they do not fit, none of them."""
+        if self._queue.qsize() + len(cases) > self._queue.maxsize:
+            self.metrics.rejected += len(cases)
+            raise asyncio.QueueFull
+        loop = asyncio.get_running_loop()
+        futures = []
+        for values in cases:
+            future = loop.create_future()
+            self._queue.put_nowait((values, future, time.perf_counter()))
+            futures.append(future)
+        return futures
+
+    def _solve(self, rows: np.ndarray) -> dict:
+        inputs = {name: rows[:, j] for j, name in enumerate(PARAMETERS)}
+        inputs["afterburner_included"] = inputs["afterburner_included"] != 0
+        with np.errstate(all="ignore"):
+            return to_columns(solve_batch(**inputs, **self.solve_options))
+
+    async def _run_batches(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_batch:
+                if self._queue.empty():
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                    batch.append(item)
+                else:
+                    batch.append(self._queue.get_nowait())
+
+            rows = np.array([values for values, _, _ in batch])
+            start = time.perf_counter()
+            try:
+                # On a thread, so the loop keeps accepting the next batch
+                columns = await loop.run_in_executor(None, self._solve, rows)
+            except Exception as error:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error)
+                continue
+            self.metrics.solve_time += time.perf_counter() - start
+            self.metrics.batches += 1
+            self.metrics.largest_batch = max(self.metrics.largest_batch, len(batch))
+
+            table = np.column_stack([columns[name] for name in RESULT_COLUMNS])
+            now = time.perf_counter()
+            for (_, future, queued), row in zip(batch, table.tolist()):
+                if not future.done():
+                    future.set_result(
+                        {
+                            name: value if math.isfinite(value) else None
+                            for name, value in zip(RESULT_COLUMNS, row)
+                        }
+                    )
+                self.metrics.record(now - queued)
+
+    async def _respond(self, method, path, body):
+        """(status, payload) for one HTTP request."""
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/metrics":
+            return 200, self.metrics.to_dict(self._queue.qsize())
+        if method != "POST" or path != "/solve":
+            return 404, {"error": f"No route for {method} {path}"}
+        try:
+            cases = json.loads(body)
+            single = isinstance(cases, dict)
+            if isinstance(cases, list) and len(cases) > self._queue.maxsize:
+                # Would never fit the queue, so retrying cannot help
+                return 413, {
+                    "error": f"At most {self._queue.maxsize} cases per request"
+                }
+            futures = self._submit(
+                [self._parse(case) for case in ([cases] if single else cases)]
+            )
+        except asyncio.QueueFull:
+            return 503, {"error": "Server busy, retry later"}
+        except (ValueError, TypeError) as error:
+            return 400, {"error": str(error)}
+        results = await asyncio.gather(*futures)
+        return 200, results[0] if single else results
+
+    async def handle(self, reader, writer):
+        """Serve HTTP/1.1 requests on one connection until it closes."""
+        try:
+            while True:
+                request = await reader.readline()
+                if not request:
+                    break
+                method, path, version = request.decode("latin-1").split()
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                status, payload = await self._respond(method, path, body)
+                data = json.dumps(payload).encode()
+                keep_alive = headers.get("connection", "").lower() != "close" and (
+                    version == "HTTP/1.1"
+                )
+                head = [
+                    f"HTTP/1.1 {status} {REASONS[status]}",
+                    "Content-Type: application/json",
+                    f"Content-Length: {len(data)}",
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}",
+                ]
+                if status == 503:
+                    head.append("Retry-After: 1")
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass  # client went away or sent something that is not HTTP
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=8765, unix=None):
+        """Serve until cancelled, on a Unix socket if unix is a path."""
+        self.start()
+        if unix is not None:
+            server = await asyncio.start_unix_server(self.handle, path=unix)
+        else:
+            server = await asyncio.start_server(self.handle, host, port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.stop()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="serve on this Unix socket path instead")
+    parser.add_argument(
+        "--window-ms", type=float, default=2.0, help="batching window (default 2)"
+    )
+    parser.add_argument("--max-batch", type=int, default=4096)
+    parser.add_argument(
+        "--max-queue",
+        type=int,
+        default=16384,
+        help="cases allowed to wait before requests get 503 (default 16384)",
+    )
+    parser.add_argument(
+        "--set",
+        action="append",
+        default=[],
+        metavar="NAME=VALUE",
+        help="default for a parameter missing from requests",
+    )
+    args = parser.parse_args(argv)
+
+    defaults = {}
+    for item in args.set:
+        name, _, value = item.partition("=")
+        if name not in PARAMETERS:
+            parser.error(f"Unknown parameter {name!r}")
+        defaults[name] = value
+
+    async def run():
+        server = SolveServer(
+            window=args.window_ms / 1e3,
+            max_batch=args.max_batch,
+            max_queue=args.max_queue,
+            defaults=defaults,
+        )
+        where = args.unix or f"http://{args.host}:{args.port}"
+        print(f"Serving on {where}", flush=True)
+        await server.serve(args.host, args.port, args.unix)
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
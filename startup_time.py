@@ -0,0 +1,140 @@
+"""
+Import-time harness: measures how long each entry point takes to import in a
+fresh interpreter and fails if any exceeds its budget.
+
+Cold runs use an empty bytecode cache (PYTHONPYCACHEPREFIX pointing at a new
+directory), so every module is compiled from source as on a first launch.
+Warm runs reuse that cache and report the best of --repeat runs. Only the
+import itself is timed, not interpreter startup.
+
+    python startup_time.py
+    python startup_time.py --budget gui:warm=0.2 --json startup.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ENTRY_POINTS = ("engine", "plot_engine", "gui")
+
+# Seconds. Generous enough for a slow laptop; an accidental module-level
+# import of matplotlib or CoolProp blows straight through them
+BUDGETS = {
+    "engine": {"cold": 0.5, "warm": 0.1},
+    "plot_engine": {"cold": 1.0, "warm": 0.3},
+    "gui": {"cold": 2.0, "warm": 0.5},
+}
+
+# Reported so a budget failure says which backend was pulled in
+HEAVY_MODULES = ("numpy", "matplotlib", "CoolProp", "PyQt5")
+
+_PROBE = """
+import sys, time, json
+t = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - t
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": elapsed, "loaded": heavy}}))
+"""
+
+
+def measure(module, pycache, repeat=1) -> dict:
+    """Best import time of module over repeat fresh interpreters."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, PYTHONPYCACHEPREFIX=pycache, QT_QPA_PLATFORM="offscreen")
+    # The cold run must write the cache the warm runs read back
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [here, env.get("PYTHONPATH")]))
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    best = None
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            cwd=here,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        run = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or run["seconds"] < best["seconds"]:
+            best = run
+    return best
+
+
+def run(entry_points=ENTRY_POINTS, budgets=None, repeat=5) -> dict:
+    """
+    Cold and warm import times for each entry point, with the budget each is
+    checked against and whether it passed.
+    """
+    budgets = budgets or BUDGETS
+    report = {}
+    for module in entry_points:
+        with tempfile.TemporaryDirectory() as pycache:
+            cold = measure(module, pycache)
+            warm = measure(module, pycache, repeat)
+        entry = {"loaded": warm["loaded"]}
+        for kind, result in (("cold", cold), ("warm", warm)):
+            budget = budgets.get(module, {}).get(kind, float("inf"))
+            entry[kind] = {
+                "seconds": result["seconds"],
+                "budget": budget,
+                "ok": result["seconds"] <= budget,
+            }
+        report[module] = entry
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("modules", nargs="*", default=ENTRY_POINTS)
+    parser.add_argument("--repeat", type=int, default=5, help="warm runs per module")
+    parser.add_argument(
+        "--budget",
+        action="append",
+        default=[],
+        metavar="MODULE:KIND=SECONDS",
+        help="override a budget, e.g. gui:warm=0.2 (repeatable)",
+    )
+    parser.add_argument("--json", help="also write the report to this file")
+    args = parser.parse_args(argv)
+
+    budgets = {module: dict(limits) for module, limits in BUDGETS.items()}
+    for item in args.budget:
+        key, _, seconds = item.partition("=")
+        module, _, kind = key.partition(":")
+        if kind not in ("cold", "warm"):
+            parser.error(f"budget {item!r} must be MODULE:cold=S or MODULE:warm=S")
+        budgets.setdefault(module, {})[kind] = float(seconds)
+
+    report = run(args.modules, budgets, args.repeat)
+
+    print(f"{'module':<12} {'cold [s]':>14} {'warm [s]':>14}  loaded")
+    for module, entry in report.items():
+        cells = [
+            f"{entry[kind]['seconds']:7.3f}/{entry[kind]['budget']:<5g}"
+            + ("" if entry[kind]["ok"] else "!")
+            for kind in ("cold", "warm")
+        ]
+        loaded = ", ".join(entry["loaded"])
+        print(f"{module:<12} {cells[0]:>14} {cells[1]:>14}  {loaded}")
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(report, file, indent=2)
+
+    failed = [
+        f"{module} ({kind})"
+        for module, entry in report.items()
+        for kind in ("cold", "warm")
+        if not entry[kind]["ok"]
+    ]
+    if failed:
+        print("Over budget: " + ", ".join(failed), file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import numpy as np
+
+from batch import RESULT_COLUMNS, to_columns
+
+
+class ResultStore:
+    """
+    Compact, append-only store of engine results as a structured NumPy array,
+    one float64 field per column (144 bytes per run with the default fields).
+
+    Rows are appended from single solve() results (append) or from column
+    dicts such as to_columns output or sweep chunks (extend). The store is also
+    a sweep sink. save() writes a plain .npy file whose dtype is the schema;
+    load() memory-maps it back without parsing.
+    """
+
+    def __init__(self, fields=RESULT_COLUMNS, capacity: int = 1024):
+        self.dtype = np.dtype([(name, "<f8") for name in fields])
+        self._records = np.empty(capacity, dtype=self.dtype)
+        self._length = 0
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def fields(self) -> tuple:
+        return self.dtype.names
+
+    @property
+    def records(self) -> np.ndarray:
+        """Structured array of the stored rows (a view, not a copy)."""
+        return self._records[: self._length]
+
+    def __getitem__(self, key):
+        return self.records[key]
+
+    def _reserve(self, n):
+        needed = self._length + n
+        if needed > len(self._records) or not self._records.flags.writeable:
+            capacity = max(needed, 2 * len(self._records), 1)
+            records = np.empty(capacity, dtype=self.dtype)
+            records[: self._length] = self._records[: self._length]
+            self._records = records
+
+    def extend(self, columns: dict):
+        """Append rows given as a dict of equal-length columns."""
+        n = len(next(iter(columns.values())))
+        self._reserve(n)
+        rows = self._records[self._length : self._length + n]
+        for name in self.fields:
+            rows[name] = columns[name]
+        self._length += n
+
+    def append(self, result: dict, **inputs):
+        """
+        Append one Engine.solve() result. Extra fields of the schema (e.g. the
+        inputs of the run) are given as keyword arguments.
+        """
+        columns = to_columns(result)
+        columns.update((key, np.atleast_1d(value)) for key, value in inputs.items())
+        self.extend(columns)
+
+    # Sweep sink interface
+    def write(self, columns: dict):
+        self.extend(columns)
+
+    def close(self):
+        pass
+
+    def save(self, path):
+        np.save(path, self.records)
+
+    @classmethod
+    def load(cls, path, mmap_mode="r"):
+        """
+        Open a saved store. With the default mmap_mode the records are memory
+        mapped read-only; appending afterwards copies them into memory.
+        """
+        records = np.load(path, mmap_mode=mmap_mode)
+        store = cls(fields=records.dtype.names, capacity=0)
+        store._records = records
+        store._length = len(records)
+        return store
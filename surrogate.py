@@ -0,0 +1,337 @@
+"""
+Surrogate model of the engine: fast approximate answers inside a fitted
+domain, exact ones outside it.
+
+A Surrogate is fitted once from a sweep over a box of chosen inputs (the
+domain), with every other input fixed. Smooth per-unit-flow quantities (ue
+and f_total, plus any other requested column) are tabulated on the regular
+grid of the sweep and queried by multilinear interpolation, 2^d table reads
+per point for d domain inputs. Thrust, TSFC and Isp are then computed from
+them exactly as solve_batch does, since they change sign or blow up where
+the thrust vanishes and interpolate poorly there. Fitting also solves random
+held-out points exactly and records the error per output (see ErrorBounds),
+which travels with the saved model.
+
+Queries outside the domain, with a fixed input changed, or whose table cell
+holds failed solves are answered by solve_batch instead, so no query gets a
+worse answer than an exact solve. save() writes the table as .npy, which
+load() memory-maps, plus a pickle of the settings; only load models from
+directories you trust. A model fitted with other model sources (see
+cache.model_version) is refused.
+"""
+
+import os
+import pickle
+from dataclasses import dataclass
+
+import numpy as np
+
+from batch import RESULT_COLUMNS, solve_batch, to_columns
+from cache import model_version
+from sweep import PARAMETERS, Sweep
+
+OUTPUTS = ("Thrust", "TSFC", "Isp", "f_total")
+# Outputs computed from the tabulated ue**2 and f_total instead of tabulated
+DERIVED = ("ue", "Thrust", "TSFC", "Isp")
+GRID_POINTS = 33  # per domain input
+HOLDOUT = 2000
+BLOCK = 8192  # points interpolated at a time
+
+
+@dataclass
+class ErrorBounds:
+    """Error of one output against the exact solve over held-out points."""
+
+    max_abs: float
+    max_rel: float
+    q99_rel: float  # 99th percentile of the relative error
+    rms_rel: float
+    samples: int  # held-out points answered by the table
+
+
+def _tabulated(outputs) -> tuple:
+    """Result columns to tabulate for outputs."""
+    columns = []
+    for name in outputs:
+        columns += ["ue2", "f_total"] if name in DERIVED else [name]
+    return tuple(dict.fromkeys(columns))
+
+
+class Surrogate:
+    """
+    Interpolating table over the box domain (name -> (lo, hi)), with the
+    other solve_batch inputs, and fluid or products if wanted, in fixed.
+    Build one with Surrogate.fit or Surrogate.load; query it like
+    solve_batch with surrogate(**inputs).
+    """
+
+    def __init__(self, domain, fixed, outputs, table, errors=None, version=None):
+        self.names = tuple(domain)
+        self.lo = np.array([domain[name][0] for name in self.names], dtype=float)
+        self.hi = np.array([domain[name][1] for name in self.names], dtype=float)
+        self.fixed = dict(fixed)
+        self.outputs = tuple(outputs)
+        self.columns = _tabulated(self.outputs)
+        self.table = table  # (columns,) + grid shape
+        self.errors = dict(errors or {})
+        self.version = model_version() if version is None else version
+        self.queries = 0
+        self.fallbacks = 0  # points answered by the exact solver
+        shape = table.shape[1:]
+        self._points = np.array(shape)
+        self._scale = (self._points - 1) / (self.hi - self.lo)
+        self._strides = np.array(
+            [int(np.prod(shape[j + 1 :])) for j in range(len(shape))], dtype=np.intp
+        )
+
+    @property
+    def domain(self) -> dict:
+        return {n: (lo, hi) for n, lo, hi in zip(self.names, self.lo, self.hi)}
+
+    @classmethod
+    def fit(
+        cls,
+        domain: dict,
+        fixed: dict,
+        outputs=OUTPUTS,
+        points=GRID_POINTS,
+        holdout: int = HOLDOUT,
+        workers: int = 1,
+        seed: int = 0,
+    ) -> "Surrogate":
+        """
+        Sweep a grid of points per domain input (or a dict of them) over
+        domain and tabulate what outputs need, then measure the error on
+        holdout random points. workers is passed to the Sweep.
+        """
+        unknown = (set(domain) - set(PARAMETERS) - {"afterburner_included"}) | (
+            set(outputs) - set(RESULT_COLUMNS)
+        )
+        if unknown:
+            raise ValueError(f"Unknown inputs or outputs: {sorted(unknown)}")
+        if set(domain) & set(fixed):
+            raise ValueError("An input cannot be both in the domain and fixed")
+        if not isinstance(points, dict):
+            points = dict.fromkeys(domain, points)
+        if any(points[name] < 2 for name in domain):
+            raise ValueError("Every domain input needs at least 2 grid points")
+        empty = [name for name, (lo, hi) in domain.items() if not lo < hi]
+        if empty:
+            raise ValueError(f"Domain inputs need lo < hi: {sorted(empty)}")
+
+        grid = {
+            name: np.linspace(lo, hi, points[name]) for name, (lo, hi) in domain.items()
+        }
+        sweep = Sweep(grid, fixed, workers=workers)
+        with np.errstate(all="ignore"):
+            columns = sweep.run().columns()
+        shape = tuple(points[name] for name in domain)
+        columns["ue2"] = columns["ue"] ** 2
+        table = np.stack([columns[name].reshape(shape) for name in _tabulated(outputs)])
+        surrogate = cls(domain, fixed, outputs, table)
+        if holdout:
+            surrogate.errors = surrogate.validate(holdout, seed)
+        return surrogate
+
+    def _interpolate(self, x) -> dict:
+        """Tabulated columns at the rows of x, which lie inside the domain."""
+        values = {name: np.empty(len(x)) for name in self.columns}
+        flat = [table.reshape(-1) for table in self.table]
+        # In blocks whose temporaries stay in cache, about twice as fast
+        for start in range(0, len(x), BLOCK):
+            block = slice(start, start + BLOCK)
+            pos = (x[block] - self.lo) * self._scale
+            cell = np.minimum(pos.astype(np.intp), self._points - 2)
+            w = pos - cell
+            # Flat index and weight of every corner of each point's cell
+            index, weight = [cell @ self._strides], [1.0]
+            for j, stride in enumerate(self._strides):
+                wj = w[:, j]
+                index += [i + stride for i in index]
+                weight = [a * (1.0 - wj) for a in weight] + [a * wj for a in weight]
+            for name, table in zip(self.columns, flat):
+                value = weight[0] * table.take(index[0])
+                for i, a in zip(index[1:], weight[1:]):
+                    value += a * table.take(i)
+                values[name][block] = value
+        return values
+
+    def _approximate(self, x, inputs: dict) -> dict:
+        """Outputs at the rows of x from the table; inputs holds their columns."""
+        values = self._interpolate(x)
+        if any(name in DERIVED for name in self.outputs):
+            u = inputs.get("u", self.fixed.get("u"))
+            mdot_air = inputs.get("mdot_air", self.fixed.get("mdot_air"))
+            mdot_f = mdot_air * values["f_total"]
+            # As in solve_batch
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values["ue"] = np.sqrt(values["ue2"])
+                ue = values["ue"]
+                values["Thrust"] = mdot_air * ((1 + values["f_total"]) * ue - u)
+                values["TSFC"] = mdot_f / values["Thrust"]
+                values["Isp"] = values["Thrust"] / (mdot_f * 9.81)
+        return values
+
+    def _exact(self, inputs: dict) -> dict:
+        with np.errstate(all="ignore"):
+            return to_columns(solve_batch(**dict(self.fixed, **inputs)))
+
+    def __call__(self, **inputs) -> dict:
+        """
+        Outputs at inputs, arrays broadcasting against each other. Every
+        domain input must be given; fixed inputs may be, and points where they
+        differ from the fitted value are solved exactly, as are points outside
+        the domain.
+        """
+        missing = set(self.names) - set(inputs)
+        if missing:
+            raise ValueError(f"Missing domain inputs: {sorted(missing)}")
+        unknown = set(inputs) - set(self.names) - (set(self.fixed) & set(PARAMETERS))
+        if unknown:
+            raise ValueError(f"Neither in the domain nor fixed: {sorted(unknown)}")
+        names = tuple(inputs)
+        values = np.broadcast_arrays(
+            *(np.asarray(inputs[name], dtype=float) for name in names)
+        )
+        shape = values[0].shape
+        columns = dict(zip(names, (v.ravel() for v in values)))
+
+        x = np.column_stack([columns[name] for name in self.names])
+        exact = ~np.all((x >= self.lo) & (x <= self.hi), axis=1)
+        for name in set(names) - set(self.names):
+            exact |= columns[name] != self.fixed[name]
+        if exact.any():
+            inside = np.flatnonzero(~exact)
+            approx = self._approximate(
+                x[inside], {name: column[inside] for name, column in columns.items()}
+            )
+        else:
+            inside = slice(None)
+            approx = self._approximate(x, columns)
+
+        out = {name: np.full(len(x), np.nan) for name in self.outputs}
+        for name in self.outputs:
+            out[name][inside] = approx[name]
+        # Cells touching a failed solve interpolate to NaN
+        for name in self.columns:
+            exact[inside] |= ~np.isfinite(approx[name])
+        if exact.any():
+            solved = self._exact(
+                {name: column[exact] for name, column in columns.items()}
+            )
+            for name in self.outputs:
+                out[name][exact] = solved[name]
+        self.queries += len(x)
+        self.fallbacks += int(np.count_nonzero(exact))
+        return {name: values.reshape(shape) for name, values in out.items()}
+
+    def validate(self, samples: int = HOLDOUT, seed: int = 0) -> dict:
+        """ErrorBounds per output on samples uniformly random domain points."""
+        rng = np.random.default_rng(seed)
+        x = self.lo + rng.random((samples, len(self.names))) * (self.hi - self.lo)
+        inputs = dict(zip(self.names, x.T))
+        truth = self._exact(inputs)
+        approx = self._approximate(x, inputs)
+        errors = {}
+        for name in self.outputs:
+            valid = np.isfinite(truth[name]) & np.isfinite(approx[name])
+            error = np.abs(approx[name][valid] - truth[name][valid])
+            if not error.size:
+                errors[name] = ErrorBounds(np.nan, np.nan, np.nan, np.nan, 0)
+                continue
+            rel = error / np.abs(truth[name][valid])
+            errors[name] = ErrorBounds(
+                max_abs=float(error.max()),
+                max_rel=float(rel.max()),
+                q99_rel=float(np.quantile(rel, 0.99)),
+                rms_rel=float(np.sqrt(np.mean(rel**2))),
+                samples=int(error.size),
+            )
+        return errors
+
+    def summary(self) -> str:
+        """Table of the held-out error bounds per output."""
+        header = (
+            f"{'output':<10} {'max abs':>12} {'max rel':>10} {'q99 rel':>10}"
+            f" {'rms rel':>10} {'points':>7}"
+        )
+        lines = [header, "-" * len(header)]
+        for name, e in self.errors.items():
+            lines.append(
+                f"{name:<10} {e.max_abs:12.4g} {e.max_rel:10.2e} {e.q99_rel:10.2e}"
+                f" {e.rms_rel:10.2e} {e.samples:7d}"
+            )
+        return "\n".join(lines)
+
+    def save(self, directory):
+        """Write table.npy and model.pkl into directory."""
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "table.npy"), np.asarray(self.table))
+        settings = dict(
+            domain=self.domain,
+            fixed=self.fixed,
+            outputs=self.outputs,
+            errors=self.errors,
+            version=self.version,
+        )
+        with open(os.path.join(directory, "model.pkl"), "wb") as file:
+            pickle.dump(settings, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r") -> "Surrogate":
+        """
+        Open a saved model, with the table memory-mapped by default. Raises
+        ValueError if it was fitted with other model sources.
+        """
+        with open(os.path.join(directory, "model.pkl"), "rb") as file:
+            settings = pickle.load(file)
+        if settings["version"] != model_version():
+            raise ValueError(
+                f"{directory} was fitted to model version {settings['version']},"
+                f" not {model_version()}; fit it again"
+            )
+        table = np.load(os.path.join(directory, "table.npy"), mmap_mode=mmap_mode)
+        return cls(table=table, **settings)
+
+
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    fixed = dict(
+        p=101325,
+        T=288,
+        Qr=43e6,
+        eta_d=0.95,
+        eta_c=0.82,
+        eta_b=0.98,
+        eta_t=0.88,
+        eta_n=0.97,
+        mdot_air=20,
+        products=True,
+    )
+    domain = dict(u=(0, 400), pr=(4, 30), T04=(1000, 1700))
+    start = time.perf_counter()
+    surrogate = Surrogate.fit(domain, fixed)
+    print(f"fitted {surrogate.table.shape[1:]} in {time.perf_counter() - start:.2f} s")
+    print(surrogate.summary())
+
+    directory = os.path.join(tempfile.gettempdir(), "engine-surrogate")
+    surrogate.save(directory)
+    surrogate = Surrogate.load(directory)
+
+    rng = np.random.default_rng(1)
+    n = 1_000_000
+    u, pr, T04 = rng.uniform((0, 4, 1000), (400, 30, 1700), (n, 3)).T
+    surrogate(u=u, pr=pr, T04=T04)  # page the table in
+    start = time.perf_counter()
+    surrogate(u=u, pr=pr, T04=T04)
+    elapsed = time.perf_counter() - start
+    print(
+        f"{n} queries in {elapsed * 1e3:.1f} ms ({elapsed / n * 1e9:.0f} ns each),"
+        f" {surrogate.fallbacks / surrogate.queries:.1%} solved exactly"
+    )
+    start = time.perf_counter()
+    with np.errstate(all="ignore"):
+        solve_batch(u=u, pr=pr, T04=T04, **fixed)
+    print(f"solve_batch: {(time.perf_counter() - start) * 1e3:.1f} ms")
@@ -0,0 +1,214 @@
+import json
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from math import prod
+
+import numpy as np
+
+from batch import RESULT_COLUMNS, solve_batch, to_columns
+
+# Names accepted in a sweep grid: the Engine constructor arguments, with the
+# InletConditions fields p, T and u in place of inlet_cond
+PARAMETERS = (
+    "p", "T", "u", "pr", "T04", "Qr", "eta_d", "eta_c", "eta_b", "eta_t",
+    "eta_n", "mdot_air", "afterburner_included", "eta_ab", "Qr_ab", "T06",
+)  # fmt: skip
+
+
+def input_column(name: str) -> str:
+    """
+    Output column of an input. Inputs named like a station (T04, T06) get an
+    _in suffix, so the station values, which differ for dry points (T06 =
+    T05), do not overwrite them.
+    """
+    return f"{name}_in" if name in RESULT_COLUMNS else name
+
+
+def _solve_chunk(names, axes, fixed, start, stop):
+    """Solve grid points [start, stop) of the Cartesian product of axes."""
+    shape = tuple(len(axis) for axis in axes)
+    index = np.unravel_index(np.arange(start, stop), shape)
+    inputs = {name: axis[i] for name, axis, i in zip(names, axes, index)}
+    result = solve_batch(**fixed, **inputs)
+    columns = {
+        input_column(name): np.asarray(values, dtype=float)
+        for name, values in inputs.items()
+    }
+    columns.update(to_columns(result))
+    return columns
+
+
+class MemorySink:
+    """Collects every chunk in memory. Only suitable for grids that fit in RAM."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, columns: dict):
+        self.chunks.append(columns)
+
+    def close(self):
+        pass
+
+    def columns(self) -> dict:
+        if not self.chunks:
+            return {}
+        return {
+            key: np.concatenate([chunk[key] for chunk in self.chunks])
+            for key in self.chunks[0]
+        }
+
+
+class ColumnFileSink:
+    """
+    Appends each column as raw float64 to <directory>/<column>.f8 and writes a
+    schema.json on close. Reopen the result with load_columns.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.files = {}
+        self.length = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, columns: dict):
+        for key, col in columns.items():
+            if key not in self.files:
+                path = os.path.join(self.directory, key + ".f8")
+                self.files[key] = open(path, "wb")
+            np.ascontiguousarray(col, dtype="<f8").tofile(self.files[key])
+        self.length += len(next(iter(columns.values())))
+
+    def close(self):
+        for file in self.files.values():
+            file.close()
+        schema = {"length": self.length, "dtype": "<f8", "columns": list(self.files)}
+        with open(os.path.join(self.directory, "schema.json"), "w") as file:
+            json.dump(schema, file)
+
+
+def load_columns(directory) -> dict:
+    """Memory-map the columns written by a ColumnFileSink."""
+    with open(os.path.join(directory, "schema.json")) as file:
+        schema = json.load(file)
+    return {
+        key: np.memmap(
+            os.path.join(directory, key + ".f8"),
+            dtype=schema["dtype"],
+            mode="r",
+            shape=(schema["length"],),
+        )
+        for key in schema["columns"]
+    }
+
+
+class Sweep:
+    """
+    Parametric sweep over the Cartesian product of the grid axes.
+
+    grid maps parameter names (see PARAMETERS) to 1-D sequences of values;
+    fixed holds scalar values for the remaining parameters. The grid is never
+    materialized: chunks of flat grid indices are handed to a process pool and
+    solved with solve_batch, and results come back in grid order. At most
+    max_pending chunks are in flight, so memory stays bounded for any grid size.
+    """
+
+    def __init__(
+        self,
+        grid: dict,
+        fixed: dict = None,
+        chunk_size: int = 65536,
+        workers: int = None,
+        max_pending: int = None,
+    ):
+        fixed = dict(fixed or {})
+        # The gas model can be fixed but not swept
+        unknown = (set(grid) - set(PARAMETERS)) | (
+            set(fixed) - set(PARAMETERS) - {"fluid", "products"}
+        )
+        if unknown:
+            raise ValueError(f"Unknown sweep parameters: {sorted(unknown)}")
+        missing = set(PARAMETERS[:12]) - set(grid) - set(fixed)
+        if missing:
+            raise ValueError(f"Missing sweep parameters: {sorted(missing)}")
+
+        self.names = tuple(grid)
+        self.axes = tuple(np.asarray(grid[name]).ravel() for name in self.names)
+        self.fixed = fixed
+        self.chunk_size = chunk_size
+        self.workers = os.cpu_count() if workers is None else workers
+        self.max_pending = max_pending or 2 * max(self.workers, 1)
+
+        self.total = prod(len(axis) for axis in self.axes)
+        self.completed = 0
+        self._cancel = threading.Event()
+
+    def __len__(self):
+        return self.total
+
+    @property
+    def columns(self) -> tuple:
+        return tuple(input_column(name) for name in self.names) + RESULT_COLUMNS
+
+    def cancel(self):
+        """Stop the sweep after the chunk currently being delivered. Thread-safe."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _bounds(self):
+        for start in range(0, self.total, self.chunk_size):
+            yield start, min(start + self.chunk_size, self.total)
+
+    def iter_chunks(self):
+        """Yield result columns chunk by chunk, in grid order."""
+        self.completed = 0
+        self._cancel.clear()
+        args = (self.names, self.axes, self.fixed)
+
+        if self.workers <= 1:
+            for start, stop in self._bounds():
+                if self.cancelled:
+                    return
+                columns = _solve_chunk(*args, start, stop)
+                self.completed = stop
+                yield columns
+            return
+
+        bounds = self._bounds()
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            pending = deque()
+            for start, stop in bounds:
+                pending.append((stop, pool.submit(_solve_chunk, *args, start, stop)))
+                if len(pending) >= self.max_pending:
+                    break
+            while pending and not self.cancelled:
+                stop, future = pending.popleft()
+                columns = future.result()
+                bound = next(bounds, None)
+                if bound is not None:
+                    pending.append((bound[1], pool.submit(_solve_chunk, *args, *bound)))
+                self.completed = stop
+                yield columns
+            for _, future in pending:
+                future.cancel()
+
+    def run(self, sink=None, progress=None):
+        """
+        Stream every chunk into sink (a MemorySink by default) and return it.
+        progress, if given, is called as progress(completed, total) after each
+        chunk.
+        """
+        sink = MemorySink() if sink is None else sink
+        try:
+            for columns in self.iter_chunks():
+                sink.write(columns)
+                if progress is not None:
+                    progress(self.completed, self.total)
+        finally:
+            sink.close()
+        return sink
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from atmosphere import _isa_exact, envelope, inlet_conditions, isa
+
+
+@pytest.mark.parametrize(
+    "altitude, p, T",
+    [
+        (0.0, 101325.0, 288.15),
+        (11000.0, 22632.06, 216.65),
+        (20000.0, 5474.889, 216.65),
+        (32000.0, 868.0187, 228.65),
+        (47000.0, 110.9063, 270.65),
+    ],
+)
+def test_layer_bases_match_the_standard(altitude, p, T):
+    # The published pressures are rounded to about 6 significant figures
+    assert isa(altitude)[0] == pytest.approx(p, rel=1e-5)
+    assert isa(altitude)[1] == pytest.approx(T, rel=1e-9)
+
+
+def test_table_is_close_to_the_layer_equations():
+    h = np.random.default_rng(0).uniform(-1000, 86000, 10000)
+    p, T = isa(h)
+    p_exact, T_exact = _isa_exact(h)
+    np.testing.assert_allclose(T, T_exact, rtol=1e-9)
+    np.testing.assert_allclose(p, p_exact, rtol=1e-5)
+
+
+def test_altitudes_outside_the_table_are_clamped():
+    assert isa(-5000.0) == isa(-1000.0)
+    assert isa(1e6) == isa(86000.0)
+
+
+def test_inlet_conditions():
+    inlet = inlet_conditions(0.0, 1.0)
+    assert isinstance(inlet.p, float)
+    assert inlet.u == pytest.approx(np.sqrt(1.4 * 287 * 288.15))
+    inlet = inlet_conditions([0.0, 11000.0], 0.8)
+    assert inlet.u.shape == (2,)
+    assert inlet.T[1] == pytest.approx(216.65)
+
+
+def test_envelope_matches_single_solves(inputs, make_engine):
+    design = {k: v for k, v in inputs.items() if k not in ("p", "T", "u")}
+    altitudes, machs = np.array([0.0, 5000.0, 10000.0]), np.array([0.2, 0.8])
+    env = envelope(altitudes, machs, **design)
+    assert env.Thrust.shape == (3, 2)
+    engine = make_engine()
+    engine.inlet_cond = inlet_conditions(5000.0, 0.8)
+    engine.diff.inlet = engine.inlet_cond
+    assert env.Thrust[1, 1] == pytest.approx(engine.solve()["Thrust"], rel=1e-12)
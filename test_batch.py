@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import batch
+
+
+@pytest.mark.parametrize("wet", [False, True], ids=["dry", "wet"])
+def test_solve_batch_matches_solve(inputs, afterburner, make_engine, fluid, wet):
+    extra = dict(fluid, **(afterburner if wet else {}))
+    pr = np.linspace(4, 20, 5)
+    results = batch.to_columns(batch.solve_batch(**dict(inputs, pr=pr), **extra))
+    for i, value in enumerate(pr):
+        expected = batch.to_columns(make_engine(**extra, pr=value).solve())
+        for name in batch.RESULT_COLUMNS:
+            np.testing.assert_allclose(results[name][i], expected[name][0], rtol=1e-12)
+
+
+def test_solve_batch_broadcasts(inputs):
+    pr = np.linspace(4, 20, 3)[:, None]
+    T04 = np.array([1100.0, 1300.0])
+    result = batch.solve_batch(**dict(inputs, pr=pr, T04=T04))
+    assert result["Thrust"].shape == (3, 2)
+    single = batch.solve_batch(**dict(inputs, pr=pr[2, 0], T04=T04[1]))
+    assert result["Thrust"][2, 1] == pytest.approx(single["Thrust"], rel=1e-12)
+
+
+def test_failed_points_are_nan(inputs):
+    # At pr = 40 the turbine cannot drive the compressor from T04 = 1000 K
+    result = batch.solve_batch(**dict(inputs, pr=np.array([8.3, 40.0]), T04=1000))
+    assert np.isfinite(result["Thrust"][0])
+    assert np.isnan(result["Thrust"][1])
+
+
+def test_afterburner_inputs_broadcast_with_the_rest(inputs, afterburner):
+    result = batch.solve_batch(
+        **inputs, **dict(afterburner, afterburner_included=[False, True])
+    )
+    assert result["Thrust"].shape == (2,)
+    assert result["T06"].T0[0] == result["T05"].T0[0]
+    wet = batch.solve_batch(**inputs, **afterburner)
+    assert result["Thrust"][1] == pytest.approx(wet["Thrust"], rel=1e-12)
+
+
+def test_solve_variants_matches_solve(inputs, make_engine, fluid):
+    T06 = np.array([1700.0, 1800.0, 1900.0])
+    wet = dict(eta_ab=0.95, Qr_ab=43e6)
+    variants = make_engine(**fluid).solve_variants(
+        afterburner_included=True, T06=T06, **wet
+    )
+    for i, value in enumerate(T06):
+        expected = make_engine(
+            **fluid, afterburner_included=True, T06=value, **wet
+        ).solve()
+        for name in ("ue", "Te", "f_total", "Thrust", "TSFC", "Isp"):
+            np.testing.assert_allclose(variants[name][i], expected[name], rtol=1e-12)
+    dry = make_engine(**fluid).solve_variants(afterburner_included=False)
+    np.testing.assert_allclose(dry["Thrust"], make_engine(**fluid).solve()["Thrust"])
+
+    grid = batch.solve_variants(
+        **inputs, **fluid, **wet, afterburner_included=True, T06=T06
+    )
+    np.testing.assert_allclose(grid["Thrust"], variants["Thrust"], rtol=1e-12)
+
+
+def test_solve_variants_is_the_full_grid(inputs, afterburner):
+    pr = np.array([6.0, 10.0])
+    ab = [[False], [True]]
+    T06 = [1700.0, 1900.0, 2100.0]
+    wet = dict(afterburner, afterburner_included=ab, T06=T06)
+    grid = batch.solve_variants(**dict(inputs, pr=pr), **wet)
+    assert grid["Thrust"].shape == (2, 2, 3)
+    full = batch.solve_batch(**dict(inputs, pr=pr[:, None, None]), **wet)
+    np.testing.assert_allclose(grid["Thrust"], full["Thrust"], rtol=1e-12)
+    np.testing.assert_allclose(grid["TSFC"], full["TSFC"], rtol=1e-12)
+
+
+def test_solve_variants_rejects_upstream_inputs(make_engine):
+    with pytest.raises(TypeError, match="pr"):
+        make_engine().solve_variants(pr=[8.0, 10.0])
@@ -0,0 +1,66 @@
+import cache
+from batch import RESULT_COLUMNS, to_columns
+from cache import SolveCache
+from gas_tables import VariableCpFluid
+
+
+def assert_same(result, expected):
+    result, expected = to_columns(result), to_columns(expected)
+    for name in RESULT_COLUMNS:
+        assert result[name] == expected[name], name
+
+
+def test_cache_sees_changed_inputs(make_engine, tmp_path):
+    solves = SolveCache(directory=tmp_path)
+    engine = make_engine()
+    assert_same(solves.solve(engine), make_engine().solve())
+    assert_same(solves.solve(engine), make_engine().solve())
+    assert (solves.stats.misses, solves.stats.hits) == (1, 1)
+
+    engine.comp.pi = 12.0
+    assert_same(solves.solve(engine), make_engine(pr=12.0).solve())
+    engine.turb.eta = 0.9
+    assert_same(solves.solve(engine), make_engine(pr=12.0, eta_t=0.9).solve())
+    assert solves.stats.misses == 3
+
+
+def test_results_can_be_modified_by_callers(make_engine):
+    solves = SolveCache()
+    engine = make_engine()
+    solves.solve(engine)["T03"].T0 = 0.0
+    assert solves.solve(engine)["T03"].T0 == make_engine().solve()["T03"].T0
+
+
+def test_disk_tier_is_shared_and_versioned(make_engine, tmp_path, monkeypatch):
+    SolveCache(directory=tmp_path).solve(make_engine(fluid=VariableCpFluid()))
+    other = SolveCache(directory=tmp_path)
+    result = other.solve(make_engine(fluid=VariableCpFluid()))
+    assert other.stats.disk_hits == 1
+    assert_same(result, make_engine(fluid=VariableCpFluid()).solve())
+
+    # Another model version neither reads nor keeps the old entries
+    monkeypatch.setattr(cache, "model_version", lambda: "edited")
+    edited = SolveCache(directory=tmp_path)
+    edited.solve(make_engine(fluid=VariableCpFluid()))
+    assert edited.stats.misses == 1
+    assert edited.prune() == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["edited"]
+
+
+def test_lru_evicts_the_oldest(make_engine):
+    solves = SolveCache(maxsize=2)
+    for pr in (6.0, 8.0, 10.0):
+        solves.solve(make_engine(pr=pr))
+    assert len(solves) == 2 and solves.stats.evictions == 1
+    solves.solve(make_engine(pr=10.0))
+    solves.solve(make_engine(pr=6.0))
+    assert solves.stats.hits == 1 and solves.stats.misses == 4
+
+
+def test_cache_bypasses_mixed_fluids(make_engine):
+    solves = SolveCache()
+    engine = make_engine()
+    engine.comp.fluid = VariableCpFluid()
+    assert_same(solves.solve(engine), engine.solve())
+    assert solves.stats.bypassed == 1
+    assert len(solves) == 0
@@ -0,0 +1,94 @@
+import warnings
+
+import numpy as np
+import pytest
+
+import gas_tables
+from gas_tables import (
+    AIR_CP,
+    T_MAX,
+    T_MIN,
+    ProductsFluid,
+    TableRangeWarning,
+    VariableCpFluid,
+    _polynomial_h_s0,
+)
+
+
+@pytest.fixture
+def air():
+    return VariableCpFluid()
+
+
+def test_tables_follow_the_polynomial(air):
+    T = np.random.default_rng(0).uniform(T_MIN, T_MAX, 1000)
+    cp = sum(a * (T / 1000) ** i for i, a in enumerate(AIR_CP)) * 1e3
+    h, s0 = _polynomial_h_s0(AIR_CP, T)
+    np.testing.assert_allclose(air.cp_at(T), cp, rtol=1e-7)
+    np.testing.assert_allclose(air.h(T), h, rtol=1e-7)
+    np.testing.assert_allclose(air.s0(T), s0, atol=1e-3)  # crosses zero
+    assert air.cp_at(300.0) == pytest.approx(1005, rel=2e-3)
+
+
+def test_inverse_relations(air):
+    T = np.linspace(250, 1900, 100)
+    np.testing.assert_allclose(air.T_from_h(air.h(T)), T, atol=1e-3)
+    T = np.linspace(250, 900, 100)
+    T2s = air.isentropic_T(T, 10.0)
+    np.testing.assert_allclose(air.pressure_ratio(T, T2s), 10.0, rtol=1e-5)
+
+
+def test_lookups_inside_the_range_do_not_warn(make_engine, air):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", TableRangeWarning)
+        air.h(np.array([T_MIN, T_MAX]))
+        make_engine(fluid=air, afterburner_included=True, eta_ab=0.95,
+                    Qr_ab=43e6, T06=1950).solve()  # fmt: skip
+
+
+@pytest.mark.parametrize("T", [150.0, 2100.0, np.array([300.0, 2100.0])])
+def test_clamped_lookups_warn(air, T):
+    with pytest.warns(TableRangeWarning, match="clamped"):
+        h = air.h(T)
+    np.testing.assert_allclose(h, air.h(np.clip(T, T_MIN, T_MAX)))
+
+
+def test_tables_are_cached_on_disk(tmp_path, monkeypatch):
+    monkeypatch.setenv("TURBOJET_CACHE_DIR", str(tmp_path))
+    built = gas_tables._cached("air", gas_tables._build_air_tables)
+    assert [p.name for p in tmp_path.iterdir()] == [
+        f"air_v{gas_tables.TABLE_VERSION}.npz"
+    ]
+    with monkeypatch.context() as m:
+        m.setattr(gas_tables, "_build_air_tables", None)
+        loaded = gas_tables._cached("air", gas_tables._build_air_tables)
+    np.testing.assert_array_equal(loaded["h"], built["h"])
+
+
+@pytest.mark.parametrize("f", [0.0, 0.03, 0.1])
+def test_products_inverse_relations(f):
+    gas = ProductsFluid(f)
+    T = np.linspace(T_MIN, T_MAX, 1000)
+    np.testing.assert_allclose(gas.T_from_h(gas.h(T)), T, atol=1e-6)
+    T = np.linspace(700, 1600, 100)
+    T2s = gas.isentropic_T(T, 0.2)
+    np.testing.assert_allclose(gas.pressure_ratio(T, T2s), 0.2, rtol=1e-6)
+
+
+def test_products_at_zero_fuel_are_air(air):
+    T = np.linspace(300, 1800, 50)
+    np.testing.assert_allclose(ProductsFluid(0.0).cp_at(T), air.cp_at(T), rtol=1e-12)
+    assert np.all(ProductsFluid(0.03).cp_at(T) > air.cp_at(T))
+
+
+def test_products_take_one_fuel_air_ratio_per_point():
+    f = np.array([0.01, 0.02, 0.05])
+    T = np.array([900.0, 1200.0, 1500.0])
+    h = ProductsFluid(f).h(T)
+    for i in range(3):
+        assert h[i] == pytest.approx(ProductsFluid(f[i]).h(T[i]), rel=1e-12)
+
+
+def test_fuel_air_ratio_beyond_the_table_warns():
+    with pytest.warns(TableRangeWarning):
+        ProductsFluid(0.2)
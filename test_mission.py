@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from atmosphere import inlet_conditions
+from batch import to_columns
+from conftest import AFTERBURNER, DESIGN
+from engine import Engine
+from mission import Mission, Segment, profile
+
+WET = dict(AFTERBURNER)
+del WET["afterburner_included"]
+
+
+def test_profile_samples_segments():
+    steps = profile(
+        [Segment(10, 0, (0.2, 0.4)), Segment(5, (0, 1000), 0.4, throttle=0.5)],
+        dt=2.5,
+    )
+    np.testing.assert_allclose(steps["time"], [0, 2.5, 5, 7.5, 10, 12.5, 15])
+    np.testing.assert_allclose(steps["mach"], [0.2, 0.25, 0.3, 0.35, 0.4, 0.4, 0.4])
+    np.testing.assert_allclose(steps["altitude"], [0, 0, 0, 0, 0, 500, 1000])
+    np.testing.assert_array_equal(steps["throttle"], [1, 1, 1, 1, 0.5, 0.5, 0.5])
+    assert not steps["afterburner"].any()
+
+
+def test_run_matches_solve_batch():
+    mission = Mission(flow_lapse=False, idle_T04=800, **DESIGN, **WET)
+    altitude = np.array([0, 5000, 11000])
+    mach = np.array([0.3, 0.6, 0.9])
+    throttle = np.array([1.0, 0.5, 1.0])
+    afterburner = np.array([False, False, True])
+    result = mission.run([0, 1, 2], altitude, mach, throttle, afterburner)
+
+    params = dict(DESIGN, **WET)
+    params["T04"] = 800 + throttle * (DESIGN["T04"] - 800)
+    expected = to_columns(
+        Engine.solve_batch(
+            inlet_conditions(altitude, mach),
+            afterburner_included=afterburner,
+            **params,
+        )
+    )
+    np.testing.assert_allclose(result.Thrust, expected["Thrust"], rtol=1e-12)
+    np.testing.assert_allclose(result.TSFC, expected["TSFC"], rtol=1e-12)
+    np.testing.assert_allclose(
+        result.mdot_fuel, DESIGN["mdot_air"] * expected["f_total"], rtol=1e-12
+    )
+    assert (result.solved, result.reused, result.failed) == (3, 0, 0)
+
+
+def test_flow_lapse_scales_mass_flow():
+    kwargs = dict(time=[0, 1], altitude=[0, 11000], mach=0.0)
+    lapsed = Mission(**DESIGN).run(**kwargs)
+    fixed = Mission(flow_lapse=False, **DESIGN).run(**kwargs)
+    assert lapsed.mdot_air[0] == pytest.approx(DESIGN["mdot_air"], rel=1e-3)
+    assert lapsed.mdot_air[1] < 0.5 * DESIGN["mdot_air"]
+    np.testing.assert_allclose(fixed.mdot_air, DESIGN["mdot_air"])
+    np.testing.assert_allclose(
+        lapsed.Thrust / lapsed.mdot_air, fixed.Thrust / fixed.mdot_air, rtol=1e-12
+    )
+
+
+def test_identical_runs_are_solved_once():
+    mission = Mission(**DESIGN)
+    altitude = np.repeat([0, 5000, 0, 5000], 10)
+    first = mission.run(np.arange(40.0), altitude, 0.5)
+    assert (first.solved, first.reused) == (2, 38)
+    assert len(mission) == 2
+
+    second = mission.run(np.arange(40.0), altitude, 0.5)
+    assert (second.solved, second.reused) == (0, 40)
+    np.testing.assert_array_equal(second.Thrust, first.Thrust)
+
+    mission.clear()
+    assert mission.run(np.arange(40.0), altitude, 0.5).solved == 2
+
+
+def test_fuel_and_impulse_are_integrated():
+    time = np.linspace(0, 100, 11)
+    result = Mission(**DESIGN).run(time, 3000, 0.6, throttle=0.8)
+    np.testing.assert_allclose(result.fuel, result.mdot_fuel[0] * time)
+    np.testing.assert_allclose(result.impulse, result.Thrust[0] * time)
+    assert result.total_fuel == pytest.approx(100 * result.mdot_fuel[0])
+    assert result.total_impulse == pytest.approx(100 * result.Thrust[0])
+
+
+def test_failed_steps_count_as_zero():
+    # At pr=40 the turbine cannot drive the compressor from T04=1000
+    mission = Mission(idle_T04=1000, **dict(DESIGN, pr=40))
+    result = mission.run([0, 1, 2], 0, 0.5, throttle=[1.0, 0.0, 0.0])
+    assert result.failed == 2
+    assert result.Thrust[0] > 0
+    np.testing.assert_array_equal(result.Thrust[1:], 0.0)
+    np.testing.assert_array_equal(result.mdot_fuel[1:], 0.0)
+    assert result.fuel[2] == result.fuel[1] > 0
@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+
+import montecarlo
+from batch import solve_batch
+from montecarlo import MonteCarlo, StreamingStats, summary
+
+UNCERTAIN = dict(eta_c=0.02, eta_t=0.02, eta_n=0.01, Qr=0.5e6)
+
+
+def test_streaming_stats_match_numpy():
+    x = np.random.default_rng(0).normal(10, 2, 100_000)
+    x[::1000] = np.nan
+    stats = StreamingStats(0, 20)
+    for part in np.array_split(x, 7):
+        stats.update(part)
+    finite = x[np.isfinite(x)]
+    assert stats.count == finite.size and stats.failed == 100
+    assert stats.mean == pytest.approx(finite.mean(), rel=1e-12)
+    assert stats.std == pytest.approx(finite.std(ddof=1), rel=1e-10)
+    assert (stats.min, stats.max) == (finite.min(), finite.max())
+    width = 20 / stats.bins
+    q = [0.05, 0.5, 0.95]
+    np.testing.assert_allclose(stats.quantile(q), np.quantile(finite, q), atol=width)
+
+
+def test_values_outside_the_histogram_are_counted_not_clamped():
+    stats = StreamingStats(0, 1, bins=4)
+    stats.update(np.array([-1.0, 0.1, 0.6, 0.9, 2.0, 3.0]))
+    assert (stats.underflow, stats.overflow, stats.outside) == (1, 2, 3)
+    assert stats.counts.sum() == 3 and stats.max == 3.0
+    assert np.isnan(stats.quantile(0.99))
+
+
+def test_reproducible_for_any_number_of_workers(inputs):
+    runs = []
+    for workers in (1, 2):
+        mc = MonteCarlo(inputs, UNCERTAIN, seed=3, chunk_size=1000, workers=workers)
+        runs.append(mc.run(4500))
+    for output in ("Thrust", "TSFC"):
+        serial, pooled = runs[0][output], runs[1][output]
+        assert serial.count == pooled.count == 4500
+        assert serial.mean == pooled.mean and serial.m2 == pooled.m2
+        np.testing.assert_array_equal(serial.counts, pooled.counts)
+
+
+def test_mean_near_nominal_and_efficiencies_truncated(inputs):
+    nominal = solve_batch(**inputs)["Thrust"]
+    stats = MonteCarlo(inputs, dict(eta_n=0.02), seed=0, workers=1).run(20000)
+    thrust = stats["Thrust"]
+    # eta_n near 1 is truncated there, so the thrust is skewed low
+    assert thrust.mean < nominal
+    assert thrust.mean == pytest.approx(nominal, rel=0.02)
+    assert "outside" in summary(stats)
+
+
+def test_last_allowed_redraw_may_fix_every_sample(inputs, monkeypatch):
+    # With this seed the first draw has an efficiency above one, and one
+    # round of redrawing replaces it
+    mc = MonteCarlo(inputs, dict(eta_n=0.02), seed=2, chunk_size=20, workers=1)
+    monkeypatch.setattr(montecarlo, "MAX_REDRAWS", 0)
+    with pytest.raises(ValueError, match="Too few samples"):
+        mc.run(20)
+    monkeypatch.setattr(montecarlo, "MAX_REDRAWS", 1)
+    assert mc.run(20)["Thrust"].count == 20
+
+
+def test_rejects_bad_arguments(inputs):
+    with pytest.raises(ValueError, match="at least 1"):
+        MonteCarlo(inputs, UNCERTAIN, workers=1).run(0)
+    with pytest.raises(ValueError, match="positive definite"):
+        MonteCarlo(inputs, dict(eta_c=0.02, eta_t=0.02), correlation=[[1, 2], [2, 1]])
+    with pytest.raises(ValueError, match="Unknown"):
+        MonteCarlo(inputs, dict(altitude=1.0))
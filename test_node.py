@@ -0,0 +1,42 @@
+from unittest import mock
+
+import numpy as np
+
+
+def test_outlet_is_cached_until_a_parameter_changes(make_engine):
+    engine = make_engine()
+    first = engine.solve()
+    with mock.patch.object(type(engine.diff), "compute_outlet_conditions") as compute:
+        again = engine.solve()
+    compute.assert_not_called()
+    assert again["Thrust"] == first["Thrust"]
+
+    engine.comp.pi = 12.0
+    assert engine.diff._outlet is not None  # upstream of the change
+    assert engine.comp._outlet is None
+    assert engine.turb._outlet is None  # downstream of it
+    assert engine.solve()["Thrust"] == make_engine(pr=12.0).solve()["Thrust"]
+
+
+def test_setting_an_equal_value_keeps_the_cache(make_engine):
+    engine = make_engine()
+    engine.solve()
+    engine.comp.pi = float(engine.comp.pi)
+    assert engine.comp._outlet is not None
+
+
+def test_outputs_do_not_invalidate(make_engine):
+    engine = make_engine()
+    engine.solve()
+    engine.comb.f = 0.0  # written by the combustor itself
+    assert engine.comb._outlet is not None
+
+
+def test_array_parameters_count_as_changed(make_engine):
+    engine = make_engine()
+    engine.solve()
+    engine.comp.pi = np.array([8.3, 12.0])
+    assert engine.comp._outlet is None
+    engine.comp.pi = engine.comp.pi
+    T03 = engine.comp.get_outlet_conditions().T0
+    assert T03.shape == (2,)
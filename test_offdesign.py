@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+
+from offdesign import OffDesign
+
+
+@pytest.fixture
+def model(make_engine):
+    return OffDesign(make_engine())
+
+
+def test_design_point_is_matched_at_design_speed(model, inputs, make_engine):
+    result = model.solve(inputs["p"], inputs["T"], inputs["u"], inputs["T04"])
+    assert result["converged"]
+    assert result["N"] == pytest.approx(1.0, abs=1e-8)
+    expected = make_engine().solve()
+    assert result["Thrust"] == pytest.approx(expected["Thrust"], rel=1e-6)
+    assert result["pr_c"] == pytest.approx(inputs["pr"], rel=1e-6)
+    assert result["mdot_air"] == pytest.approx(inputs["mdot_air"], rel=1e-6)
+
+
+def test_throttle_line(model, inputs):
+    T04 = np.linspace(900, 1300, 9)
+    line = model.solve(inputs["p"], inputs["T"], inputs["u"], T04)
+    assert line["converged"].all()
+    # Less fuel: slower spool, less flow, pressure ratio and thrust
+    for name in ("N", "mdot_air", "pr_c", "Thrust"):
+        assert np.all(np.diff(line[name]) > 0), name
+
+
+def test_warm_start_from_remembered_points(model, inputs):
+    T04 = np.linspace(950, 1250, 7)
+    first = model.solve(inputs["p"], inputs["T"], inputs["u"], T04)
+    again = model.solve(inputs["p"], inputs["T"], inputs["u"], T04)
+    assert again["iterations"].sum() < first["iterations"].sum()
+    np.testing.assert_allclose(again["Thrust"], first["Thrust"], rtol=1e-8)
+
+
+def test_singular_points_keep_their_last_iterate(model, monkeypatch):
+    # Point 0 has a root at 0.5 in every unknown, point 1 a constant residual
+    def evaluate(x, flag):
+        return np.where(flag[:, None] == 0, x - 0.5, 1.0), {}
+
+    monkeypatch.setattr(model, "evaluate", evaluate)
+    x0 = np.array([[1.0, 0.5, 0.8], [1.0, 0.5, 0.8]])
+    x, iterations, converged = model.newton(x0, {"flag": np.array([0, 1])})
+    np.testing.assert_allclose(x[0], 0.5, atol=1e-10)
+    assert converged.tolist() == [True, False]
+    np.testing.assert_array_equal(x[1], x0[1])
+    assert iterations[1] == 1
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from batch import solve_batch
+from optimizer import optimize
+
+
+def fixed(inputs, *names):
+    return {k: v for k, v in inputs.items() if k not in names}
+
+
+@pytest.mark.parametrize("method", ["golden", "bracket", "auto"])
+def test_one_variable_matches_a_dense_grid(inputs, method):
+    pr = np.linspace(1.5, 60, 200001)
+    thrust = solve_batch(**dict(inputs, pr=pr))["Thrust"]
+    best = np.nanargmax(thrust)
+    result = optimize("Thrust", {"pr": (1.5, 60)}, fixed(inputs, "pr"), method=method)
+    assert result.method == ("bracket" if method == "auto" else method)
+    assert result.x["pr"] == pytest.approx(pr[best], abs=1e-3)
+    assert result.value == pytest.approx(thrust[best], rel=1e-9)
+    assert result.value == pytest.approx(result.result["Thrust"][0])
+
+
+def test_differential_evolution_minimizes_tsfc(inputs):
+    bounds = {"pr": (4, 30), "T04": (1000, 1600)}
+    result = optimize("TSFC", bounds, fixed(inputs, *bounds), maximize=False, seed=1)
+    assert result.method == "de"
+    pr, T04 = np.meshgrid(np.linspace(4, 30, 261), np.linspace(1000, 1600, 121))
+    grid = solve_batch(**dict(inputs, pr=pr, T04=T04))
+    tsfc = np.where(grid["Thrust"] > 0, grid["TSFC"], np.inf)
+    assert result.value <= np.nanmin(tsfc) * (1 + 1e-6)
+    for name, (lo, hi) in bounds.items():
+        assert lo <= result.x[name] <= hi
+
+
+def test_rejects_bad_arguments(inputs):
+    with pytest.raises(ValueError, match="Unknown design"):
+        optimize("Thrust", {"altitude": (0, 1)}, inputs)
+    with pytest.raises(ValueError, match="Unknown objective"):
+        optimize("range", {"pr": (4, 30)}, fixed(inputs, "pr"))
+    with pytest.raises(ValueError, match="one design variable"):
+        bounds = {"pr": (4, 30), "T04": (1000, 1600)}
+        optimize("Thrust", bounds, fixed(inputs, *bounds), method="golden")
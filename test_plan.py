@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+
+from batch import RESULT_COLUMNS, to_columns
+from compressor import Compressor
+
+
+def assert_same(result, expected):
+    result, expected = to_columns(result), to_columns(expected)
+    for name in RESULT_COLUMNS:
+        np.testing.assert_allclose(
+            result[name], expected[name], rtol=1e-12, err_msg=name
+        )
+
+
+@pytest.mark.parametrize("wet", [False, True], ids=["dry", "wet"])
+def test_plan_matches_solve(make_engine, afterburner, fluid, wet):
+    extra = dict(fluid, **(afterburner if wet else {}))
+    run = make_engine(**extra).compile()
+    assert_same(run(), make_engine(**extra).solve())
+    expected = make_engine(**extra, pr=12.0, T04=1400).solve()
+    assert_same(run(pr=12.0, T04=1400), expected)
+    assert set(run()) == set(make_engine(**extra).solve())
+
+
+def test_changes_after_compiling_are_not_seen(make_engine):
+    engine = make_engine()
+    run = engine.compile()
+    engine.comp.pi = 12.0
+    assert_same(run(), make_engine().solve())
+    assert_same(engine.compile()(), make_engine(pr=12.0).solve())
+
+
+def test_spliced_compressor_stage(make_engine):
+    engine = make_engine(pr=4.0)
+    engine.comp.inlet = Compressor(engine.diff, pressure_ratio=3.0, eta=0.85)
+    run = engine.compile()
+    assert "pr_1" in run.source
+    result = run()
+    expected = engine.solve()
+    for name in ("Thrust", "TSFC", "ue", "f"):
+        assert result[name] == pytest.approx(expected[name], rel=1e-12)
+    assert run(pr_1=2.0)["Thrust"] != pytest.approx(result["Thrust"])
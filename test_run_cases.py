@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+
+import numpy as np
+import pytest
+
+import run_cases
+from batch import solve_batch, to_columns
+from sweep import load_columns
+
+PR = [4.0, 8.3, 40.0]  # the last one fails to solve at T04 = 1000 K
+
+
+def write_cases(path, inputs, fmt):
+    cases = [dict(inputs, pr=pr, T04=1000.0) for pr in PR]
+    del cases[1]["mdot_air"]  # given with --set
+    with open(path, "w", newline="") as file:
+        if fmt == "csv":
+            writer = csv.DictWriter(file, fieldnames=list(cases[0]))
+            writer.writeheader()
+            writer.writerows(cases)
+        else:
+            file.writelines(json.dumps(case) + "\n" for case in cases)
+    return to_columns(solve_batch(**dict(inputs, pr=np.array(PR), T04=1000.0)))
+
+
+def reject(constant):
+    raise ValueError(f"{constant} is not JSON")
+
+
+@pytest.mark.parametrize("fmt", ["csv", "jsonl"])
+def test_files_round_trip(inputs, tmp_path, fmt, capsys):
+    source, target = tmp_path / f"cases.{fmt}", tmp_path / f"results.{fmt}"
+    expected = write_cases(source, inputs, fmt)
+    run_cases.main(
+        [str(source), str(target), "--set", "mdot_air=20", "--batch-size", "2"]
+    )
+    assert capsys.readouterr().err == "Solved 3 cases\n"
+    with open(target, newline="") as file:
+        if fmt == "csv":
+            rows = list(csv.DictReader(file))
+            thrust = [float(row["Thrust"]) for row in rows]
+        else:
+            # Strict JSON, with the failed case as null
+            rows = [json.loads(line, parse_constant=reject) for line in file]
+            thrust = [row["Thrust"] for row in rows]
+            thrust = [np.nan if value is None else value for value in thrust]
+    np.testing.assert_allclose(thrust, expected["Thrust"], rtol=1e-12)
+    assert [float(row["T04_in"]) for row in rows] == [1000.0] * 3
+    assert float(rows[1]["mdot_air"]) == 20
+
+
+def test_column_output(inputs, tmp_path, capsys):
+    expected = write_cases(tmp_path / "cases.csv", inputs, "csv")
+    run_cases.main(
+        [str(tmp_path / "cases.csv"), str(tmp_path / "out"), "--set", "mdot_air=20"]
+    )
+    columns = load_columns(tmp_path / "out")
+    np.testing.assert_array_equal(columns["pr"], PR)
+    np.testing.assert_allclose(columns["TSFC"], expected["TSFC"], rtol=1e-12)
+
+
+class Sink:
+    def write(self, columns):
+        self.columns = columns
+
+
+def jsonl(rows):
+    return io.StringIO("".join(json.dumps(row) + "\n" for row in rows))
+
+
+def test_afterburner_flags_are_parsed(inputs, afterburner):
+    rows = [
+        dict(inputs, **dict(afterburner, afterburner_included=flag))
+        for flag in ("no", "yes")
+    ]
+    sink = Sink()
+    assert run_cases.run(jsonl(rows), sink, "jsonl") == 2
+    np.testing.assert_array_equal(sink.columns["afterburner_included"], [0.0, 1.0])
+    assert sink.columns["f_ab"][0] == 0 < sink.columns["f_ab"][1]
+
+
+@pytest.mark.parametrize(
+    "change, message",
+    [
+        (dict(pr="eight"), "Case 1: pr must be a number"),
+        (dict(pr=""), "Case 1: missing parameter 'pr'"),
+    ],
+)
+def test_bad_cases_name_the_case_and_parameter(inputs, change, message):
+    with pytest.raises(ValueError, match=message):
+        run_cases.run(jsonl([inputs, dict(inputs, **change)]), Sink(), "jsonl")
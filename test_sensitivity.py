@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+import batch
+import sensitivity
+from gas_tables import VariableCpFluid
+
+WRT = ("pr", "T04", "eta_c", "u", "T06")
+
+
+@pytest.fixture
+def points(inputs, afterburner):
+    return dict(inputs, **afterburner, pr=np.linspace(4, 20, 7))
+
+
+def test_forward_derivatives_match_finite_differences(points):
+    sens = sensitivity.jacobian(wrt=WRT, **points)
+    assert sens.method == "forward"
+    for name in WRT:
+        x = np.asarray(points[name], dtype=float)
+        step = 1e-6 * np.abs(x)
+        up = batch.to_columns(batch.solve_batch(**dict(points, **{name: x + step})))
+        down = batch.to_columns(batch.solve_batch(**dict(points, **{name: x - step})))
+        for output in sens.outputs:
+            difference = (up[output] - down[output]) / (2 * step)
+            np.testing.assert_allclose(
+                sens[output, name], difference, rtol=1e-5, err_msg=(output, name)
+            )
+
+
+def test_central_mode_agrees_with_forward_mode(points):
+    forward = sensitivity.jacobian(wrt=WRT, method="forward", **points)
+    central = sensitivity.jacobian(wrt=WRT, method="central", **points)
+    np.testing.assert_allclose(central.jacobian, forward.jacobian, rtol=1e-6)
+
+
+def test_table_fluids_use_central_differences(points):
+    sens = sensitivity.jacobian(wrt=WRT, fluid=VariableCpFluid(), **points)
+    assert sens.method == "central"
+    assert np.isfinite(sens.jacobian).all()
+
+
+def test_shape_chunks_and_elasticity(inputs):
+    pr = np.linspace(4, 20, 10).reshape(2, 5)
+    sens = sensitivity.jacobian(
+        wrt=("pr", "T04"), chunk_size=3, **dict(inputs, pr=pr)
+    )
+    assert sens.jacobian.shape == (2, 5, len(sensitivity.OUTPUTS), 2)
+    whole = sensitivity.jacobian(wrt=("pr", "T04"), **dict(inputs, pr=pr))
+    np.testing.assert_array_equal(sens.jacobian, whole.jacobian)
+    elasticity = sens.elasticity()[..., sens.outputs.index("Thrust"), 0]
+    expected = sens["Thrust", "pr"] * pr / sens.values["Thrust"]
+    np.testing.assert_allclose(elasticity, expected)
+
+
+def test_failed_points_have_nan_derivatives(inputs):
+    # Point 1 fails past the turbine, so the fuel-air ratio still has derivatives
+    sens = sensitivity.jacobian(**dict(inputs, pr=np.array([8.3, 40.0]), T04=1000))
+    assert np.isfinite(sens.jacobian[0]).all()
+    for o, output in enumerate(sens.outputs):
+        assert np.isnan(sens.jacobian[1, o]).all() == (output != "f"), output
@@ -0,0 +1,160 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+import server
+from batch import RESULT_COLUMNS, solve_batch, to_columns
+from conftest import DESIGN, INLET
+from server import Metrics, SolveServer, parse_case
+from sweep import PARAMETERS
+
+CASE = dict(INLET, **DESIGN)
+
+
+def test_parse_case_fills_defaults():
+    values = parse_case(dict(CASE, mdot_air=None), {"mdot_air": "30"})
+    assert len(values) == len(PARAMETERS)
+    named = dict(zip(PARAMETERS, values))
+    assert named["mdot_air"] == 30.0
+    assert named["pr"] == DESIGN["pr"]
+    assert named["afterburner_included"] == 0.0
+    assert named["T06"] == 1.0
+    on = parse_case(dict(CASE, afterburner_included="yes"), {})
+    assert dict(zip(PARAMETERS, on))["afterburner_included"] == 1.0
+
+
+@pytest.mark.parametrize(
+    "case, message",
+    [
+        ([1, 2], "must be a JSON object"),
+        (dict(CASE, bypass=1), "Unknown parameters: ['bypass']"),
+        ({k: v for k, v in CASE.items() if k != "T04"}, "Missing parameter 'T04'"),
+        (dict(CASE, pr="high"), "pr must be a number"),
+        (dict(CASE, pr=[8]), "pr must be a number"),
+    ],
+)
+def test_parse_case_errors(case, message):
+    with pytest.raises(ValueError) as error:
+        parse_case(case, {})
+    assert message in str(error.value)
+
+
+def test_cases_are_solved_in_one_batch():
+    cases = [dict(CASE, pr=pr, T04=T04) for pr in (6, 8, 10) for T04 in (1200, 1400)]
+
+    async def run():
+        solves = SolveServer(window=0.05)
+        solves.start()
+        try:
+            return solves, await asyncio.gather(*map(solves.submit, cases))
+        finally:
+            await solves.stop()
+
+    solves, results = asyncio.run(run())
+    assert (solves.metrics.batches, solves.metrics.largest_batch) == (1, 6)
+    assert solves.metrics.requests == 6
+    expected = to_columns(
+        solve_batch(
+            **INLET,
+            **dict(DESIGN, pr=np.repeat([6, 8, 10], 2), T04=np.tile([1200, 1400], 3)),
+        )
+    )
+    for name in RESULT_COLUMNS:
+        np.testing.assert_allclose(
+            [result[name] for result in results], expected[name], rtol=1e-12
+        )
+
+
+def test_failed_solves_are_null():
+    async def run():
+        solves = SolveServer(window=0.0)
+        solves.start()
+        try:
+            return await solves.submit(dict(CASE, pr=40, T04=1000))
+        finally:
+            await solves.stop()
+
+    result = asyncio.run(run())
+    assert result["Thrust"] is None
+
+
+def test_overload_is_refused():
+    async def run():
+        # Not started, so submitted cases stay queued
+        solves = SolveServer(max_queue=4)
+        for _ in range(3):
+            solves.submit(CASE)
+        too_many = await solves._respond("POST", "/solve", json.dumps([CASE] * 5))
+        busy = await solves._respond("POST", "/solve", json.dumps([CASE] * 2))
+        invalid = await solves._respond("POST", "/solve", json.dumps({"pr": "x"}))
+        metrics = solves.metrics.to_dict(solves._queue.qsize())
+        return too_many, busy, invalid, metrics
+
+    too_many, busy, invalid, metrics = asyncio.run(run())
+    assert too_many == (413, {"error": "At most 4 cases per request"})
+    assert busy[0] == 503
+    assert invalid[0] == 400
+    assert (metrics["queued"], metrics["rejected"], metrics["invalid"]) == (3, 2, 1)
+
+
+def test_http_keep_alive():
+    async def request(reader, writer, method, path, payload=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+            + body
+        )
+        status = int((await reader.readline()).split()[1])
+        headers = {}
+        while (line := await reader.readline()) != b"\r\n":
+            key, _, value = line.decode().partition(":")
+            headers[key.lower()] = value.strip()
+        data = await reader.readexactly(int(headers["content-length"]))
+        return status, headers, json.loads(data)
+
+    async def run():
+        solves = SolveServer(window=0.0)
+        solves.start()
+        listener = await asyncio.start_server(solves.handle, "127.0.0.1", 0)
+        port = listener.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            return [
+                await request(reader, writer, "GET", "/health"),
+                await request(reader, writer, "POST", "/solve", CASE),
+                await request(reader, writer, "GET", "/nowhere"),
+            ]
+        finally:
+            writer.close()
+            listener.close()
+            await listener.wait_closed()
+            await solves.stop()
+
+    health, solved, missing = asyncio.run(run())
+    assert health[0] == 200 and health[2] == {"status": "ok"}
+    assert health[1]["connection"] == "keep-alive"
+    assert solved[0] == 200
+    expected = to_columns(solve_batch(**CASE))["Thrust"]
+    assert solved[2]["Thrust"] == pytest.approx(expected)
+    assert missing[0] == 404
+
+
+def test_metrics_forget_old_answers(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(server, "time", SimpleNamespace(perf_counter=lambda: now[0]))
+    metrics = Metrics()
+    for latency in (0.001, 0.002, 0.003):
+        metrics.record(latency)
+    now[0] += 0.5
+    report = metrics.to_dict()
+    assert report["recent_per_s"] == 3
+    assert report["latency_ms"]["p50"] == pytest.approx(2.0)
+
+    now[0] += 4.5
+    report = metrics.to_dict()
+    assert report["recent_per_s"] == 0
+    assert report["requests"] == 3
+    assert report["throughput_per_s"] == pytest.approx(0.6)
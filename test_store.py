@@ -0,0 +1,40 @@
+import numpy as np
+
+from batch import RESULT_COLUMNS, solve_batch, to_columns
+from store import ResultStore
+from sweep import Sweep
+
+
+def test_append_and_extend(inputs, make_engine):
+    store = ResultStore(fields=("pr",) + RESULT_COLUMNS, capacity=1)
+    store.append(make_engine().solve(), pr=inputs["pr"])
+    pr = np.linspace(4, 20, 5)
+    columns = to_columns(solve_batch(**dict(inputs, pr=pr)))
+    store.extend(dict(columns, pr=pr))
+    assert len(store) == 6
+    np.testing.assert_array_equal(store["pr"], np.r_[inputs["pr"], pr])
+    np.testing.assert_array_equal(store["Thrust"][1:], columns["Thrust"])
+    assert store.records.dtype.itemsize == 8 * len(store.fields)
+
+
+def test_is_a_sweep_sink(inputs):
+    grid = dict(pr=np.linspace(4, 20, 9))
+    fixed = {k: v for k, v in inputs.items() if k != "pr"}
+    store = Sweep(grid, fixed, chunk_size=4, workers=1).run(ResultStore())
+    expected = to_columns(solve_batch(**dict(inputs, pr=grid["pr"])))
+    np.testing.assert_array_equal(store["Thrust"], expected["Thrust"])
+
+
+def test_save_and_memory_mapped_load(inputs, tmp_path):
+    store = ResultStore()
+    store.extend(to_columns(solve_batch(**dict(inputs, pr=np.linspace(4, 20, 5)))))
+    store.save(tmp_path / "runs.npy")
+    loaded = ResultStore.load(tmp_path / "runs.npy")
+    assert isinstance(loaded.records, np.memmap)
+    assert loaded.fields == store.fields
+    np.testing.assert_array_equal(loaded.records, store.records)
+
+    # Appending copies the read-only mapping into memory
+    loaded.extend(to_columns(solve_batch(**inputs)))
+    assert len(loaded) == 6
+    assert ResultStore.load(tmp_path / "runs.npy").records.shape == (5,)
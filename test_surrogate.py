@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import batch
+from conftest import DESIGN, INLET
+from surrogate import ErrorBounds, Surrogate
+
+DOMAIN = dict(pr=(4, 20), T04=(1100, 1600))
+
+
+@pytest.fixture
+def fixed():
+    fixed = dict(INLET, **DESIGN)
+    del fixed["pr"], fixed["T04"]
+    return fixed
+
+
+def test_falls_back_outside_its_domain(fixed):
+    model = Surrogate.fit(DOMAIN, fixed, points=5, holdout=0)
+    pr, T04 = np.array([2.0, 25.0, 10.0]), np.array([1200.0, 1300.0, 1800.0])
+    answer = model(pr=pr, T04=T04)
+    exact = batch.to_columns(batch.solve_batch(**fixed, pr=pr, T04=T04))
+    for name in model.outputs:
+        np.testing.assert_allclose(answer[name], exact[name], rtol=1e-12)
+    assert model.fallbacks == 3
+
+    model(pr=10.0, T04=1300.0)
+    assert (model.queries, model.fallbacks) == (4, 3)
+
+    # A fixed input changed from its fitted value is solved exactly too
+    answer = model(pr=10.0, T04=1300.0, u=[250.0, 300.0])
+    exact = batch.to_columns(batch.solve_batch(**dict(fixed, u=300.0), pr=10, T04=1300))
+    assert answer["Thrust"][1] == pytest.approx(exact["Thrust"], rel=1e-12)
+    assert model.fallbacks == 4
+
+
+def test_is_accurate_inside_its_domain(fixed):
+    model = Surrogate.fit(DOMAIN, fixed, holdout=200)
+    assert set(model.errors) == set(model.outputs)
+    assert all(isinstance(e, ErrorBounds) for e in model.errors.values())
+    assert model.errors["Thrust"].max_rel < 1e-3
+
+    rng = np.random.default_rng(3)
+    pr = rng.uniform(4, 20, 50)
+    T04 = rng.uniform(1100, 1600, 50)
+    answer = model(pr=pr, T04=T04)
+    exact = batch.to_columns(batch.solve_batch(**fixed, pr=pr, T04=T04))
+    for name in model.outputs:
+        np.testing.assert_allclose(answer[name], exact[name], rtol=1e-3)
+    assert model.fallbacks == 0
+
+    # Grid points are reproduced exactly
+    answer = model(pr=4.0, T04=1600.0)
+    exact = batch.to_columns(batch.solve_batch(**fixed, pr=4.0, T04=1600.0))
+    np.testing.assert_allclose(answer["f_total"], exact["f_total"], rtol=1e-12)
+
+
+def test_save_and_load(fixed, tmp_path):
+    model = Surrogate.fit(DOMAIN, fixed, points=5, holdout=20)
+    model.save(tmp_path)
+    loaded = Surrogate.load(tmp_path)
+    assert loaded.domain == model.domain
+    assert loaded.fixed == model.fixed
+    assert loaded.errors == model.errors
+    pr, T04 = np.array([5.0, 12.0]), np.array([1150.0, 1500.0])
+    for name, values in model(pr=pr, T04=T04).items():
+        np.testing.assert_array_equal(loaded(pr=pr, T04=T04)[name], values)
+
+    model.version = "other"
+    model.save(tmp_path)
+    with pytest.raises(ValueError, match="fit it again"):
+        Surrogate.load(tmp_path)
+
+
+@pytest.mark.parametrize(
+    "domain, points, message",
+    [
+        (dict(pr=(4, 20), T04=(1600, 1100)), 5, "lo < hi: ['T04']"),
+        (dict(pr=(8, 8), T04=(1100, 1600)), 5, "lo < hi: ['pr']"),
+        (dict(pr=(4, 20), bypass=(0, 1)), 5, "Unknown inputs or outputs"),
+        (DOMAIN, 1, "at least 2 grid points"),
+    ],
+)
+def test_fit_errors(fixed, domain, points, message):
+    with pytest.raises(ValueError) as error:
+        Surrogate.fit(domain, fixed, points=points, holdout=0)
+    assert message in str(error.value)
+
+
+def test_query_errors(fixed):
+    model = Surrogate.fit(DOMAIN, fixed, points=3, holdout=0)
+    with pytest.raises(ValueError, match="Missing domain inputs"):
+        model(pr=10.0)
+    with pytest.raises(ValueError, match="Neither in the domain nor fixed"):
+        model(pr=10.0, T04=1300.0, T06=1900.0)
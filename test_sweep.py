@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from batch import solve_batch, to_columns
+from sweep import ColumnFileSink, Sweep, load_columns
+
+GRID = dict(pr=np.linspace(4, 20, 7), T04=np.array([1100.0, 1300.0, 1500.0]))
+
+
+def fixed(inputs):
+    return {k: v for k, v in inputs.items() if k not in GRID}
+
+
+def test_results_follow_grid_order(inputs):
+    sweep = Sweep(GRID, fixed(inputs), chunk_size=4, workers=1)
+    columns = sweep.run().columns()
+    pr, T04 = np.meshgrid(GRID["pr"], GRID["T04"], indexing="ij")
+    expected = to_columns(solve_batch(**dict(inputs, pr=pr.ravel(), T04=T04.ravel())))
+    assert set(columns) == set(sweep.columns)
+    np.testing.assert_array_equal(columns["pr"], pr.ravel())
+    np.testing.assert_array_equal(columns["T04_in"], T04.ravel())
+    np.testing.assert_array_equal(columns["Thrust"], expected["Thrust"])
+
+
+def test_process_pool_matches_serial(inputs):
+    serial = Sweep(GRID, fixed(inputs), chunk_size=4, workers=1).run().columns()
+    pooled = Sweep(GRID, fixed(inputs), chunk_size=4, workers=2, max_pending=2)
+    for name, values in pooled.run().columns().items():
+        np.testing.assert_array_equal(values, serial[name], err_msg=name)
+
+
+def test_dry_points_keep_the_requested_T06(inputs):
+    grid = dict(afterburner_included=[0.0, 1.0], T06=[1800.0, 1900.0])
+    extra = dict(inputs, eta_ab=0.95, Qr_ab=43e6)
+    columns = Sweep(grid, extra, workers=1).run().columns()
+    np.testing.assert_array_equal(columns["T06_in"], [1800, 1900, 1800, 1900])
+    np.testing.assert_array_equal(columns["T06"][:2], columns["T05"][:2])
+
+
+def test_column_file_sink_round_trip(inputs, tmp_path):
+    sweep = Sweep(GRID, fixed(inputs), chunk_size=4, workers=1)
+    expected = sweep.run().columns()
+    sweep.run(ColumnFileSink(tmp_path / "sweep"))
+    loaded = load_columns(tmp_path / "sweep")
+    assert set(loaded) == set(expected)
+    for name, values in expected.items():
+        np.testing.assert_array_equal(loaded[name], values, err_msg=name)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_cancel_stops_after_the_current_chunk(inputs, workers):
+    sweep = Sweep(GRID, fixed(inputs), chunk_size=4, workers=workers, max_pending=2)
+    calls = []
+
+    def progress(completed, total):
+        calls.append((completed, total))
+        sweep.cancel()
+
+    columns = sweep.run(progress=progress).columns()
+    assert calls == [(4, 21)]
+    assert len(columns["Thrust"]) == 4
+    assert sweep.completed == 4 and sweep.cancelled
+    # A new run starts over
+    assert len(sweep.run().columns()["Thrust"]) == 21
+
+
+def test_rejects_unknown_and_missing_parameters(inputs):
+    with pytest.raises(ValueError, match="Unknown"):
+        Sweep(dict(GRID, altitude=[0.0]), fixed(inputs))
+    with pytest.raises(ValueError, match="Missing.*mdot_air"):
+        Sweep(GRID, {k: v for k, v in fixed(inputs).items() if k != "mdot_air"})
@@ -1,4 +1,4 @@
-from node import Node, ThermoState
+from node import Fluid, Node, ThermoState
 
 
 class Turbine(Node):
@@ -9,26 +9,34 @@ class Turbine(Node):
         T03: float = None,
         T02: float = None,
         f: float = None,
+        fluid: Fluid = Fluid(gamma=1.4, R=287),
+        compressor_fluid: Fluid = None,
     ):
-        super().__init__(inlet, eta_t)
+        super().__init__(inlet, eta_t, fluid)
         self.T03 = T03
         self.T02 = T02
         self.f = f
+        # Fluid the compressor work h(T03) - h(T02) is evaluated with, when it
+        # differs from the gas passing through the turbine
+        self.compressor_fluid = compressor_fluid
 
-    def get_outlet_conditions(self):
+    def compute_outlet_conditions(self):
         # Unpack some variables for readability
         inlet = self.get_inlet_conditions()
         P04 = inlet.P0
         T04 = inlet.T0
-        k = self.fluid.gamma
+        fluid = self.fluid
+        air = self.compressor_fluid or fluid
 
         # Turbine Outlet Temperaure (actual/non-isentropic)
-        T05 = T04 - (self.T03 - self.T02) / (1 + self.f)
+        h04 = fluid.h(T04)
+        h05 = h04 - (air.h(self.T03) - air.h(self.T02)) / (1 + self.f)
+        T05 = fluid.T_from_h(h05)
 
         # Isentropic (constant entropy) Temperature Drop
-        T05s = T04 - (T04 - T05) / self.eta
+        T05s = fluid.T_from_h(h04 - (h04 - h05) / self.eta)
 
         # Pressure drop across the turbine
-        P05 = P04 * (T05s / T04) ** (k / (k - 1))
+        P05 = P04 * fluid.pressure_ratio(T04, T05s)
 
         return ThermoState(P05, T05)